@@ -0,0 +1,14 @@
+# app/__init__.py
+
+def warmup(nlp=True, ai=False):
+    """
+    Load the lazily-imported heavy resources up front. Services call this once
+    per process (e.g. in a pool initializer after fork) so the first request
+    does not pay for spaCy, the skill taxonomy or the Gemini client.
+    """
+    if nlp:
+        from app import parsers
+        parsers.warmup()
+    if ai:
+        from app import ai_scoring
+        ai_scoring.warmup()
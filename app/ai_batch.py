@@ -0,0 +1,210 @@
+# app/ai_batch.py
+"""
+Batched Gemini scoring for bulk screening.
+
+    results = ai_score_batch([(key, resume), ...], jd)
+    results[key]  # {"score": 78, "feedback": "...", "error": None}
+
+Several resumes are packed into one request (up to BATCH_TOKEN_BUDGET tokens
+and MAX_BATCH_ITEMS resumes, the JD sent once per request), and the model is
+asked for JSON matching RESPONSE_SCHEMA: one {id, score, feedback} object per
+resume. Every object is validated and mapped back to its input by id; the
+resumes whose entry is missing or invalid, or whose request failed, are
+re-packed and sent again, up to MAX_ROUNDS times. A resume that still has no
+valid answer gets score None and an "error", never a made-up 0.
+
+Requests go through the shared GeminiClient (concurrency limit, deadlines,
+retries), so a fake model passed as GeminiClient(model=...) exercises all of
+it locally. Valid results land in the same cache as ai_ats_score's, under
+their own prompt version.
+"""
+
+import asyncio
+import json
+import os
+import re
+import time
+
+from app import metrics
+from app.ai_cache import make_cache_key
+from app.ai_scoring import ai_cache, gemini_client
+from app.prompt_builder import JD_BUDGET_SHARE, estimate_tokens, fit_resume, page_starts_of, trim_jd
+
+BATCH_PROMPT_VERSION = "batch-2"
+BATCH_TOKEN_BUDGET = int(os.getenv("ATS_AI_BATCH_TOKEN_BUDGET", "24000"))
+RESUME_TOKEN_BUDGET = int(os.getenv("ATS_AI_BATCH_RESUME_TOKENS", "1500"))
+MAX_BATCH_ITEMS = int(os.getenv("ATS_AI_BATCH_ITEMS", "16"))
+MAX_ROUNDS = 3
+
+RESPONSE_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {
+            "id": {"type": "string"},
+            "score": {"type": "integer"},
+            "feedback": {"type": "string"},
+        },
+        "required": ["id", "score", "feedback"],
+    },
+}
+GENERATION_CONFIG = {"response_mime_type": "application/json", "response_schema": RESPONSE_SCHEMA}
+
+BATCH_PROMPT = """
+You are an advanced ATS resume analyzer.
+Below are {count} resumes, each between <resume id="..."> and </resume>{jd_part}.
+For each resume, analyze the quality, completeness, formatting, relevant skills, and match to the role.
+Score each resume on a scale of 0-100, and provide actionable improvement suggestions.
+Respond with a JSON array holding exactly one object per resume, with keys: id (the resume's id, str), score (int), feedback (str).
+{jd_block}
+{resumes}
+"""
+
+_RESUME_BLOCK = '<resume id="{id}">\n{text}\n</resume>'
+
+def _prompt(batch, jd_text):
+    jd_part = " (all for the job description provided below)" if jd_text else ""
+    jd_block = f"Job Description:\n===\n{jd_text}\n===" if jd_text else ""
+    resumes = "\n".join(_RESUME_BLOCK.format(id=item_id, text=text) for item_id, text, _ in batch)
+    return BATCH_PROMPT.format(count=len(batch), jd_part=jd_part, jd_block=jd_block, resumes=resumes)
+
+def pack(items, budget, max_items=MAX_BATCH_ITEMS):
+    """Greedy batches of (id, text, tokens) items, each within budget tokens and max_items."""
+    batches, current, used = [], [], 0
+    for item in items:
+        cost = item[2] + 10  # the <resume> tags
+        if current and (used + cost > budget or len(current) >= max_items):
+            batches.append(current)
+            current, used = [], 0
+        current.append(item)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+def _json_array(text):
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+    # Schema-constrained output is plain JSON; a fake or older model may wrap it
+    match = re.search(r"\[.*\]", text, re.DOTALL)
+    if match is None:
+        raise ValueError("no JSON array in response")
+    return json.loads(match.group(0))
+
+def validate(text, expected_ids):
+    """({id: (score, feedback)} for valid entries, {id: reason} for the rest)."""
+    try:
+        data = _json_array(text)
+    except ValueError as e:
+        return {}, dict.fromkeys(expected_ids, f"unparseable response: {e}")
+    if not isinstance(data, list):
+        return {}, dict.fromkeys(expected_ids, "response is not a JSON array")
+    valid, errors = {}, {}
+    for entry in data:
+        # a malformed id (list, dict, number) is skipped, not looked up
+        if not isinstance(entry, dict) or not isinstance(entry.get("id"), str):
+            continue
+        if entry["id"] not in expected_ids or entry["id"] in valid:
+            continue
+        item_id, score, feedback = entry["id"], entry.get("score"), entry.get("feedback")
+        if isinstance(score, float) and score.is_integer():
+            score = int(score)
+        if isinstance(score, bool) or not isinstance(score, int) or not 0 <= score <= 100:
+            errors[item_id] = f"invalid score {score!r}"
+        elif not isinstance(feedback, str) or not feedback.strip():
+            errors[item_id] = "missing feedback"
+        else:
+            valid[item_id] = (score, feedback)
+            errors.pop(item_id, None)
+    for item_id in expected_ids:
+        if item_id not in valid and item_id not in errors:
+            errors[item_id] = "missing from response"
+    return valid, errors
+
+async def _score_batch(client, batch, jd_text):
+    prompt = _prompt(batch, jd_text)
+    expected = {item_id for item_id, _, _ in batch}
+    started = time.perf_counter()
+    try:
+        with metrics.span("ai.gemini_batch"):
+            text = await client.generate(prompt, generation_config=GENERATION_CONFIG)
+    except Exception as e:
+        valid, errors = {}, dict.fromkeys(expected, f"{type(e).__name__}: {e}")
+    else:
+        valid, errors = validate(text, expected)
+    metrics.event(
+        "ai.batch_call", items=len(batch), valid=len(valid), invalid=len(errors),
+        prompt_chars=len(prompt), prompt_tokens=estimate_tokens(prompt),
+        latency_ms=round((time.perf_counter() - started) * 1000, 1),
+    )
+    return valid, errors
+
+@metrics.timed("ai.score_batch")
+async def ai_score_batch_async(items, jd, client=None, stats=None):
+    """
+    items: (key, ParsedResume or resume text) pairs. Returns {key: {"score",
+    "feedback", "error"}}; score is None (and error says why) for resumes
+    that never got a valid answer. stats, if given, is updated with counts of
+    resumes, cache hits, upstream calls, retried and failed items.
+    """
+    client = client or gemini_client
+    counts = {"resumes": 0, "cached": 0, "calls": 0, "retried": 0, "failed": 0}
+    results, groups = {}, {}
+    for key, resume in items:
+        counts["resumes"] += 1
+        text = resume if isinstance(resume, str) else resume.text
+        cache_key = make_cache_key(text, jd, client.model_name, BATCH_PROMPT_VERSION)
+        cached = ai_cache.get(cache_key)
+        if cached is not None:
+            counts["cached"] += 1
+            results[key] = {"score": cached[0], "feedback": cached[1], "error": None}
+            continue
+        # identical resumes in one run share a single slot in the request
+        groups.setdefault(cache_key, (text, page_starts_of(resume), []))[2].append(key)
+
+    # short in-request ids: the model only has to echo "r0", "r1", ...
+    pending = {}
+    for n, (cache_key, (text, page_starts, keys)) in enumerate(groups.items()):
+        resume_text = fit_resume(text, RESUME_TOKEN_BUDGET, page_starts)[0]
+        pending[f"r{n}"] = (cache_key, keys, resume_text, estimate_tokens(resume_text))
+    jd_text = trim_jd(jd, int(BATCH_TOKEN_BUDGET * JD_BUDGET_SHARE)) if jd else ""
+    request_budget = max(BATCH_TOKEN_BUDGET - estimate_tokens(_prompt([], jd_text)), RESUME_TOKEN_BUDGET)
+
+    errors = {}
+    for round_number in range(MAX_ROUNDS):
+        if not pending:
+            break
+        if round_number:
+            counts["retried"] += len(pending)
+        batches = pack([(item_id, text, tokens) for item_id, (_, _, text, tokens) in pending.items()],
+                       request_budget)
+        counts["calls"] += len(batches)
+        outcomes = await asyncio.gather(*(_score_batch(client, batch, jd_text) for batch in batches))
+        for valid, batch_errors in outcomes:
+            errors.update(batch_errors)
+            for item_id, (score, feedback) in valid.items():
+                cache_key, keys, _, _ = pending.pop(item_id)
+                errors.pop(item_id, None)
+                ai_cache.set(cache_key, score, feedback)
+                for key in keys:
+                    results[key] = {"score": score, "feedback": feedback, "error": None}
+
+    for item_id, (_, keys, _, _) in pending.items():
+        counts["failed"] += len(keys)
+        for key in keys:
+            results[key] = {"score": None, "feedback": "", "error": errors.get(item_id, "no valid answer")}
+    if stats is not None:
+        stats.update(counts)
+    return results
+
+def ai_score_batch(items, jd, client=None, stats=None):
+    """
+    Blocking ai_score_batch_async, for CLI tools and worker processes. It runs
+    on the client's own long-lived loop: the SDK model is bound to the loop it
+    first ran on, so a fresh asyncio.run() per call would break every call
+    after the first.
+    """
+    client = client or gemini_client
+    return client.run(ai_score_batch_async(list(items), jd, client=client, stats=stats))
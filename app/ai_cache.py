@@ -0,0 +1,204 @@
+# app/ai_cache.py
+
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Two-tier cache for Gemini scoring results: a small in-memory LRU in front of
+# an on-disk SQLite table that survives restarts and is shared by processes.
+# The database is opened on first use, and SQLite errors (an unwritable path,
+# "database is locked" under many writers) only cost the disk tier: lookups
+# miss, writes stay in memory. A cache failure never fails a scoring call.
+DEFAULT_CACHE_PATH = os.getenv("ATS_AI_CACHE_PATH", os.path.join(".cache", "ai_scores.sqlite3"))
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MEMORY_ENTRIES = 256
+DEFAULT_DISK_ENTRIES = 50000
+# Writes between evictions, and how far past disk_entries the table may grow
+# before one is forced; evicting counts the table, so it is not done per write
+EVICT_EVERY_WRITES = 1000
+EVICT_SLACK = 0.1
+
+def _sha256(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def normalize_text(text):
+    return re.sub(r"\s+", " ", text or "").strip().lower()
+
+def make_cache_key(resume_text, jd, model_name, prompt_version):
+    # No level: the prompt never mentions it, so every caller shares one entry
+    parts = [
+        _sha256(normalize_text(resume_text)),
+        _sha256(normalize_text(jd)),
+        model_name,
+        str(prompt_version),
+    ]
+    return _sha256("|".join(parts))
+
+class AIScoreCache:
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl=DEFAULT_TTL_SECONDS,
+                 memory_entries=DEFAULT_MEMORY_ENTRIES, disk_entries=DEFAULT_DISK_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.memory_entries = memory_entries
+        self.disk_entries = disk_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "evictions": 0,
+                      "disk_errors": 0}
+        self._schema_ready = False
+        self._disk_rows = 0       # estimate, corrected at every eviction
+        self._writes_since_evict = 0
+
+    def _connect(self):
+        # sqlite3 connections are not shareable across threads; keep one per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if not self._schema_ready:
+                self._create_schema()
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _create_schema(self):
+        with self._lock:
+            if self._schema_ready:
+                return
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with sqlite3.connect(self.path, timeout=5.0) as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS ai_scores ("
+                    "key TEXT PRIMARY KEY, score INTEGER, feedback TEXT, created_at REAL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS ai_scores_created ON ai_scores(created_at)")
+                self._disk_rows = conn.execute("SELECT COUNT(*) FROM ai_scores").fetchone()[0]
+            self._schema_ready = True
+
+    def _disk(self, operation, *args):
+        """operation(conn, *args) against the SQLite tier; None if it is off or failed."""
+        if not self.path:
+            return None
+        try:
+            return operation(self._connect(), *args)
+        except (OSError, sqlite3.Error) as e:
+            if self._schema_ready:
+                logger.warning("AI score cache %s: %s", self.path, e)
+            else:
+                # the database cannot be created at all: stay memory-only from now on
+                logger.warning("AI score cache %s unusable, keeping results in memory only: %s", self.path, e)
+                self.path = None
+        with self._lock:
+            self.stats["disk_errors"] += 1
+        return None
+
+    def _remember(self, key, value):
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and now - entry[2] <= self.ttl:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return entry[0], entry[1]
+            if entry is not None:
+                del self._memory[key]
+        row = self._disk(lambda conn: conn.execute(
+            "SELECT score, feedback, created_at FROM ai_scores WHERE key = ?", (key,)
+        ).fetchone())
+        if row is not None and now - row[2] <= self.ttl:
+            self._remember(key, row)
+            with self._lock:
+                self.stats["disk_hits"] += 1
+            return row[0], row[1]
+        with self._lock:
+            self.stats["misses"] += 1
+        return None
+
+    def set(self, key, score, feedback):
+        entry = (score, feedback, time.time())
+        self._remember(key, entry)
+        with self._lock:
+            self.stats["writes"] += 1
+        if self._disk(self._write, key, entry) is None:
+            return
+        with self._lock:
+            # other processes write too, hence the periodic eviction as well as the estimate
+            self._disk_rows += 1
+            self._writes_since_evict += 1
+            due = (self._writes_since_evict >= EVICT_EVERY_WRITES
+                   or self._disk_rows > self.disk_entries * (1 + EVICT_SLACK))
+        if due:
+            self.evict()
+
+    @staticmethod
+    def _write(conn, key, entry):
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO ai_scores (key, score, feedback, created_at) VALUES (?, ?, ?, ?)",
+                (key,) + entry,
+            )
+        return True
+
+    def evict(self):
+        """Drop expired rows, then the oldest rows beyond the size limit."""
+        outcome = self._disk(self._evict)
+        removed, rows = outcome if outcome is not None else (0, None)
+        with self._lock:
+            self.stats["evictions"] += removed
+            self._writes_since_evict = 0
+            if rows is not None:
+                self._disk_rows = rows
+        return removed
+
+    def _evict(self, conn):
+        with conn:
+            removed = conn.execute(
+                "DELETE FROM ai_scores WHERE created_at < ?", (time.time() - self.ttl,)
+            ).rowcount
+            rows = conn.execute("SELECT COUNT(*) FROM ai_scores").fetchone()[0]
+            overflow = rows - self.disk_entries
+            if overflow > 0:
+                pruned = conn.execute(
+                    "DELETE FROM ai_scores WHERE key IN "
+                    "(SELECT key FROM ai_scores ORDER BY created_at LIMIT ?)", (overflow,)
+                ).rowcount
+                removed += pruned
+                rows -= pruned
+        return removed, rows
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+
+        def delete_all(conn):
+            with conn:
+                conn.execute("DELETE FROM ai_scores")
+            return True
+        if self._disk(delete_all):
+            with self._lock:
+                self._disk_rows = 0
+
+    def info(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats["memory_size"] = len(self._memory)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["memory_hits"] + stats["disk_hits"]) / lookups, 3) if lookups else 0.0
+        return stats
+
@@ -1,17 +1,24 @@
 # app/ai_scoring.py
 
+import json
 import os
-import google.generativeai as genai
+import threading
+import time
+from app import metrics
+from app.ai_cache import AIScoreCache, make_cache_key
+from app.gemini_client import GeminiClient
+from app.prompt_builder import PROMPT_TOKEN_BUDGET, estimate_tokens, fit_to_budget, page_starts_of
 #from dotenv import load_dotenv
 
 #load_dotenv()
 GEMINI_API_KEY = os.getenv("GOOGLE_GEMINI_API_KEY")
 
-if GEMINI_API_KEY is None:
-    raise ValueError("GOOGLE_GEMINI_API_KEY is not set in the .env file!")
+MODEL_NAME = "gemini-1.5-flash"  # Use flash or pro model as needed
+# Bump whenever BASIC_PROMPT or how it is filled changes so cached scores are not reused
+PROMPT_VERSION = 3
 
-# Configure Gemini once per process
-genai.configure(api_key=GEMINI_API_KEY)
+# Results cache shared by every caller in this process; the SQLite file is opened on first use
+ai_cache = AIScoreCache()
 
 # Prompt template for ATS scoring with/without JD
 BASIC_PROMPT = """
@@ -26,43 +33,126 @@ Resume text:
 {jd_block}
 """
 
-def ai_ats_score(file_bytes, filename, jd, level):
-    # Extract text from resume using same parsers as before
-    from app.parsers import extract_text_from_pdf, extract_text_from_docx
-
-    if filename.lower().endswith(".pdf"):
-        resume_text = extract_text_from_pdf(file_bytes)
-    elif filename.lower().endswith(".docx"):
-        resume_text = extract_text_from_docx(file_bytes)
-    else:
-        return 0, "Unsupported file type for AI scoring."
-
-    jd_part = ""
-    jd_block = ""
-    if jd:
-        jd_part = " (for the job description provided below)"
-        jd_block = f"Job Description:\n{jd}\n==="
-
-    prompt = BASIC_PROMPT.format(
-        resume_text=resume_text[:15000],  # Keep within Gemini input limits
-        jd_part=jd_part,
-        jd_block=jd_block
+def build_prompt(resume_text, jd, budget=PROMPT_TOKEN_BUDGET, page_starts=None):
+    """
+    (prompt, stats): the resume and JD fitted into budget tokens by
+    app.prompt_builder (page_starts lets it drop PDF running headers/footers).
+    stats gives prompt size and the estimated tokens saved against sending
+    the full texts.
+    """
+    jd_part = " (for the job description provided below)" if jd else ""
+    overhead = estimate_tokens(BASIC_PROMPT.format(resume_text="", jd_part=jd_part, jd_block="Job Description:\n\n==="))
+    resume_part, jd_text, stats = fit_to_budget(resume_text, jd, budget, overhead, page_starts)
+    jd_block = f"Job Description:\n{jd_text}\n===" if jd else ""
+    prompt = BASIC_PROMPT.format(resume_text=resume_part, jd_part=jd_part, jd_block=jd_block)
+    stats["prompt_chars"] = len(prompt)
+    stats["prompt_tokens"] = estimate_tokens(prompt)
+    stats["saved_tokens"] = overhead + stats["resume_tokens_in"] + stats["jd_tokens_in"] - stats["prompt_tokens"]
+    return prompt, stats
+
+def parse_response(text):
+    """Return (score, feedback, ok); ok is False when no JSON could be parsed."""
+    # The LLM might return extra text; look for JSON
+    try:
+        start = text.index('{')
+        end = text.rindex('}') + 1
+        data = json.loads(text[start:end])
+    except Exception:
+        # Fallback: treat all as feedback
+        return 0, text.strip(), False
+    return data.get("score", 0), data.get("feedback", ""), True
+
+def ai_available():
+    return bool(GEMINI_API_KEY)
+
+_configured = False
+_configure_lock = threading.Lock()
+
+def build_model():
+    """
+    Import and configure google.generativeai on first use (it is slow to
+    import), so rule-only callers never pay for it or need a key.
+    """
+    global _configured
+    if not GEMINI_API_KEY:
+        raise ValueError("GOOGLE_GEMINI_API_KEY is not set in the .env file!")
+    import google.generativeai as genai
+    with _configure_lock:
+        if not _configured:
+            # Configure Gemini once per process
+            genai.configure(api_key=GEMINI_API_KEY)
+            _configured = True
+    return genai.GenerativeModel(MODEL_NAME)
+
+# Shared async client: bounded concurrency, deadlines, retries, coalescing
+gemini_client = GeminiClient(
+    model_name=MODEL_NAME,
+    model_factory=build_model,
+    max_concurrency=int(os.getenv("GEMINI_MAX_CONCURRENCY", "8")),
+    timeout=float(os.getenv("GEMINI_TIMEOUT_SECONDS", "30")),
+    retries=int(os.getenv("GEMINI_RETRIES", "3")),
+)
+
+def log_call(stats, started, **fields):
+    """One "ai.call" JSON line per Gemini request: prompt size, tokens saved, latency."""
+    metrics.event(
+        "ai.call", prompt_chars=stats["prompt_chars"], prompt_tokens=stats["prompt_tokens"],
+        saved_tokens=stats["saved_tokens"], budget=stats["budget"], sections=stats["sections"],
+        latency_ms=round((time.perf_counter() - started) * 1000, 1), **fields,
     )
 
+@metrics.timed("ai.score")
+def ai_ats_score(resume, jd):
+    # Reuse the text already extracted by app.parsers.parse_resume
+    resume_text = resume.text
+
+    cache_key = make_cache_key(resume_text, jd, MODEL_NAME, PROMPT_VERSION)
+    cached = ai_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    prompt, stats = build_prompt(resume_text, jd, page_starts=page_starts_of(resume))
+    started = time.perf_counter()
     try:
-        model = genai.GenerativeModel("gemini-1.5-flash")  # Use flash or pro model as needed
-        response = model.generate_content(prompt)
-        # Parse JSON from Gemini response
-        import json
-        data = {}
-        # The LLM might return extra text; look for JSON
-        try:
-            start = response.text.index('{')
-            end = response.text.rindex('}') + 1
-            data = json.loads(response.text[start:end])
-        except Exception:
-            # Fallback: treat all as feedback
-            data = {"score": 0, "feedback": response.text.strip()}
-        return data.get("score", 0), data.get("feedback", "")
+        # Same client as the async path: deadline, retries and the process-wide concurrency limit
+        with metrics.span("ai.gemini"):
+            text = gemini_client.generate_sync(prompt)
+        score, feedback, ok = parse_response(text)
     except Exception as e:
-        return 0, f"AI scoring error: {str(e)}"
+        log_call(stats, started, error=type(e).__name__)
+        return 0, f"AI scoring error: {type(e).__name__}: {e}"
+    log_call(stats, started, parsed=ok)
+    # Only well-formed answers are cached; parse failures and errors retry next time
+    if ok:
+        ai_cache.set(cache_key, score, feedback)
+    return score, feedback
+
+@metrics.timed("ai.score")
+async def ai_ats_score_async(resume, jd, client=None):
+    """Non-blocking ai_ats_score for asyncio callers such as app.main."""
+    client = client or gemini_client
+    resume_text = resume.text
+
+    cache_key = make_cache_key(resume_text, jd, client.model_name, PROMPT_VERSION)
+    cached = ai_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    prompt, stats = build_prompt(resume_text, jd, page_starts=page_starts_of(resume))
+    started = time.perf_counter()
+    try:
+        with metrics.span("ai.gemini"):
+            text = await client.generate(prompt)
+        score, feedback, ok = parse_response(text)
+    except Exception as e:
+        log_call(stats, started, error=type(e).__name__)
+        return 0, f"AI scoring error: {type(e).__name__}: {e}"
+    log_call(stats, started, parsed=ok)
+    if ok:
+        ai_cache.set(cache_key, score, feedback)
+    return score, feedback
+
+def warmup():
+    """Build the Gemini model now (after fork) rather than inside the first request."""
+    if ai_available():
+        gemini_client.model
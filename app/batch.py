@@ -0,0 +1,243 @@
+# app/batch.py
+"""
+Bulk resume screening against one job description.
+
+    python -m app.batch resumes/ --jd jd.txt --level mid --workers 8 -o results.jsonl
+
+Each worker process loads the spaCy model once and reuses it for every file it
+handles. One JSON line is appended per resume as soon as it is scored, so a
+re-run with the same --output skips files that are already there, except
+those whose record has an "error" or "ai_error", which are scored again. With
+--reports-dir each worker also writes the candidate's PDF summary to disk.
+With --store, parses are saved to (and reused from) an app.resume_store, so
+a later `python -m app.resume_store rescore` needs no extraction at all.
+With --ai --ai-batch N, Gemini scoring moves to the parent process, which
+sends the resumes N at a time through app.ai_batch (several per request,
+structured JSON output); a resume that gets no valid answer is written with
+"ai_error" instead of a score.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from app import metrics
+
+RESUME_EXTENSIONS = (".pdf", ".docx")
+
+# Per-worker state, set once by _init_worker
+_worker = {}
+
+def _init_worker(jd, level, use_ai, reports_dir=None, store_path=None, keep_text=False):
+    # Load spaCy (and Gemini when asked) once per worker, not per file
+    from app import parsers, scoring, warmup
+    metrics.configure_logging()  # a no-op when inherited through fork
+    warmup(ai=use_ai)
+    _worker.update(parsers=parsers, scoring=scoring, jd=jd, level=level, ai=None, reports_dir=reports_dir,
+                   store=None, keep_text=keep_text)
+    if store_path:
+        from app.resume_store import ResumeStore
+        _worker["store"] = ResumeStore(store_path)
+    if use_ai:
+        from app import ai_scoring
+        _worker["ai"] = ai_scoring
+    if reports_dir:
+        from app import report
+        report.warmup()
+
+def score_file(task):
+    path, rel_path = task
+    record = {"file": rel_path}
+    started = time.perf_counter()
+    with metrics.collect() as spans:
+        try:
+            parsers, scoring = _worker["parsers"], _worker["scoring"]
+            jd, level = _worker["jd"], _worker["level"]
+            store = _worker["store"]
+            with open(path, "rb") as f:
+                file_bytes = f.read()
+            resume = None
+            if store is not None:
+                resume = store.get_resume(parsers.content_hash(file_bytes), os.path.basename(path))
+            if resume is None:
+                resume = parsers.parse_resume(file_bytes, os.path.basename(path))
+                if store is not None:
+                    store.put(resume)
+            else:
+                record["stored"] = True
+            metadata = resume.metadata
+            ats = scoring.traditional_ats_score(resume, level)
+            jd_result = scoring.jd_based_score(resume, jd, level) if jd else None
+            record.update({
+                "content_hash": resume.content_hash,
+                "name": metadata["name"],
+                "email": metadata["email"],
+                "phone": metadata["phone"],
+                "skills": metadata["skills"],
+                "experience_years": metadata["experience_years"],
+                "ats_score": ats["score"],
+                "ats_details": ats["details"],
+                "jd_score": jd_result["score"] if jd_result else None,
+                "jd_details": jd_result["details"] if jd_result else None,
+            })
+            if _worker["ai"] is not None:
+                ai_score, ai_feedback = _worker["ai"].ai_ats_score(resume, jd)
+                record.update({"ai_score": ai_score, "ai_feedback": ai_feedback})
+            if _worker["keep_text"]:
+                # for the parent's batched AI scoring; dropped before the record is written
+                record["_text"] = resume.text
+                record["_page_starts"] = resume.extraction.get("page_starts")
+            if _worker["reports_dir"]:
+                from app.report import record_report
+                _, record["report"], report_error = record_report(record, _worker["reports_dir"], level)
+                if report_error:
+                    record["report_error"] = report_error
+        except Exception as e:
+            record["error"] = f"{type(e).__name__}: {e}"
+    record["seconds"] = round(time.perf_counter() - started, 4)
+    # per-stage milliseconds, to see where a slow file spent its time
+    record["stages_ms"] = metrics.summarize(spans)[0]
+    return record
+
+def find_resumes(folder):
+    found = []
+    for root, _, files in os.walk(folder):
+        for name in files:
+            if name.lower().endswith(RESUME_EXTENSIONS):
+                path = os.path.join(root, name)
+                found.append((path, os.path.relpath(path, folder)))
+    return sorted(found, key=lambda item: item[1])
+
+def already_done(output_path):
+    """Files with a successful record in output_path; failed ones (error/ai_error) are retried."""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+                if "error" not in record and "ai_error" not in record:
+                    done.add(record["file"])
+            except (ValueError, KeyError, TypeError):
+                continue  # a truncated last line from an interrupted run
+    return done
+
+def run(folder, output_path, jd=None, level="entry", workers=None, use_ai=False,
+        chunksize=4, progress_every=100, log=sys.stderr, reports_dir=None, store_path=None, ai_batch=0):
+    tasks = find_resumes(folder)
+    done = already_done(output_path)
+    pending = [task for task in tasks if task[1] not in done]
+    summary = {"found": len(tasks), "skipped": len(tasks) - len(pending), "scored": 0, "failed": 0}
+    workers = workers or os.cpu_count() or 1
+    print(f"{len(pending)} to score, {summary['skipped']} already in {output_path}, {workers} workers", file=log)
+
+    if reports_dir:
+        os.makedirs(reports_dir, exist_ok=True)
+    batch_ai = use_ai and ai_batch > 0
+    if batch_ai:
+        # workers only parse and rule-score; AI (and the reports, which show it) happen here
+        initargs = (jd, level, False, None, store_path, True)
+        ai_stats = {"calls": 0, "retried": 0, "failed": 0}
+    else:
+        initargs = (jd, level, use_ai, reports_dir, store_path)
+    started = time.perf_counter()
+    with open(output_path, "a", encoding="utf-8") as out, multiprocessing.Pool(
+        workers, initializer=_init_worker, initargs=initargs
+    ) as pool:
+        def write(record):
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            summary["failed" if "error" in record else "scored"] += 1
+            completed = summary["scored"] + summary["failed"]
+            if progress_every and completed % progress_every == 0:
+                rate = completed / (time.perf_counter() - started)
+                print(f"  {completed}/{len(pending)} ({rate:.1f} resumes/s)", file=log)
+
+        buffered = []
+
+        def flush_ai():
+            stats = {}
+            _score_ai_batch(buffered, jd, level, reports_dir, stats)
+            for name in ai_stats:
+                ai_stats[name] += stats.get(name, 0)
+            for record in buffered:
+                write(record)
+            buffered.clear()
+
+        for record in pool.imap_unordered(score_file, pending, chunksize=chunksize):
+            if batch_ai and "_text" in record:
+                buffered.append(record)
+                if len(buffered) >= ai_batch:
+                    flush_ai()
+            else:
+                write(record)
+        if buffered:
+            flush_ai()
+
+    elapsed = time.perf_counter() - started
+    completed = summary["scored"] + summary["failed"]
+    summary["seconds"] = round(elapsed, 2)
+    summary["resumes_per_second"] = round(completed / elapsed, 2) if elapsed > 0 else 0.0
+    print(
+        f"Done: {summary['scored']} scored, {summary['failed']} failed, {summary['skipped']} skipped "
+        f"in {summary['seconds']}s ({summary['resumes_per_second']} resumes/s)",
+        file=log,
+    )
+    if batch_ai:
+        summary["ai"] = ai_stats
+        print(f"AI: {ai_stats['calls']} requests, {ai_stats['retried']} retried, "
+              f"{ai_stats['failed']} without a valid score", file=log)
+    return summary
+
+def _score_ai_batch(records, jd, level, reports_dir, stats):
+    """Add ai_score/ai_feedback (or ai_error) to records in place, then their reports."""
+    from app.ai_batch import ai_score_batch
+    from app.parsers import ParsedResume
+    resumes = (
+        (i, ParsedResume(record["content_hash"], record["file"], record.pop("_text"),
+                         extraction={"page_starts": record.pop("_page_starts", None)}))
+        for i, record in enumerate(records)
+    )
+    results = ai_score_batch(resumes, jd, stats=stats)
+    for i, record in enumerate(records):
+        result = results[i]
+        if result["error"] is None:
+            record.update({"ai_score": result["score"], "ai_feedback": result["feedback"]})
+        else:
+            record["ai_error"] = result["error"]
+        if reports_dir:
+            from app.report import record_report
+            _, record["report"], report_error = record_report(record, reports_dir, level)
+            if report_error:
+                record["report_error"] = report_error
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("folder", help="folder containing .pdf/.docx resumes (searched recursively)")
+    ap.add_argument("--jd", help="path to a job description text file")
+    ap.add_argument("--level", choices=["entry", "mid", "senior"], default="entry")
+    ap.add_argument("-o", "--output", default="results.jsonl", help="JSONL file to append results to")
+    ap.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    ap.add_argument("--ai", action="store_true", help="also score each resume with Gemini (slow, billed)")
+    ap.add_argument("--ai-batch", type=int, default=0, metavar="N",
+                    help="with --ai, score N resumes at a time with several per Gemini request")
+    ap.add_argument("--reports-dir", help="also write a PDF summary per resume into this folder")
+    ap.add_argument("--store", help="save parses to / reuse them from this app.resume_store database")
+    args = ap.parse_args(argv)
+    metrics.configure_logging()  # before the pool starts, so forked workers inherit it
+
+    jd = None
+    if args.jd:
+        with open(args.jd, encoding="utf-8") as f:
+            jd = f.read()
+    summary = run(args.folder, args.output, jd=jd, level=args.level, workers=args.workers, use_ai=args.ai,
+                  reports_dir=args.reports_dir, store_path=args.store,
+                  ai_batch=args.ai_batch)
+    return 1 if summary["failed"] and not summary["scored"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
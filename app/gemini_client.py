@@ -0,0 +1,151 @@
+# app/gemini_client.py
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import threading
+
+# Errors worth retrying: timeouts, throttling and transient server failures.
+# Anything else (bad request, auth) fails immediately.
+RETRYABLE_ERROR_NAMES = {
+    "ResourceExhausted", "TooManyRequests", "ServiceUnavailable", "InternalServerError",
+    "DeadlineExceeded", "GatewayTimeout", "Aborted",
+}
+
+def is_retryable(error):
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    return type(error).__name__ in RETRYABLE_ERROR_NAMES
+
+class GeminiClient:
+    """
+    Async wrapper around one reused GenerativeModel.
+
+    - at most max_concurrency requests are in flight at once
+    - every attempt has a deadline of `timeout` seconds
+    - retryable failures back off with full jitter, up to `retries` times
+    - identical prompts already in flight share a single upstream call
+
+    `model` can be any object with an async generate_content_async(prompt)
+    returning something with a .text attribute, e.g. a local fake in tests.
+    When a generation_config is given (structured JSON output) it is passed
+    on as generate_content_async(prompt, generation_config=...).
+    Without one, `model_factory` (or genai.GenerativeModel) builds it on first use.
+
+    Every upstream call runs on one event loop owned by the client, in a
+    daemon thread started on first use (and again after a fork). The SDK's
+    async gRPC channel belongs to the loop it was first used on, so a caller on
+    any other loop (uvicorn's, a fresh asyncio.run) is handed over to it, and
+    blocking callers use generate_sync() or run(). The concurrency limit and
+    the coalescing therefore cover every caller in the process.
+    """
+
+    def __init__(self, model_name="gemini-1.5-flash", max_concurrency=8, timeout=30.0,
+                 retries=3, backoff=0.5, max_backoff=8.0, model=None, model_factory=None):
+        self.model_name = model_name
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._model = model
+        self._model_factory = model_factory
+        self._owns_model = model is None
+        self._runner_lock = threading.Lock()
+        self._runner_loop = None
+        self._runner_pid = None
+        self._loop = None
+        self._semaphore = None
+        self._inflight = {}
+        self.stats = {"requests": 0, "upstream_calls": 0, "coalesced": 0, "retries": 0, "failures": 0}
+
+    @property
+    def model(self):
+        if self._model is None:
+            if self._model_factory is not None:
+                self._model = self._model_factory()
+            else:
+                import google.generativeai as genai
+                self._model = genai.GenerativeModel(self.model_name)
+        return self._model
+
+    def _runner(self):
+        """The client's event loop, running in its own thread."""
+        with self._runner_lock:
+            # a forked child inherits the loop object but not the thread running it
+            if self._runner_loop is None or self._runner_pid != os.getpid():
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="gemini-client", daemon=True).start()
+                self._runner_loop, self._runner_pid = loop, os.getpid()
+            return self._runner_loop
+
+    def run(self, coro):
+        """Run coro on the client's loop and block until it is done, e.g. from a worker thread."""
+        loop = self._runner()
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            coro.close()
+            raise RuntimeError("GeminiClient.run() called from the client's own loop; await the coroutine instead")
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+    def generate_sync(self, prompt, generation_config=None):
+        """Blocking generate(), with the same deadlines, retries and concurrency limit."""
+        return self.run(self._generate(prompt, generation_config))
+
+    def _bind_loop(self):
+        # asyncio primitives belong to one event loop; rebuild them if the loop changes
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            if self._loop is not None and self._owns_model:
+                self._model = None  # its gRPC channel is tied to the old loop
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._inflight = {}
+
+    async def generate(self, prompt, generation_config=None):
+        """Return the response text for prompt."""
+        loop = self._runner()
+        if asyncio.get_running_loop() is not loop:
+            future = asyncio.run_coroutine_threadsafe(self._generate(prompt, generation_config), loop)
+            return await asyncio.wrap_future(future)
+        return await self._generate(prompt, generation_config)
+
+    async def _generate(self, prompt, generation_config=None):
+        self._bind_loop()
+        self.stats["requests"] += 1
+        key = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        if generation_config is not None:
+            key += hashlib.sha256(json.dumps(generation_config, sort_keys=True).encode("utf-8")).hexdigest()
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+        else:
+            task = asyncio.ensure_future(self._call(prompt, generation_config))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield: one caller being cancelled must not cancel the shared call
+        return await asyncio.shield(task)
+
+    async def _call(self, prompt, generation_config=None):
+        attempt = 0
+        kwargs = {} if generation_config is None else {"generation_config": generation_config}
+        while True:
+            try:
+                async with self._semaphore:
+                    self.stats["upstream_calls"] += 1
+                    response = await asyncio.wait_for(
+                        self.model.generate_content_async(prompt, **kwargs), timeout=self.timeout
+                    )
+                return response.text
+            except Exception as e:
+                if attempt >= self.retries or not is_retryable(e):
+                    self.stats["failures"] += 1
+                    raise
+            attempt += 1
+            self.stats["retries"] += 1
+            await asyncio.sleep(random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt)))
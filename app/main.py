@@ -0,0 +1,155 @@
+# app/main.py
+"""
+FastAPI backend.
+
+    uvicorn app.main:app --workers 2
+
+Parsing, spaCy and rule scoring are CPU-bound, so they run in a process pool
+(ATS_POOL_WORKERS, default CPU count) and never block the event loop. The
+Gemini call goes through the shared async client (bounded concurrency,
+deadlines, retries and in-flight coalescing), so it never blocks either.
+
+GET /metrics serves per-stage timings in the Prometheus text format, and each
+scored upload is logged as one JSON line on the "app.metrics" logger, which
+goes to stderr unless ATS_METRICS_LOG=0.
+"""
+
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+from fastapi import FastAPI, File, Form, HTTPException, UploadFile
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel
+
+from app import metrics, warmup
+from app.ai_scoring import ai_ats_score_async, ai_available
+from app.comparator import compare_scores
+from app.parsers import parse_resume
+from app.scoring import jd_based_score, traditional_ats_score
+
+LEVELS = ("entry", "mid", "senior")
+POOL_WORKERS = int(os.getenv("ATS_POOL_WORKERS", "0")) or os.cpu_count() or 1
+# Uploads are read into memory and shipped to a pool worker, so cap their size
+MAX_UPLOAD_BYTES = int(os.getenv("ATS_MAX_UPLOAD_BYTES", str(10 * 2**20)))
+
+class ScoreResponse(BaseModel):
+    filename: str
+    content_hash: str
+    name: str
+    traditional: dict
+    jd_match: Optional[dict] = None
+    ai_score: int
+    ai_feedback: str
+    comparison: dict
+
+class BatchItem(BaseModel):
+    filename: str
+    result: Optional[ScoreResponse] = None
+    error: Optional[str] = None
+
+class BatchResponse(BaseModel):
+    results: List[BatchItem]
+
+def analyze_upload(file_bytes, filename, jd, level):
+    """
+    Runs inside a pool worker: extraction, spaCy and both rule scorers. The
+    worker's timing spans are returned too, since its metrics registry is not
+    the one /metrics serves.
+    """
+    with metrics.collect() as spans:
+        resume = parse_resume(file_bytes, filename)
+        resume.metadata  # build it here, not back on the event loop
+        ats = traditional_ats_score(resume, level)
+        jd_result = jd_based_score(resume, jd, level) if jd else None
+    return resume, ats, jd_result, spans
+
+@asynccontextmanager
+async def lifespan(app):
+    metrics.configure_logging()
+    # Each pool worker loads spaCy and the skill taxonomy once, before its first task
+    app.state.pool = ProcessPoolExecutor(max_workers=POOL_WORKERS, initializer=warmup)
+    if ai_available():
+        warmup(ai=True, nlp=False)
+    try:
+        yield
+    finally:
+        app.state.pool.shutdown(cancel_futures=True)
+
+app = FastAPI(title="ATS Resume Checker", lifespan=lifespan)
+
+async def score_upload(upload, level, jd):
+    filename = upload.filename or ""
+    if not filename:
+        raise HTTPException(status_code=400, detail="The uploaded file has no filename")
+    if not filename.lower().endswith((".pdf", ".docx")):
+        raise HTTPException(status_code=400, detail=f"Unsupported file type: {filename}")
+    file_bytes = await upload.read(MAX_UPLOAD_BYTES + 1)
+    if len(file_bytes) > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"{filename} is larger than {MAX_UPLOAD_BYTES} bytes")
+    loop = asyncio.get_running_loop()
+    with metrics.request_log(filename=filename, level=level, jd=bool(jd), bytes=len(file_bytes)) as log:
+        try:
+            with metrics.span("api.analyze"):  # includes time queued for a worker
+                resume, ats, jd_result, spans = await loop.run_in_executor(
+                    app.state.pool, analyze_upload, file_bytes, filename, jd, level
+                )
+        except Exception as e:
+            raise HTTPException(status_code=422, detail=f"Could not parse {filename}: {e}")
+        metrics.merge(spans)
+        log["content_hash"] = resume.content_hash
+
+        if not ai_available():
+            ai_score, ai_feedback = 0, "AI scoring unavailable: GOOGLE_GEMINI_API_KEY is not set."
+        else:
+            ai_score, ai_feedback = await ai_ats_score_async(resume, jd)
+
+    return ScoreResponse(
+        filename=resume.filename,
+        content_hash=resume.content_hash,
+        name=resume.metadata.get("name", ""),
+        traditional=ats,
+        jd_match=jd_result,
+        ai_score=ai_score if isinstance(ai_score, int) else 0,
+        ai_feedback=ai_feedback,
+        comparison=compare_scores(ats, ai_score, jd_result),
+    )
+
+def check_level(level):
+    if level not in LEVELS:
+        raise HTTPException(status_code=400, detail=f"level must be one of {', '.join(LEVELS)}")
+
+@app.get("/health")
+async def health():
+    return {"status": "ok", "pool_workers": POOL_WORKERS, "ai_enabled": ai_available()}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.prometheus_text(), media_type="text/plain; version=0.0.4")
+
+@app.post("/upload_resume/", response_model=ScoreResponse)
+async def upload_resume(
+    resume: UploadFile = File(...),
+    level: str = Form("entry"),
+    jd: Optional[str] = Form(None),
+):
+    check_level(level)
+    return await score_upload(resume, level, jd or None)
+
+@app.post("/upload_resumes/", response_model=BatchResponse)
+async def upload_resumes(
+    resumes: List[UploadFile] = File(...),
+    level: str = Form("entry"),
+    jd: Optional[str] = Form(None),
+):
+    check_level(level)
+
+    async def one(upload):
+        try:
+            return BatchItem(filename=upload.filename or "", result=await score_upload(upload, level, jd or None))
+        except HTTPException as e:
+            return BatchItem(filename=upload.filename or "", error=e.detail)
+
+    return BatchResponse(results=await asyncio.gather(*(one(upload) for upload in resumes)))
@@ -0,0 +1,99 @@
+# app/match_matrix.py
+
+import numpy as np
+
+from app.parsers import resume_metadata
+from app.scoring import CompiledJD, compile_jd, resume_tokens
+
+def _vocabulary(sets):
+    vocab = {}
+    for items in sets:
+        for item in items:
+            vocab.setdefault(item, len(vocab))
+    return vocab
+
+def _jd_matrix(sets, vocab):
+    m = np.zeros((len(sets), len(vocab)), dtype=np.float32)
+    for row, items in enumerate(sets):
+        m[row, [vocab[item] for item in items]] = 1.0
+    return m
+
+def _pct_table(sets):
+    """
+    pct_table[j, c] == round(c / max(len(set_j), 1) * 100, 1), computed with
+    Python's round() so batched results match jd_based_score exactly.
+    """
+    sizes = [len(items) for items in sets]
+    table = np.zeros((len(sets), max(sizes, default=0) + 1), dtype=np.float64)
+    for row, size in enumerate(sizes):
+        denom = max(size, 1)
+        table[row, :size + 1] = [round((c / denom) * 100, 1) for c in range(size + 1)]
+    return table
+
+def match_matrix(resumes, jds, chunk_size=512):
+    """
+    Score every resume against every JD at once. Returns a dict of
+    (n_resumes, n_jds) arrays: "score" (int), "skill_match_pct",
+    "word_match_pct" and "exp_match", identical to what jd_based_score
+    returns pair by pair.
+
+    Only tokens and skills that appear in some JD can contribute to an
+    overlap, so the shared vocabulary is built from the JDs. Each chunk of
+    resumes becomes a 0/1 matrix over that vocabulary and the overlap counts
+    for all JDs come out of one matrix product.
+    """
+    compiled = [jd if isinstance(jd, CompiledJD) else compile_jd(jd) for jd in jds]
+    metadata = [resume_metadata(resume) for resume in resumes]
+
+    word_vocab = _vocabulary(c.tokens for c in compiled)
+    skill_vocab = _vocabulary(c.skills for c in compiled)
+    jd_words = _jd_matrix([c.tokens for c in compiled], word_vocab).T
+    jd_skills = _jd_matrix([c.skills for c in compiled], skill_vocab).T
+    word_table = _pct_table([c.tokens for c in compiled])
+    skill_table = _pct_table([c.skills for c in compiled])
+    jd_rows = np.arange(len(compiled))[None, :]
+
+    n = len(metadata)
+    word_counts = np.zeros((n, len(compiled)), dtype=np.int64)
+    skill_counts = np.zeros((n, len(compiled)), dtype=np.int64)
+    for start in range(0, n, chunk_size):
+        block = metadata[start:start + chunk_size]
+        words = np.zeros((len(block), len(word_vocab)), dtype=np.float32)
+        skills = np.zeros((len(block), len(skill_vocab)), dtype=np.float32)
+        for row, meta in enumerate(block):
+            tokens = resume_tokens(meta.get("raw_text", ""))
+            words[row, [word_vocab[t] for t in tokens if t in word_vocab]] = 1.0
+            skills[row, [skill_vocab[s] for s in set(meta.get("skills", [])) if s in skill_vocab]] = 1.0
+        # float32 sums of 0/1 values are exact far beyond any vocabulary size here
+        word_counts[start:start + len(block)] = (words @ jd_words).astype(np.int64)
+        skill_counts[start:start + len(block)] = (skills @ jd_skills).astype(np.int64)
+
+    word_pct = word_table[jd_rows, word_counts]
+    skill_pct = skill_table[jd_rows, skill_counts]
+
+    required = np.array([c.required_exp if c.required_exp is not None else np.nan for c in compiled])
+    candidate = np.array([
+        np.nan if meta.get("experience_years", 0) is None else meta.get("experience_years", 0)
+        for meta in metadata
+    ], dtype=np.float64)
+    with np.errstate(invalid="ignore"):
+        exp_match = candidate[:, None] >= required[None, :]  # NaN on either side -> False
+
+    # Same float operations, in the same order, as jd_based_score; int() truncates
+    raw = skill_pct * 0.5 + word_pct * 0.3 + np.where(exp_match, 20.0, 0.0)
+    score = np.minimum(np.trunc(raw).astype(np.int64), 100)
+    return {
+        "score": score,
+        "skill_match_pct": skill_pct,
+        "word_match_pct": word_pct,
+        "exp_match": exp_match,
+    }
+
+def top_k_per_jd(scores, k=10):
+    """Row indices of the k best resumes for each JD column, best first."""
+    k = min(k, scores.shape[0])
+    if k == 0:
+        return np.empty((0, scores.shape[1]), dtype=np.int64)
+    # stable sort keeps the earlier resume first among equal scores, like rank()
+    order = np.argsort(-scores, axis=0, kind="stable")
+    return order[:k]
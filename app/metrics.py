@@ -0,0 +1,232 @@
+# app/metrics.py
+"""
+Lightweight per-stage timing.
+
+    @metrics.timed("parse.skills")
+    def extract_skills(text): ...
+
+    with metrics.span("report.pdf"):
+        ...
+
+Every span adds its duration to a histogram for its stage and counts errors
+(an exception leaving the span). prometheus_text() renders all stages in the
+Prometheus text format. Inside request_log(...) the spans are also collected
+and written as one JSON line per request to the "app.metrics" logger.
+
+ATS_METRICS=0 turns it all off; a disabled span costs one global lookup.
+The API and the batch CLI call configure_logging() at startup so those JSON
+lines reach stderr; ATS_METRICS_LOG=0 leaves the logger alone (for an app
+that routes "app.metrics" through its own logging config).
+"""
+
+import bisect
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.getenv("ATS_METRICS", "1") != "0"
+LOG_ENABLED = os.getenv("ATS_METRICS_LOG", "1") != "0"
+
+# Histogram bucket upper bounds, in seconds
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Spans of the request being handled in this thread/task, if any
+_current = contextvars.ContextVar("ats_metrics_spans", default=None)
+
+class StageStats:
+    __slots__ = ("buckets", "count", "errors", "total")
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS) + 1)  # last slot is +Inf
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+
+class Registry:
+    def __init__(self):
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds, error=False):
+        with self._lock:
+            stats = self._stages.get(stage)
+            if stats is None:
+                stats = self._stages[stage] = StageStats()
+            stats.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+            stats.count += 1
+            stats.total += seconds
+            if error:
+                stats.errors += 1
+
+    def snapshot(self):
+        """{stage: {"count", "errors", "sum", "buckets"}} with cumulative bucket counts."""
+        with self._lock:
+            out = {}
+            for stage, stats in sorted(self._stages.items()):
+                cumulative, running = [], 0
+                for n in stats.buckets:
+                    running += n
+                    cumulative.append(running)
+                out[stage] = {"count": stats.count, "errors": stats.errors, "sum": stats.total, "buckets": cumulative}
+            return out
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+
+registry = Registry()
+
+def enable(on=True):
+    global ENABLED
+    ENABLED = on
+
+def configure_logging(stream=None):
+    """
+    Write the "app.metrics" JSON lines to stream (default stderr), one per
+    line with nothing around them. Does nothing if ATS_METRICS_LOG=0 or the
+    logger already has a handler, so it is safe to call more than once.
+    """
+    if not LOG_ENABLED or logger.handlers:
+        return
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False  # no second copy through a root handler
+
+def record(stage, seconds, error=False):
+    registry.observe(stage, seconds, error)
+    spans = _current.get()
+    if spans is not None:
+        spans.append((stage, seconds, error))
+
+@contextmanager
+def span(stage):
+    if not ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    error = False
+    try:
+        yield
+    except BaseException:
+        error = True
+        raise
+    finally:
+        record(stage, time.perf_counter() - start, error)
+
+def timed(stage):
+    """Decorator form of span() for plain and async functions."""
+    def decorate(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                if not ENABLED:
+                    return await fn(*args, **kwargs)
+                with span(stage):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException:
+                record(stage, time.perf_counter() - start, True)
+                raise
+            record(stage, time.perf_counter() - start)
+            return result
+        return wrapper
+    return decorate
+
+@contextmanager
+def collect():
+    """Collect the (stage, seconds, error) spans recorded inside the block."""
+    spans = []
+    token = _current.set(spans)
+    try:
+        yield spans
+    finally:
+        _current.reset(token)
+
+def merge(spans):
+    """
+    Record spans collected elsewhere, e.g. returned by a process-pool worker
+    whose own registry the parent never sees.
+    """
+    for stage, seconds, error in spans:
+        record(stage, seconds, error)
+
+def summarize(spans):
+    """Total milliseconds per stage, and the stages that raised."""
+    stages = {}
+    for stage, seconds, _ in spans:
+        stages[stage] = round(stages.get(stage, 0.0) + seconds * 1000, 3)
+    return stages, sorted({stage for stage, _, error in spans if error})
+
+@contextmanager
+def request_log(**fields):
+    """
+    Collect every span of one request and log it as a single JSON line:
+    {"event": "request", **fields, "total_ms", "stages": {stage: ms}, "errors": [...]}.
+    Callers may add fields to the yielded dict before the block ends.
+    """
+    if not ENABLED:
+        yield dict(fields)
+        return
+    start = time.perf_counter()
+    record_fields = dict(fields)
+    status = "ok"
+    with collect() as spans:
+        try:
+            yield record_fields
+        except BaseException:
+            status = "error"
+            raise
+        finally:
+            stages, errors = summarize(spans)
+            entry = {"event": "request", **record_fields, "status": record_fields.get("status", status),
+                     "total_ms": round((time.perf_counter() - start) * 1000, 3), "stages": stages, "errors": errors}
+            logger.info(json.dumps(entry, default=str))
+
+def event(name, **fields):
+    """Log one JSON line {"event": name, **fields}, e.g. per upstream call."""
+    if ENABLED:
+        logger.info(json.dumps({"event": name, **fields}, default=str))
+
+def _format_le(bound):
+    return repr(float(bound))
+
+def prometheus_text(prefix="ats"):
+    """All stages in the Prometheus text exposition format."""
+    snapshot = registry.snapshot()
+    lines = [
+        f"# HELP {prefix}_stage_seconds Time spent in each pipeline stage.",
+        f"# TYPE {prefix}_stage_seconds histogram",
+    ]
+    for stage, stats in snapshot.items():
+        label = stage.replace("\\", "\\\\").replace('"', '\\"')
+        for bound, n in zip(BUCKETS, stats["buckets"]):
+            lines.append(f'{prefix}_stage_seconds_bucket{{stage="{label}",le="{_format_le(bound)}"}} {n}')
+        lines.append(f'{prefix}_stage_seconds_bucket{{stage="{label}",le="+Inf"}} {stats["count"]}')
+        lines.append(f'{prefix}_stage_seconds_sum{{stage="{label}"}} {stats["sum"]!r}')
+        lines.append(f'{prefix}_stage_seconds_count{{stage="{label}"}} {stats["count"]}')
+    lines += [
+        f"# HELP {prefix}_stage_errors_total Spans that ended in an exception.",
+        f"# TYPE {prefix}_stage_errors_total counter",
+    ]
+    for stage, stats in snapshot.items():
+        label = stage.replace("\\", "\\\\").replace('"', '\\"')
+        lines.append(f'{prefix}_stage_errors_total{{stage="{label}"}} {stats["errors"]}')
+    return "\n".join(lines) + "\n"
@@ -1,32 +1,264 @@
 # app/parsers.py
 
+import bisect
 import io
-import fitz  # PyMuPDF
-import docx
+import hashlib
+import json
+import logging
+import os
+import posixpath
+import threading
 import re
-import spacy
+import zipfile
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
 from datetime import datetime
+from functools import lru_cache
 from dateutil import parser as dateparser
-    
-# Load spaCy model at module import for speed
-nlp = spacy.load("en_core_web_sm")
-
-COMMON_SKILLS = [
-    "python", "java", "c++", "sql", "aws", "azure", "docker", "kubernetes",
-    "javascript", "typescript", "node.js", "react", "django", "flask",
-    "git", "linux", "html", "css", "nlp", "machine learning", "data analysis"
-]
-
-def extract_text_from_pdf(pdf_bytes):
-    text = ""
-    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
-        for page in doc:
-            text += page.get_text()
+from app import metrics
+
+logger = logging.getLogger(__name__)
+
+# Heavy resources (spaCy, the compiled skill taxonomy, PyMuPDF)
+# load on first use, or up front via warmup(), so importing this module stays
+# cheap for workers, tests and CLI tools.
+# Skills are found by the taxonomy's PhraseMatcher, which only needs tokens, so
+# none of the trained components (tagger, parser, NER, ...) are loaded.
+SPACY_EXCLUDE = ["tok2vec", "tagger", "attribute_ruler", "parser", "senter", "lemmatizer", "ner"]
+
+_nlp = None
+_skill_taxonomy = None
+_load_lock = threading.Lock()
+
+def get_nlp():
+    global _nlp
+    if _nlp is None:
+        with _load_lock:
+            if _nlp is None:
+                import spacy
+                _nlp = spacy.load("en_core_web_sm", exclude=SPACY_EXCLUDE)
+    return _nlp
+
+def get_skill_taxonomy():
+    # Versioned skill taxonomy (app/data/skills_taxonomy.json) compiled once
+    global _skill_taxonomy
+    if _skill_taxonomy is None:
+        nlp = get_nlp()
+        with _load_lock:
+            if _skill_taxonomy is None:
+                from app.skill_taxonomy import SkillTaxonomy
+                _skill_taxonomy = SkillTaxonomy.load(nlp)
+    return _skill_taxonomy
+
+def warmup():
+    """Load everything lazily-loaded above; call once per process, e.g. after fork."""
+    get_skill_taxonomy()
+    import fitz  # noqa: F401
+
+def __getattr__(name):
+    # Keep the old module-level names working without loading at import time
+    if name == "nlp":
+        return get_nlp()
+    if name == "skill_taxonomy":
+        return get_skill_taxonomy()
+    if name == "COMMON_SKILLS":
+        return get_skill_taxonomy().names
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Bump whenever extraction or build_metadata changes what a resume parses to;
+# parses stored by app.resume_store under another version are treated as stale.
+PARSER_VERSION = 3
+TAXONOMY_PATH = os.path.join(os.path.dirname(__file__), "data", "skills_taxonomy.json")
+
+@lru_cache(maxsize=1)
+def parser_version():
+    """PARSER_VERSION plus the skill taxonomy version, read without loading spaCy."""
+    with open(TAXONOMY_PATH, encoding="utf-8") as f:
+        return f"{PARSER_VERSION}+{json.load(f).get('version')}"
+
+# Extraction limits for uploads (unset = whole document). Long portfolios stop
+# early instead of being fully decoded and held in memory.
+PDF_MAX_PAGES = int(os.getenv("ATS_PDF_MAX_PAGES", "0")) or None
+PDF_MAX_CHARS = int(os.getenv("ATS_PDF_MAX_CHARS", "0")) or None
+
+class PdfTextStream:
+    """
+    Iterate a PDF's text one page at a time, stopping after max_pages pages or
+    once max_chars characters have been produced (the last page is cut to fit).
+    Pages past the limit are never decoded. pages_processed, chars_processed
+    and truncated describe what was read; page_starts holds the offset of
+    each page in the joined text, for finding running headers and footers.
+    """
+
+    def __init__(self, pdf_bytes, max_pages=None, max_chars=None):
+        self.pdf_bytes = pdf_bytes
+        self.max_pages = max_pages
+        self.max_chars = max_chars
+        self.page_count = None
+        self.pages_processed = 0
+        self.chars_processed = 0
+        self.page_starts = []
+        self.truncated = False
+
+    def __iter__(self):
+        import fitz  # PyMuPDF
+        with fitz.open(stream=self.pdf_bytes, filetype="pdf") as doc:
+            self.page_count = doc.page_count
+            for page in doc:
+                if self.max_pages is not None and self.pages_processed >= self.max_pages:
+                    self.truncated = True
+                    return
+                page_text = page.get_text()
+                self.pages_processed += 1
+                self.page_starts.append(self.chars_processed)
+                remaining = None if self.max_chars is None else self.max_chars - self.chars_processed
+                if remaining is not None and len(page_text) >= remaining:
+                    self.truncated = len(page_text) > remaining or self.pages_processed < self.page_count
+                    page_text = page_text[:remaining]
+                    self.chars_processed += len(page_text)
+                    yield page_text
+                    return
+                self.chars_processed += len(page_text)
+                yield page_text
+
+    def stats(self):
+        return {
+            "pages": self.pages_processed,
+            "page_count": self.page_count,
+            "chars": self.chars_processed,
+            "truncated": self.truncated,
+            "page_starts": self.page_starts,
+        }
+
+@metrics.timed("parse.pdf")
+def extract_text_from_pdf(pdf_bytes, max_pages=None, max_chars=None, stats=None):
+    # join once at the end; repeated += is quadratic on long documents
+    stream = PdfTextStream(pdf_bytes, max_pages=max_pages, max_chars=max_chars)
+    text = "".join(stream)
+    if stats is not None:
+        stats.update(stream.stats())
     return text
 
-def extract_text_from_docx(docx_bytes):
-    doc = docx.Document(io.BytesIO(docx_bytes))
-    text = "\n".join([para.text for para in doc.paragraphs])
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+_RELATIONSHIP = "{http://schemas.openxmlformats.org/package/2006/relationships}Relationship"
+# Run content rendered as text, as python-docx's Run.text does
+_DOCX_RUN_TEXT = {_W + "tab": "\t", _W + "ptab": "\t", _W + "cr": "\n", _W + "noBreakHyphen": "-"}
+
+def _docx_parts(archive):
+    """(header parts, main document part, footer parts) named by the package relationships."""
+    names = set(archive.namelist())
+
+    def relationships(name):
+        return ET.fromstring(archive.read(name)).iter(_RELATIONSHIP) if name in names else ()
+
+    def resolve(folder, target):
+        return target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join(folder, target))
+
+    main = "word/document.xml"
+    for rel in relationships("_rels/.rels"):
+        if rel.get("Type", "").endswith("/officeDocument"):
+            main = resolve("", rel.get("Target"))
+    folder = posixpath.dirname(main)
+    parts = {"header": [], "footer": []}
+    for rel in relationships(posixpath.join(folder, "_rels", posixpath.basename(main) + ".rels")):
+        kind = rel.get("Type", "").rsplit("/", 1)[-1]
+        if kind in parts and rel.get("TargetMode") != "External":
+            parts[kind].append(resolve(folder, rel.get("Target")))
+    return [name for name in parts["header"] if name in names], main, [name for name in parts["footer"] if name in names]
+
+def _docx_paragraphs(part):
+    """
+    Text of every w:p in one XML part, in document order: body paragraphs,
+    table cell paragraphs (row by row), content controls. Text-box paragraphs
+    follow the paragraph they are anchored in. Finished elements are dropped
+    from the tree as soon as they are read, so memory stays bounded by the
+    nesting depth rather than the document size.
+    """
+    parents = []   # open elements
+    open_ps = []   # open paragraphs: (text pieces, texts of paragraphs nested in them)
+    fallback = 0   # inside mc:Fallback, a duplicate of the mc:Choice just before it
+    props = 0      # inside w:pPr, whose w:tab elements are tab stops, not text
+    for event, elem in ET.iterparse(part, events=("start", "end")):
+        tag = elem.tag
+        if event == "start":
+            parents.append(elem)
+            if tag == _MC_FALLBACK:
+                fallback += 1
+            elif tag == _W + "pPr":
+                props += 1
+            elif tag == _W + "p" and not fallback:
+                open_ps.append(([], []))
+            continue
+        parents.pop()
+        if tag == _MC_FALLBACK:
+            fallback -= 1
+        elif tag == _W + "pPr":
+            props -= 1
+        elif fallback or not open_ps:
+            pass
+        elif tag == _W + "t":
+            open_ps[-1][0].append(elem.text or "")
+        elif tag == _W + "br":
+            # line breaks are newlines; page and column breaks are nothing
+            if elem.get(_W + "type", "textWrapping") == "textWrapping":
+                open_ps[-1][0].append("\n")
+        elif tag in _DOCX_RUN_TEXT and not props:
+            open_ps[-1][0].append(_DOCX_RUN_TEXT[tag])
+        elif tag == _W + "p":
+            pieces, nested = open_ps.pop()
+            if open_ps:
+                open_ps[-1][1].extend(["".join(pieces)] + nested)
+            else:
+                yield "".join(pieces)
+                yield from nested
+        if parents:
+            parents[-1].remove(elem)
+
+class DocxTextStream:
+    """
+    Paragraph texts of a .docx, read straight from the zip with incremental XML
+    parsing instead of building a python-docx object tree: word/document.xml,
+    including tables, content controls and text boxes. The page header and
+    footer parts are read after it into header_footer, not yielded: a running
+    "Curriculum Vitae" header must not become the name, nor a footer part of
+    the last section. Empty header/footer paragraphs are skipped.
+    """
+
+    def __init__(self, docx_bytes):
+        self.docx_bytes = docx_bytes
+        self.paragraphs = 0
+        self.chars_processed = 0
+        self.header_footer = []
+
+    def __iter__(self):
+        with zipfile.ZipFile(io.BytesIO(self.docx_bytes)) as archive:
+            headers, main, footers = _docx_parts(archive)
+            with archive.open(main) as part:
+                for text in _docx_paragraphs(part):
+                    self.paragraphs += 1
+                    self.chars_processed += len(text)
+                    yield text
+            for name in headers + footers:
+                with archive.open(name) as part:
+                    self.header_footer.extend(text for text in _docx_paragraphs(part) if text)
+
+    def stats(self):
+        return {
+            "pages": None,
+            "page_count": None,
+            "paragraphs": self.paragraphs,
+            "chars": self.chars_processed,
+            "truncated": False,
+            "header_footer_text": "\n".join(self.header_footer),
+        }
+
+@metrics.timed("parse.docx")
+def extract_text_from_docx(docx_bytes, stats=None):
+    stream = DocxTextStream(docx_bytes)
+    text = "\n".join(stream)
+    if stats is not None:
+        stats.update(stream.stats())
     return text
 
 def extract_email(text):
@@ -44,44 +276,82 @@ def extract_name(text):
             return line
     return lines[0] if lines else ""
 
+def skills_from_doc(doc):
+    return get_skill_taxonomy().match(doc)
+
+@metrics.timed("parse.skills")
 def extract_skills(text):
-    tokens = set([token.text.lower() for token in nlp(text)])
-    found = [skill for skill in COMMON_SKILLS if skill in tokens]
-    for chunk in nlp(text).noun_chunks:
-        c = chunk.text.lower()
-        if c not in found and c in COMMON_SKILLS:
-            found.append(c)
-    return list(set(found))
+    return skills_from_doc(get_nlp().make_doc(text))
+
+def extract_skills_batch(texts, batch_size=32, n_process=1):
+    """
+    Yield the skills list for each text, streaming them through nlp.pipe.
+    n_process > 1 forks spaCy workers; worth it for thousands of resumes.
+    """
+    for doc in get_nlp().pipe(texts, batch_size=batch_size, n_process=n_process):
+        yield skills_from_doc(doc)
 
 # --- Improved robust experience year extraction ---
+DATE_RANGE_PATTERN = re.compile(
+    r'([a-z]{3,9}[\s/.,-]*)?(\d{4})\s*[-–—to]{1,3}\s*([a-z]{3,9}[\s/.,-]*)?(\d{4}|present)',
+    re.IGNORECASE
+)
+
+# Same month names dateutil recognises
+MONTHS = {
+    "jan": 1, "january": 1, "feb": 2, "february": 2, "mar": 3, "march": 3,
+    "apr": 4, "april": 4, "may": 5, "jun": 6, "june": 6, "jul": 7, "july": 7,
+    "aug": 8, "august": 8, "sep": 9, "sept": 9, "september": 9,
+    "oct": 10, "october": 10, "nov": 11, "november": 11, "dec": 12, "december": 12,
+}
+# "Jan", "Jan.", "jan, " -- forms dateutil reads as month + year. Anything else
+# (unknown words, "jan/" or "jan-" which dateutil rejects) takes the slow path.
+_MONTH_PART = re.compile(r"([a-z]+)[\s.,]*")
+
+@lru_cache(maxsize=4096)
 def parse_date_safe(date_str):
     try:
         return dateparser.parse(date_str, default=datetime(1900, 1, 1), fuzzy=True)
     except Exception:
         return None
 
+def parse_month_year(month_part, year):
+    """
+    Fast path for the regex groups of DATE_RANGE_PATTERN: a month table lookup
+    instead of fuzzy dateutil parsing, with the same result (day 1, January
+    when no month). Unrecognised forms fall back to memoized dateutil.
+    """
+    if not month_part:
+        month = 1
+    else:
+        m = _MONTH_PART.fullmatch(month_part)
+        month = MONTHS.get(m.group(1)) if m else None
+    if month is not None and year != "0000":
+        return datetime(int(year), month, 1)
+    return parse_date_safe(f"{month_part} {year}".strip())
+
+@metrics.timed("parse.experience_years")
 def extract_experience_years(text):
     """
     Finds all date ranges in the text, sums up non-overlapping durations (in years).
     Supports 'YYYY–YYYY', 'MMM YYYY–MMM YYYY', 'Month YYYY–Present', etc.
     """
-    text = text.replace('–', '-').replace('—', '-').replace('to', '-').lower()
-    date_range_pattern = re.compile(
-        r'([a-z]{3,9}[\s/.,-]*)?(\d{4})\s*[-–—to]{1,3}\s*([a-z]{3,9}[\s/.,-]*)?(\d{4}|present)',
-        re.IGNORECASE
-    )
+    # "to" separators are already covered by the pattern; rewriting every "to"
+    # would corrupt words such as "October" or "Toronto"
+    text = text.replace('–', '-').replace('—', '-').lower()
     intervals = []
-    for match in date_range_pattern.finditer(text):
-        start_month = match.group(1) or ""
-        start_year = match.group(2)
-        end_month = match.group(3) or ""
+    now = None
+    for match in DATE_RANGE_PATTERN.finditer(text):
+        start_dt = parse_month_year(match.group(1) or "", match.group(2))
         end_year = match.group(4)
-        start_text = f"{start_month} {start_year}".strip()
-        end_text = f"{end_month} {end_year}".strip()
-        start_dt = parse_date_safe(start_text)
-        end_dt = parse_date_safe(end_text) if 'present' not in end_year.lower() else datetime.now()
+        if end_year == "present":
+            now = now or datetime.now()
+            end_dt = now
+        else:
+            end_dt = parse_month_year(match.group(3) or "", end_year)
         if start_dt and end_dt and end_dt > start_dt:
             intervals.append((start_dt, end_dt))
+    # Merge overlapping intervals, then sum whole months
     intervals.sort()
     merged = []
     for start, end in intervals:
@@ -98,32 +368,96 @@ def extract_experience_years(text):
 
 # ----------- Enhanced Section Extraction -------------
 
-def extract_section(text, section_names, next_section_names):
-    lines = text.splitlines()
-    section_start, section_end = -1, -1
-    for idx, line in enumerate(lines):
-        for sec in section_names:
-            if sec in line.strip().lower():
-                section_start = idx
-                break
-        if section_start != -1:
-            break
-    if section_start == -1:
-        return ""
-    for idx in range(section_start + 1, len(lines)):
-        for nsec in next_section_names:
-            if nsec in lines[idx].strip().lower():
-                section_end = idx
-                break
-        if section_end != -1:
-            break
-    content = lines[section_start+1:section_end] if section_end != -1 else lines[section_start+1:]
-    return "\n".join(content).strip()
-
-def extract_education(text):
-    headers = ["education", "educational background", "academic background", "academic qualification"]
-    next_headers = ["experience", "work experience", "projects", "skills", "summary", "certifications"]
-    section = extract_section(text, headers, next_headers)
+# Start headers and the headers that end each section
+SECTION_HEADERS = {
+    "education": (
+        ["education", "educational background", "academic background", "academic qualification"],
+        ["experience", "work experience", "projects", "skills", "summary", "certifications"],
+    ),
+    "experience": (
+        ["experience", "work experience", "professional experience", "employment history"],
+        ["projects", "skills", "education", "academic", "summary", "certifications"],
+    ),
+    "projects": (
+        ["project", "projects", "academic projects", "notable projects", "key projects"],
+        ["experience", "work experience", "skills", "education", "summary", "certifications"],
+    ),
+}
+# Line keywords used by app.ats_scoring_engine
+SECTION_KEYWORDS = {"skills": "skill", "education": "educat", "experience": "experienc",
+                    "projects": "project", "summary": "summary"}
+
+KNOWN_HEADERS = sorted(
+    {h for starts, ends in SECTION_HEADERS.values() for h in starts + ends} | set(SECTION_KEYWORDS.values()),
+    key=len, reverse=True,
+)
+_HEADER_PATTERN = re.compile("|".join(re.escape(h) for h in KNOWN_HEADERS))
+
+class SectionIndex:
+    """
+    One pass over the resume lines recording which known headers each line
+    contains (substring match, as the extractors always used). All section
+    extractors read from this instead of re-splitting and re-scanning the text.
+    """
+
+    def __init__(self, text):
+        self.lines = text.splitlines()
+        self.header_lines = {}  # header -> ascending line numbers containing it
+        for idx, line in enumerate(self.lines):
+            low = line.lower()
+            # Most lines contain no header at all; one compiled search rules them out
+            if _HEADER_PATTERN.search(low) is None:
+                continue
+            for header in KNOWN_HEADERS:
+                if header in low:
+                    self.header_lines.setdefault(header, []).append(idx)
+
+    def first_line(self, headers, after=-1):
+        """First line number > after containing any of headers, or -1."""
+        best = -1
+        for header in headers:
+            found = self.header_lines.get(header)
+            if not found:
+                continue
+            pos = bisect.bisect_right(found, after)
+            if pos < len(found) and (best == -1 or found[pos] < best):
+                best = found[pos]
+        return best
+
+    def span(self, section_names, next_section_names):
+        """(start, end) line span of the section body, or None if absent."""
+        header = self.first_line(section_names)
+        if header == -1:
+            return None
+        end = self.first_line(next_section_names, after=header)
+        return header + 1, end if end != -1 else len(self.lines)
+
+    @property
+    def spans(self):
+        """Section name -> body line span for every section found."""
+        found = {}
+        for name, (starts, ends) in SECTION_HEADERS.items():
+            span = self.span(starts, ends)
+            if span is not None:
+                found[name] = span
+        return found
+
+    def section_text(self, section_names, next_section_names):
+        span = self.span(section_names, next_section_names)
+        if span is None:
+            return ""
+        return "\n".join(self.lines[span[0]:span[1]]).strip()
+
+    def lines_with(self, keyword):
+        return [self.lines[idx] for idx in self.header_lines.get(keyword, [])]
+
+def extract_section(text, section_names, next_section_names, index=None):
+    index = index or SectionIndex(text)
+    return index.section_text(section_names, next_section_names)
+
+def extract_education(text, index=None):
+    headers, next_headers = SECTION_HEADERS["education"]
+    section = extract_section(text, headers, next_headers, index)
     degree_lines = []
     for line in section.splitlines():
         if any(deg in line.lower() for deg in [
@@ -134,10 +468,9 @@ def extract_education(text):
             degree_lines.append(line.strip())
     return degree_lines if degree_lines else section
 
-def extract_experience(text):
-    headers = ["experience", "work experience", "professional experience", "employment history"]
-    next_headers = ["projects", "skills", "education", "academic", "summary", "certifications"]
-    section = extract_section(text, headers, next_headers)
+def extract_experience(text, index=None):
+    headers, next_headers = SECTION_HEADERS["experience"]
+    section = extract_section(text, headers, next_headers, index)
     exp_chunks = []
     for line in section.splitlines():
         match = re.search(r"([\w\s&\.,\-\/]+),\s*([\w\s&\.,\-\/]+),?\s*(\d{4}.+)?", line)
@@ -147,10 +480,9 @@ def extract_experience(text):
             exp_chunks.append(line.strip())
     return exp_chunks if exp_chunks else section
 
-def extract_projects(text):
-    headers = ["project", "projects", "academic projects", "notable projects", "key projects"]
-    next_headers = ["experience", "work experience", "skills", "education", "summary", "certifications"]
-    section = extract_section(text, headers, next_headers)
+def extract_projects(text, index=None):
+    headers, next_headers = SECTION_HEADERS["projects"]
+    section = extract_section(text, headers, next_headers, index)
     project_lines = []
     for line in section.splitlines():
         if ":" in line or (len(line.split()) < 10 and line.istitle()):
@@ -159,33 +491,125 @@ def extract_projects(text):
             project_lines.append(line.strip())
     return project_lines if project_lines else section
 
+def extract_text(file_bytes, filename, stats=None):
+    if filename.lower().endswith(".pdf"):
+        return extract_text_from_pdf(file_bytes, PDF_MAX_PAGES, PDF_MAX_CHARS, stats=stats)
+    elif filename.lower().endswith(".docx"):
+        return extract_text_from_docx(file_bytes, stats=stats)
+    raise ValueError("Unsupported file type.")
+
+@metrics.timed("parse.metadata")
+def build_metadata(text, index=None, header_footer_text=""):
+    """
+    header_footer_text (DOCX page headers/footers) is only a fallback for the
+    email and phone; the name and sections come from the body text.
+    """
+    with metrics.span("parse.sections"):
+        index = index or SectionIndex(text)
+        education = extract_education(text, index)
+        experience = extract_experience(text, index)
+        projects = extract_projects(text, index)
+    return {
+        "name": extract_name(text),
+        "email": extract_email(text) or extract_email(header_footer_text),
+        "phone": extract_phone(text) or extract_phone(header_footer_text),
+        "skills": extract_skills(text),
+        "experience_years": extract_experience_years(text),
+        "education": education,
+        "experience": experience,
+        "projects": projects,
+        "raw_text": text,
+    }
+
+# ----------- Parsed resume shared across scorers -------------
+
+class ParsedResume:
+    """
+    A resume whose text is extracted exactly once. Every scorer and the report
+    generator take this object instead of raw bytes; metadata (the spaCy work)
+    is built lazily on first access so text-only consumers never wait for it.
+    """
+
+    def __init__(self, content_hash, filename, text, metadata=None, extraction=None):
+        self.content_hash = content_hash
+        self.filename = filename
+        self.text = text
+        # pages/chars processed by the extractor and whether it stopped early
+        self.extraction = extraction or {}
+        self._metadata = metadata
+        self._sections = None
+        self._lock = threading.Lock()
+
+    @property
+    def sections(self):
+        if self._sections is None:
+            self._sections = SectionIndex(self.text)
+        return self._sections
+
+    @property
+    def metadata(self):
+        if self._metadata is None:
+            with self._lock:
+                if self._metadata is None:
+                    self._metadata = build_metadata(
+                        self.text, self.sections, self.extraction.get("header_footer_text", "")
+                    )
+        return self._metadata
+
+    def __getstate__(self):
+        # Locks cannot be pickled; process pools ship ParsedResume between workers
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def with_filename(self, filename):
+        if filename == self.filename:
+            return self
+        return ParsedResume(self.content_hash, filename, self.text, self._metadata, self.extraction)
+
+def content_hash(file_bytes):
+    return hashlib.sha256(file_bytes).hexdigest()
+
+# Bounded in-process LRU so a re-submitted file skips extraction entirely
+PARSE_CACHE_SIZE = 32
+_parse_cache = OrderedDict()
+_parse_cache_lock = threading.Lock()
+
+def parse_resume(file_bytes, filename):
+    key = (content_hash(file_bytes), filename.lower().rsplit(".", 1)[-1])
+    with _parse_cache_lock:
+        cached = _parse_cache.get(key)
+        if cached is not None:
+            _parse_cache.move_to_end(key)
+    if cached is not None:
+        return cached.with_filename(filename)
+
+    stats = {}
+    text = extract_text(file_bytes, filename, stats=stats)
+    resume = ParsedResume(key[0], filename, text, extraction=stats)
+    with _parse_cache_lock:
+        _parse_cache[key] = resume
+        _parse_cache.move_to_end(key)
+        while len(_parse_cache) > PARSE_CACHE_SIZE:
+            _parse_cache.popitem(last=False)
+    return resume
+
+def resume_metadata(resume):
+    """Accept either a ParsedResume or an already-built metadata dict."""
+    return resume.metadata if isinstance(resume, ParsedResume) else resume
+
 def extract_metadata(file_bytes, filename):
     try:
-        if filename.lower().endswith(".pdf"):
-            text = extract_text_from_pdf(file_bytes)
-        elif filename.lower().endswith(".docx"):
-            text = extract_text_from_docx(file_bytes)
-        else:
-            raise ValueError("Unsupported file type.")
-
-        metadata = {
-            "name": extract_name(text),
-            "email": extract_email(text),
-            "phone": extract_phone(text),
-            "skills": extract_skills(text),
-            "experience_years": extract_experience_years(text),
-            "education": extract_education(text),
-            "experience": extract_experience(text),
-            "projects": extract_projects(text),
-            "raw_text": text,
-        }
-        return metadata
-    except Exception as e:
-        print(f"Error extracting metadata: {e}")
+        return parse_resume(file_bytes, filename).metadata
+    except Exception:
+        logger.exception("Error extracting metadata from %s", filename)
         return None
 
 
-
 def format_gemini_feedback(feedback_text):
     """Convert markdown-like AI feedback to clean, pretty HTML for Streamlit."""
     text = re.sub(r'\*\*(.+?)\*\*', r'<b>\1</b>', feedback_text)
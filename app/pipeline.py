@@ -0,0 +1,181 @@
+# app/pipeline.py
+"""
+The resume analysis as a dependency graph of memoized stages.
+
+    pipeline = analysis_pipeline()
+    pipeline.update(file_bytes=data, filename="cv.pdf", jd=jd, level="mid")
+    results = pipeline.run()            # {"resume", "metadata", ..., "comparison"}
+    pipeline.update(level="senior")
+    pipeline.run()                      # re-runs only "traditional" and "comparison"
+
+Each stage names the inputs or stages it reads. update() bumps the version of
+every input whose value actually changed; run() then recomputes exactly the
+stages downstream of those inputs and reuses every other result, so editing
+the JD never re-parses the resume and a level change never calls Gemini.
+
+Stages marked background (the Gemini call, which only needs the text) start
+on a worker thread as soon as their dependencies exist, while the CPU-bound
+stages (extraction, spaCy, rule scoring) keep running on the calling thread.
+spaCy is therefore never used from two threads at once.
+"""
+
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from app.ai_scoring import ai_ats_score
+from app.comparator import compare_scores
+from app.parsers import parse_resume
+from app.scoring import compile_jd, jd_based_score, traditional_ats_score
+
+class Stage:
+    def __init__(self, name, fn, deps, background=False):
+        self.name = name
+        self.fn = fn
+        self.deps = tuple(deps)
+        self.background = background
+
+class Pipeline:
+    def __init__(self, inputs, stages, max_workers=4):
+        self.inputs = tuple(inputs)
+        self.stages = {stage.name: stage for stage in stages}
+        for stage in stages:
+            unknown = [dep for dep in stage.deps if dep not in self.inputs and dep not in self.stages]
+            if unknown:
+                raise ValueError(f"stage {stage.name!r} depends on unknown {unknown}")
+        self.max_workers = max_workers
+        self._values = {}    # input or stage name -> current value
+        self._versions = {}  # input or stage name -> bumped on every change
+        self._seen = {}      # stage name -> dep versions it was computed from
+        self.last_run = []   # stages recomputed by the latest run()
+
+    def update(self, **inputs):
+        """Set inputs; only values that differ from the current ones invalidate anything."""
+        for name, value in inputs.items():
+            if name not in self.inputs:
+                raise KeyError(f"unknown input {name!r}")
+            if name in self._values and self._values[name] == value:
+                continue
+            self._values[name] = value
+            self._versions[name] = self._versions.get(name, 0) + 1
+
+    def stale(self, name, _memo=None):
+        """Whether a stage would be recomputed by the next run()."""
+        memo = {} if _memo is None else _memo
+        if name not in memo:
+            stage = self.stages[name]
+            seen = self._seen.get(name)
+            memo[name] = (
+                seen is None
+                or any(self.stale(dep, memo) for dep in stage.deps if dep in self.stages)
+                or seen != tuple(self._versions.get(dep, 0) for dep in stage.deps)
+            )
+        return memo[name]
+
+    def _plan(self, targets):
+        """Stale stages needed for targets, in an order where dependencies come first
+        and background stages start as early as their dependencies allow."""
+        memo, needed = {}, set()
+
+        def visit(name):
+            if name in needed or name not in self.stages or not self.stale(name, memo):
+                return
+            needed.add(name)
+            for dep in self.stages[name].deps:
+                visit(dep)
+
+        for target in targets:
+            visit(target)
+        order, done = [], set()
+        while len(order) < len(needed):
+            ready = [name for name in self.stages if name in needed and name not in done
+                     and all(dep not in needed or dep in done for dep in self.stages[name].deps)]
+            ready.sort(key=lambda name: not self.stages[name].background)
+            order.append(ready[0])
+            done.add(ready[0])
+        return order
+
+    def _compute(self, stage):
+        """Run one stage; returns (value, dep versions it was computed from)."""
+        args = []
+        for dep in stage.deps:
+            value = self._values.get(dep)
+            if isinstance(value, Future):
+                if stage.background:
+                    value = value.result()[0]
+                else:
+                    # on the calling thread: commit the finished background stage first
+                    self._commit(dep, *value.result())
+                    value = self._values[dep]
+            args.append(value)
+        versions = tuple(self._versions.get(dep, 0) for dep in stage.deps)
+        return stage.fn(*args), versions
+
+    def _commit(self, name, value, versions):
+        self._values[name] = value
+        self._versions[name] = self._versions.get(name, 0) + 1
+        self._seen[name] = versions
+
+    def run(self, *targets):
+        """
+        Bring targets (default: every stage) up to date and return {name: value}
+        for all inputs and computed stages. An exception in any stage propagates;
+        stages that finished before it keep their results.
+        """
+        missing = [name for name in self.inputs if name not in self._values]
+        if missing:
+            raise ValueError(f"missing inputs: {missing}")
+        order = self._plan(targets or list(self.stages))
+        self.last_run = order
+        try:
+            with ThreadPoolExecutor(self.max_workers) as executor:
+                for name in order:
+                    stage = self.stages[name]
+                    if stage.background:
+                        # dependents see the future and wait for it only when they run
+                        self._values[name] = executor.submit(self._compute, stage)
+                    else:
+                        self._commit(name, *self._compute(stage))
+                for name in order:
+                    if isinstance(self._values.get(name), Future):
+                        self._commit(name, *self._values[name].result())
+        finally:
+            # a background stage that failed (or never ran) leaves its future behind
+            for name in order:
+                if isinstance(self._values.get(name), Future):
+                    del self._values[name]
+                    self._seen.pop(name, None)
+        return dict(self._values)
+
+def _jd_match(metadata, compiled_jd):
+    # jd_based_score does not use the level, so the stage does not depend on it
+    return jd_based_score(metadata, compiled_jd, None) if compiled_jd else None
+
+def _ai(resume, jd):
+    # The prompt only carries the text and the JD, so a level change never costs another Gemini call
+    return ai_ats_score(resume, jd)
+
+def _comparison(traditional, ai, jd_match):
+    return compare_scores(traditional, ai[0], jd_match)
+
+def analysis_pipeline(ai=_ai, max_workers=4, uploads=None):
+    """
+    The upload analysis used by the Streamlit UI. Inputs: file_bytes, filename,
+    jd, level. Pass ai=None for a rule-only pipeline (ai result (0, "")), or
+    another (resume, jd) -> (score, feedback) callable. With uploads (an
+    app.upload_store.UploadStore) the file_bytes input becomes upload_key, and
+    the bytes are read from the store only while the resume is parsed.
+    """
+    source, parse = "file_bytes", parse_resume
+    if uploads is not None:
+        def parse(upload_key, filename):
+            return parse_resume(uploads.read(upload_key), filename)
+        source = "upload_key"
+    stages = [
+        Stage("resume", parse, [source, "filename"]),
+        Stage("metadata", lambda resume: resume.metadata, ["resume"]),
+        Stage("compiled_jd", lambda jd: compile_jd(jd) if jd else None, ["jd"]),
+        Stage("traditional", traditional_ats_score, ["metadata", "level"]),
+        Stage("jd_match", _jd_match, ["metadata", "compiled_jd"]),
+        Stage("ai", ai or (lambda resume, jd: (0, "")), ["resume", "jd"], background=ai is not None),
+        Stage("comparison", _comparison, ["traditional", "ai", "jd_match"]),
+    ]
+    return Pipeline([source, "filename", "jd", "level"], stages, max_workers=max_workers)
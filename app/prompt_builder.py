@@ -0,0 +1,239 @@
+# app/prompt_builder.py
+"""
+Token-budgeted resume and JD text for Gemini prompts.
+
+    resume_part, jd_part, stats = fit_to_budget(resume.text, jd, budget=6000)
+
+The resume is cleaned first: whitespace runs collapse and blank lines
+collapse. When the PDF page boundaries are known (ParsedResume.extraction
+["page_starts"], from PdfTextStream), the running header/footer PyMuPDF
+emits on every page goes too: a line among the first (or last) MARGIN_LINES
+of at least half the pages (ignoring digits, so "Page 1 | ..." and "Page 2
+| ..." count as one) is kept where it first appears and dropped from the
+other pages' top (or bottom) margins, and page numbers in a margin are
+dropped. Body lines
+are never removed, however often they repeat. If the result
+still does not fit, the budget is split across the sections SectionIndex
+finds, weighted by SECTION_WEIGHTS; a section that needs less than its share
+hands the rest to the others, and each keeps its leading lines (the most
+recent roles come first) up to its share.
+
+The JD gets at most JD_BUDGET_SHARE of the budget. Over that, only its
+requirement-bearing lines (requirements, skills, responsibilities, bullets)
+are kept, and company blurbs, benefits and legal boilerplate are dropped.
+
+Tokens are estimated at CHARS_PER_TOKEN characters each, the usual figure
+for Gemini on English text; no API call is made to count them.
+"""
+
+import math
+import os
+import re
+
+from app.parsers import SectionIndex
+
+# Even with the JD at its full share, the resume keeps ~4,100 tokens (~16,000
+# characters), more than the 15,000 characters prompts used to be cut to
+PROMPT_TOKEN_BUDGET = int(os.getenv("ATS_PROMPT_TOKEN_BUDGET", "6000"))
+JD_BUDGET_SHARE = 0.3
+CHARS_PER_TOKEN = 4.0
+OMITTED = "[...]"
+# Lines at the top and at the bottom of a page that may be a running header/footer
+MARGIN_LINES = 2
+
+# Share of the resume budget per section when it has to be cut
+SECTION_WEIGHTS = {"header": 1.0, "experience": 3.0, "projects": 2.0, "education": 1.0, "other": 1.5}
+
+_SPACES = re.compile(r"[ \t\u00a0\u2000-\u200b]+")
+_DIGITS = re.compile(r"\d+")
+_PAGE_NUMBER = re.compile(r"^(page\s*)?\d+(\s*(of|/)\s*\d+)?$", re.IGNORECASE)
+
+_BULLET = re.compile(r"^[\-\*•●▪◦·‣]\s*")
+_REQUIREMENT = re.compile(
+    r"\b(requir|must|should|experience|skill|qualif|responsib|proficien|knowledge|degree|years?|"
+    r"familiar|expert|ability|able to|you will|you'll|nice to have|plus|bonus|stack|tools?|"
+    r"design|build|develop|own|lead|mentor|work with)",
+    re.IGNORECASE,
+)
+_BOILERPLATE = re.compile(
+    r"\b(about us|who we are|our (mission|story|culture|values)|benefits|perks|we offer|salary|"
+    r"compensation|equal opportunity|diversity|disabilit|accommodation|apply|application|visa|"
+    r"privacy|follow us|recruit)",
+    re.IGNORECASE,
+)
+
+def estimate_tokens(text):
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+def page_starts_of(resume):
+    """The PDF page offsets recorded when resume (a ParsedResume, or plain text) was extracted."""
+    return (getattr(resume, "extraction", None) or {}).get("page_starts")
+
+def _pages(text, page_starts):
+    """text split at the page_starts character offsets; the whole text as one page without them."""
+    if not page_starts or len(page_starts) < 2:
+        return [text]
+    bounds = list(page_starts[1:]) + [len(text)]
+    return [text[start:end] for start, end in zip([0] + bounds[:-1], bounds)]
+
+def _margins(lines):
+    """Indexes of the first and of the last MARGIN_LINES non-blank lines."""
+    filled = [i for i, line in enumerate(lines) if line]
+    return set(filled[:MARGIN_LINES]), set(filled[-MARGIN_LINES:])
+
+def clean_text(text, page_starts=None):
+    """Collapse whitespace; drop page numbers and running header/footer lines from page margins."""
+    pages = [[_SPACES.sub(" ", raw).strip() for raw in page.splitlines()] for page in _pages(text or "", page_starts)]
+    multipage = len(pages) > 1
+    margins = [_margins(lines) if multipage else (set(), set()) for lines in pages]
+    # running header (footer) keys: in the top (bottom) margin of at least half the pages
+    running = []
+    for side in (0, 1):
+        counts = {}
+        for lines, margin in zip(pages, margins):
+            for key in {_DIGITS.sub("#", lines[i].lower()) for i in margin[side]}:
+                counts[key] = counts.get(key, 0) + 1
+        running.append({key for key, n in counts.items() if n >= 2 and n * 2 >= len(pages)})
+
+    out, seen, blank = [], set(), False
+    for lines, (top, bottom) in zip(pages, margins):
+        for i, line in enumerate(lines):
+            if not line:
+                if out and not blank:
+                    out.append("")
+                blank = True
+                continue
+            if i in top or i in bottom:
+                if _PAGE_NUMBER.match(line):
+                    continue
+                key = _DIGITS.sub("#", line.lower())
+                if (i in top and key in running[0]) or (i in bottom and key in running[1]):
+                    # kept where it first appears: a name/contact header carries information once
+                    if key in seen:
+                        continue
+                    seen.add(key)
+            out.append(line)
+            blank = False
+    return "\n".join(out).strip()
+
+def split_sections(text):
+    """[(section name, lines)] covering text in order; unsectioned lines are "header"/"other"."""
+    lines = text.splitlines()
+    spans = sorted((start - 1, end, name) for name, (start, end) in SectionIndex(text).spans.items())
+    blocks, pos = [], 0
+    for i, (head, end, name) in enumerate(spans):
+        if head < pos:
+            continue  # shares lines with the section before it
+        if head > pos:
+            blocks.append(("other" if blocks else "header", lines[pos:head]))
+        next_head = spans[i + 1][0] if i + 1 < len(spans) else len(lines)
+        end = min(end, max(next_head, head + 1))
+        blocks.append((name, lines[head:end]))
+        pos = end
+    if pos < len(lines):
+        blocks.append(("other" if blocks else "header", lines[pos:]))
+    return blocks
+
+def allocate(needs, weights, budget):
+    """
+    Split budget across items in proportion to weights without giving any
+    item more than it needs; what one item leaves unused goes to the rest.
+    """
+    alloc = [0] * len(needs)
+    open_items = [i for i, need in enumerate(needs) if need > 0]
+    remaining = budget
+    while open_items and remaining > 0:
+        total_weight = sum(weights[i] for i in open_items)
+        satisfied = [i for i in open_items if needs[i] <= remaining * weights[i] / total_weight]
+        if not satisfied:
+            for i in open_items:
+                alloc[i] = int(remaining * weights[i] / total_weight)
+            break
+        for i in satisfied:
+            alloc[i] = needs[i]
+            remaining -= needs[i]
+        open_items = [i for i in open_items if i not in satisfied]
+    return alloc
+
+def truncate_lines(lines, budget):
+    """Leading lines that fit in budget tokens, plus an omission marker if any were cut."""
+    kept, used = [], 0
+    marker = estimate_tokens(OMITTED) + 1
+    for i, line in enumerate(lines):
+        cost = estimate_tokens(line) + 1  # +1 for the newline
+        if used + cost > budget - (marker if i < len(lines) - 1 else 0):
+            room = int((budget - used - marker) * CHARS_PER_TOKEN)
+            if room > 20:
+                kept.append(line[:room])
+            kept.append(OMITTED)
+            return kept
+        kept.append(line)
+        used += cost
+    return kept
+
+def fit_resume(text, budget, page_starts=None):
+    """Cleaned resume text within budget tokens, and {section: tokens kept}."""
+    blocks = split_sections(clean_text(text, page_starts))
+    needs = [estimate_tokens("\n".join(lines)) + 1 for _, lines in blocks]
+    if sum(needs) > budget:
+        alloc = allocate(needs, [SECTION_WEIGHTS.get(name, 1.0) for name, _ in blocks], budget)
+        blocks = [(name, truncate_lines(lines, tokens) if tokens < need else lines)
+                  for (name, lines), tokens, need in zip(blocks, alloc, needs)]
+    sections = {}
+    for name, lines in blocks:
+        sections[name] = sections.get(name, 0) + estimate_tokens("\n".join(lines))
+    return "\n".join(line for _, lines in blocks for line in lines).strip(), sections
+
+def trim_jd(jd, budget):
+    """The JD within budget tokens, keeping requirement-bearing lines first."""
+    text = clean_text(jd)
+    if estimate_tokens(text) <= budget:
+        return text
+    scored, in_boilerplate = [], False
+    for line in text.splitlines():
+        is_heading = len(line) < 60 and not _BULLET.match(line) and not line.endswith(".")
+        if is_heading:
+            in_boilerplate = bool(_BOILERPLATE.search(line))
+        score = 0
+        if _REQUIREMENT.search(line):
+            score += 2
+        if _BULLET.match(line):
+            score += 1
+        if in_boilerplate or _BOILERPLATE.search(line):
+            score -= 3
+        scored.append((line, score))
+    # best lines first, but emitted in their original order
+    ranked = sorted(range(len(scored)), key=lambda i: -scored[i][1])
+    keep, used = set(), 0
+    for i in ranked:
+        line, score = scored[i]
+        cost = estimate_tokens(line) + 1
+        if score <= 0 and keep:
+            break
+        if used + cost > budget:
+            continue
+        keep.add(i)
+        used += cost
+    if not keep:
+        return text[:int(budget * CHARS_PER_TOKEN)]
+    return "\n".join(scored[i][0] for i in sorted(keep))
+
+def fit_to_budget(resume_text, jd, budget=PROMPT_TOKEN_BUDGET, overhead=0, page_starts=None):
+    """
+    (resume text, JD text, stats) for a prompt of at most budget tokens, of
+    which overhead is already taken by the template. stats has the token
+    counts before and after and the tokens kept per resume section.
+    page_starts: the resume's PDF page offsets, if known.
+    """
+    available = max(budget - overhead, 0)
+    jd_text = trim_jd(jd, int(available * JD_BUDGET_SHARE)) if jd else ""
+    resume_part, sections = fit_resume(resume_text, available - estimate_tokens(jd_text), page_starts)
+    stats = {
+        "budget": budget,
+        "resume_tokens_in": estimate_tokens(resume_text or ""),
+        "jd_tokens_in": estimate_tokens(jd or ""),
+        "resume_tokens": estimate_tokens(resume_part),
+        "jd_tokens": estimate_tokens(jd_text),
+        "sections": sections,
+    }
+    return resume_part, jd_text, stats
@@ -0,0 +1,313 @@
+# app/report.py
+"""
+ATS summary PDF reports.
+
+    python -m app.report results.jsonl --out reports/ --workers 8
+
+Parsing DejaVuSans.ttf dominates the cost of a small report, so each process
+subsets it once to REPORT_CHARSET and parses that subset once; every report
+then starts from a copy of the prepared font. A report whose text needs a
+glyph outside the subset falls back to the full font file.
+
+The CLI renders one PDF per record of an app.batch results file, in a worker
+pool, writing each report straight to disk.
+"""
+
+import argparse
+import copy
+import datetime
+import io
+import json
+import logging
+import multiprocessing
+import os
+import re
+import sys
+import threading
+import time
+from fpdf import FPDF
+from fpdf.enums import XPos, YPos
+from app import metrics
+
+FONT_PATH = os.path.join(os.path.dirname(__file__), "fonts", "DejaVuSans.ttf")
+
+# Latin, Greek, Cyrillic, punctuation, currency, arrows and the symbol blocks
+# the report itself prints (✔ ✗ ⚠ •)
+REPORT_CHARSET_RANGES = [
+    (0x20, 0x7E), (0xA0, 0x24F), (0x370, 0x3FF), (0x400, 0x4FF), (0x2000, 0x206F),
+    (0x20A0, 0x20CF), (0x2100, 0x214F), (0x2190, 0x22FF), (0x2500, 0x27BF), (0xFE0F, 0xFE0F),
+]
+# Layout tables fpdf never uses (it drops them when embedding too)
+UNUSED_FONT_TABLES = ["FFTM", "GDEF", "GPOS", "GSUB", "MATH", "hdmx", "meta"]
+
+logger = logging.getLogger(__name__)
+
+# --- PDF Generator for ATS summary ---
+
+def strip_html(text):
+    # Remove HTML tags for clean PDF output
+    return re.sub('<[^<]+?>', '', text)
+def clean_text(text):
+    if not isinstance(text, str):
+        return str(text)
+    return ''.join(c for c in text if c.isprintable() or c in '\n\t')
+
+class PDF(FPDF):
+    def set_font(self, family=None, style="", size=0):
+        # "B" has always been the regular DejaVu face under a bold key. The
+        # prepared font registers only that face, so it is embedded just once.
+        if style == "B" and (family or "").lower() == "dejavu" and "dejavub" not in self.fonts:
+            style = ""
+        super().set_font(family, style, size)
+
+    def header(self):
+        self.set_font("DejaVu", "B", 16)
+        self.cell(
+            0, 10, clean_text("ATS Resume Analysis Report"),
+            align='C', new_x=XPos.LMARGIN, new_y=YPos.NEXT
+        )
+        self.ln(4)
+
+class PreparedFont:
+    """
+    DejaVu subset to REPORT_CHARSET, parsed once per process. install() builds
+    fpdf2's font object by hand (TTFFont, SubsetMap, pdf.fonts), which are not
+    public API, so requirements.txt pins fpdf2 to the 2.8 series it was tested on.
+    """
+
+    def __init__(self, path=FONT_PATH):
+        from fontTools import subset, ttLib
+        from fpdf.fonts import TTFFont
+
+        font = ttLib.TTFont(path, recalcTimestamp=False)
+        options = subset.Options(notdef_outline=True, recommended_glyphs=True, layout_features=[])
+        options.drop_tables += UNUSED_FONT_TABLES
+        subsetter = subset.Subsetter(options)
+        subsetter.populate(unicodes=[c for lo, hi in REPORT_CHARSET_RANGES for c in range(lo, hi + 1)])
+        subsetter.subset(font)
+        buf = io.BytesIO()
+        font.save(buf)
+        self.data = buf.getvalue()
+
+        self.template = TTFFont(FPDF(), io.BytesIO(self.data), "dejavu", "")
+        self.charset = frozenset(self.template.cmap)
+
+    def covers(self, text):
+        charset = self.charset
+        return all(ord(c) in charset for c in text if c not in "\n\t")
+
+    def install(self, pdf):
+        """Register the prepared face on a new FPDF, like add_font() would."""
+        from fontTools import ttLib
+        from fpdf.fonts import SubsetMap
+        # cmap and widths are read-only after parsing and are shared; the glyph
+        # subset is what each document fills in, so it starts empty
+        font = copy.copy(self.template)
+        font.subset = SubsetMap(font)
+        font.missing_glyphs = []
+        font.biggest_size_pt = 0
+        font.i = len(pdf.fonts) + 1
+        # pdf.output() subsets font.ttfont in place, so every document gets its own
+        font.ttfont = ttLib.TTFont(io.BytesIO(self.data), lazy=True, recalcTimestamp=False)
+        pdf.fonts[font.fontkey] = font
+
+_prepared_font = None
+_prepared_font_lock = threading.Lock()
+
+def get_prepared_font():
+    global _prepared_font
+    if _prepared_font is None:
+        with _prepared_font_lock:
+            if _prepared_font is None:
+                _prepared_font = PreparedFont()
+    return _prepared_font
+
+def warmup():
+    get_prepared_font()
+
+def new_pdf(text=""):
+    """A PDF with the DejaVu faces registered, using the prepared subset when it covers text."""
+    pdf = PDF()
+    prepared = get_prepared_font()
+    if prepared.covers(text):
+        prepared.install(pdf)
+    else:
+        pdf.add_font("DejaVu", "", FONT_PATH)
+        pdf.add_font("DejaVu", "B", FONT_PATH)
+    return pdf
+
+def wrap_lines(pdf, text, width):
+    """
+    Greedy word wrap of text to width (user units) in the current font. Word
+    widths are memoized, so a report costs one width lookup per distinct word
+    instead of fpdf's per-character line breaking in multi_cell.
+    """
+    widths = {}
+
+    def measure(word):
+        w = widths.get(word)
+        if w is None:
+            w = widths[word] = pdf.get_string_width(word)
+        return w
+
+    space = measure(" ")
+    lines = []
+    for paragraph in text.split("\n"):
+        line, line_width = [], 0.0
+        for word in paragraph.split(" "):
+            w = measure(word)
+            if w > width:
+                # a single word wider than the line is split by characters
+                if line:
+                    lines.append(" ".join(line))
+                    line, line_width = [], 0.0
+                piece = ""
+                for c in word:
+                    if piece and pdf.get_string_width(piece + c) > width:
+                        lines.append(piece)
+                        piece = ""
+                    piece += c
+                word, w = piece, measure(piece)
+            if line and line_width + space + w > width:
+                lines.append(" ".join(line))
+                line, line_width = [], 0.0
+            line_width += (space if line else 0.0) + w
+            line.append(word)
+        lines.append(" ".join(line))
+    return lines
+
+def paragraph(pdf, text, h, width):
+    for line in wrap_lines(pdf, text, width - 2 * pdf.c_margin):
+        pdf.cell(width, h, line, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+
+def build_report(filename, level, ats_score, jd_score, ai_score, sections, warnings, feedback):
+    """Lay out the report and return the FPDF document, ready for output()."""
+    section_lines = [
+        clean_text(f"{s['section'].replace('_', ' ').capitalize()} (Importance: {s['weight']}%): "
+                   f"{'✔️' if s['present'] else '✗'}")
+        for s in sections
+    ]
+    warning_lines = [clean_text(f"⚠️ {warning}") for warning in warnings or []]
+    feedback_text = clean_text(feedback)
+
+    pdf = new_pdf("".join([str(filename), str(level), *section_lines, *warning_lines, feedback_text]))
+    pdf.add_page()
+    pdf.set_font("DejaVu", "", 12)
+    max_width = 190  # Instead of 0, A4 minus margins
+
+    pdf.cell(max_width, 10, clean_text(f"Date: {datetime.date.today().isoformat()}"), new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+    pdf.cell(max_width, 10, clean_text(f"Resume: {filename}"), new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+    pdf.cell(max_width, 10, clean_text(f"Level: {level.capitalize()}"), new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+    pdf.ln(6)
+    pdf.set_font("DejaVu", "B", 14)
+    pdf.cell(max_width, 10, clean_text("Scores"), new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+    pdf.set_font("DejaVu", "", 12)
+    pdf.cell(max_width, 10, clean_text(f"ATS Score: {ats_score}/100"), new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+    pdf.cell(max_width, 10, clean_text(f"JD Match Score: {jd_score if jd_score is not None else '—'}/100"), new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+    pdf.cell(max_width, 10, clean_text(f"Gemini AI Score: {ai_score}/100"), new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+    pdf.ln(6)
+    pdf.set_font("DejaVu", "B", 14)
+    pdf.cell(max_width, 10, clean_text("Section Breakdown"), new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+    pdf.set_font("DejaVu", "", 12)
+    for line in section_lines:
+        paragraph(pdf, line, 10, max_width)
+    pdf.ln(4)
+    if warning_lines:
+        pdf.set_text_color(255, 0, 0)
+        for line in warning_lines:
+            paragraph(pdf, line, 10, max_width)
+        pdf.set_text_color(0, 0, 0)
+    pdf.ln(6)
+    pdf.set_font("DejaVu", "B", 14)
+    pdf.cell(max_width, 10, clean_text("Gemini AI Feedback"), new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+    pdf.set_font("DejaVu", "", 11)
+    paragraph(pdf, feedback_text, 8, max_width)
+    pdf.ln(2)
+    return pdf
+
+@metrics.timed("report.pdf")
+def generate_pdf_report(resume, level, ats_score, jd_score, ai_score, sections, warnings, feedback):
+    pdf = build_report(resume.filename, level, ats_score, jd_score, ai_score, sections, warnings, feedback)
+    return bytes(pdf.output(name=None))
+
+@metrics.timed("report.pdf")
+def write_report(path, filename, level, ats_score, jd_score, ai_score, sections, warnings, feedback):
+    """Render one report straight to path; returns the number of bytes written."""
+    pdf = build_report(filename, level, ats_score, jd_score, ai_score, sections, warnings, feedback)
+    pdf.output(path)
+    return os.path.getsize(path)
+
+# ----------- Reports for a whole batch run -------------
+
+def report_path(out_dir, rel_path):
+    # keep the extension so resume.pdf and resume.docx get separate reports
+    stem = rel_path.replace(os.sep, "__").replace("/", "__").replace(".", "_")
+    return os.path.join(out_dir, f"ATS_Summary_{stem}.pdf")
+
+def record_report(record, out_dir, level):
+    """Write the report for one app.batch result record; returns (file, path or None, error or None)."""
+    if "error" in record:
+        return record["file"], None, record["error"]
+    path = report_path(out_dir, record["file"])
+    details = record.get("ats_details") or {}
+    try:
+        write_report(
+            path, record["file"], level, record.get("ats_score"), record.get("jd_score"),
+            record.get("ai_score", "—"), details.get("sections", []), details.get("warnings", []),
+            record.get("ai_feedback", ""),
+        )
+    except Exception as e:
+        logger.exception("Could not write report for %s", record["file"])
+        return record["file"], None, f"{type(e).__name__}: {e}"
+    return record["file"], path, None
+
+def _render_task(task):
+    return record_report(*task)
+
+def read_records(results_path):
+    with open(results_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue  # a truncated last line from an interrupted run
+
+def render_reports(records, out_dir, level="entry", workers=None, chunksize=8):
+    """
+    Render a report per record across a process pool. Records are consumed
+    lazily and every report goes straight to disk, so memory stays flat no
+    matter how many there are. Yields (file, path, error) as each finishes.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    tasks = ((record, out_dir, level) for record in records)
+    if workers == 1:
+        warmup()
+        yield from map(_render_task, tasks)
+        return
+    with multiprocessing.Pool(workers or os.cpu_count() or 1, initializer=warmup) as pool:
+        yield from pool.imap_unordered(_render_task, tasks, chunksize=chunksize)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("results", help="JSONL written by python -m app.batch")
+    ap.add_argument("--out", default="reports", help="folder to write the PDFs to")
+    ap.add_argument("--level", choices=["entry", "mid", "senior"], default="entry")
+    ap.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    args = ap.parse_args(argv)
+
+    started = time.perf_counter()
+    written = failed = 0
+    for file, path, error in render_reports(read_records(args.results), args.out, args.level, args.workers):
+        if error:
+            failed += 1
+            print(f"  {file}: {error}", file=sys.stderr)
+        else:
+            written += 1
+    elapsed = time.perf_counter() - started
+    rate = written / elapsed if elapsed > 0 else 0.0
+    print(f"Done: {written} reports written to {args.out}, {failed} skipped in {elapsed:.2f}s ({rate:.1f} reports/s)",
+          file=sys.stderr)
+    return 1 if failed and not written else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
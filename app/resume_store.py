@@ -0,0 +1,223 @@
+# app/resume_store.py
+"""
+Parsed resumes persisted by content hash, so scoring can be re-run without
+re-extracting anything.
+
+    store = ResumeStore()
+    store.put(resume)                       # after parse_resume(...)
+    for record in store.rescore(jd_text, "mid"):
+        ...
+
+    python -m app.resume_store rescore --jd jd.txt --level mid -o rescored.jsonl
+
+Each row holds extract_metadata's output for one resume under the
+parser_version() it was built with; rows from another version are stale and
+are neither returned nor rescored (purge_stale() deletes them). Metadata
+(minus raw_text), raw_text and its clean_and_tokenize token set are stored as
+separate zlib-compressed JSON blobs: rescoring only reads the small metadata
+blob and the token set, and jd_based_score takes the tokens as they are
+instead of re-tokenizing the text.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from itertools import islice
+
+from app.parsers import ParsedResume, parser_version, resume_metadata
+from app.scoring import clean_and_tokenize, compile_jd, jd_based_score, traditional_ats_scores
+
+DEFAULT_STORE_PATH = os.getenv("ATS_RESUME_STORE_PATH", os.path.join(".cache", "resumes.sqlite3"))
+# Rows fetched per round trip while streaming the whole store
+FETCH_SIZE = 2000
+
+def _pack(value):
+    return zlib.compress(json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+def _unpack(blob):
+    return json.loads(zlib.decompress(blob))
+
+class ResumeStore:
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        self.path = path
+        self.version = parser_version()
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS resumes ("
+                "content_hash TEXT PRIMARY KEY, parser_version TEXT NOT NULL, filename TEXT, "
+                "metadata BLOB NOT NULL, raw_text BLOB NOT NULL, tokens BLOB NOT NULL, updated_at REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS resumes_version ON resumes(parser_version)")
+
+    def _connect(self):
+        # sqlite3 connections are not shareable across threads; keep one per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _row(self, content_hash, filename, metadata):
+        fields = dict(metadata)
+        raw_text = fields.pop("raw_text", "") or ""
+        return (content_hash, self.version, filename, _pack(fields), _pack(raw_text),
+                _pack(sorted(clean_and_tokenize(raw_text))), time.time())
+
+    def put(self, resume, content_hash=None, filename=None):
+        """Store a ParsedResume (or a metadata dict with an explicit content_hash)."""
+        self.put_many([(resume, content_hash, filename)])
+
+    def put_many(self, items):
+        """items: iterable of ParsedResume, or (resume, content_hash, filename) tuples."""
+        rows = []
+        for item in items:
+            resume, content_hash, filename = item if isinstance(item, tuple) else (item, None, None)
+            if isinstance(resume, ParsedResume):
+                content_hash = content_hash or resume.content_hash
+                filename = filename or resume.filename
+            if not content_hash:
+                raise ValueError("content_hash is required for a metadata dict")
+            rows.append(self._row(content_hash, filename, resume_metadata(resume)))
+        with self._connect() as conn:
+            conn.executemany("INSERT OR REPLACE INTO resumes VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def get(self, content_hash):
+        """Full extract_metadata output, or None if missing or parsed by another parser version."""
+        row = self._connect().execute(
+            "SELECT metadata, raw_text FROM resumes WHERE content_hash = ? AND parser_version = ?",
+            (content_hash, self.version),
+        ).fetchone()
+        if row is None:
+            return None
+        metadata = _unpack(row[0])
+        metadata["raw_text"] = _unpack(row[1])
+        return metadata
+
+    def get_resume(self, content_hash, filename):
+        """The stored parse as a ParsedResume, or None; lets callers skip extraction entirely."""
+        metadata = self.get(content_hash)
+        if metadata is None:
+            return None
+        return ParsedResume(content_hash, filename, metadata["raw_text"], metadata=metadata)
+
+    def __contains__(self, content_hash):
+        return self._connect().execute(
+            "SELECT 1 FROM resumes WHERE content_hash = ? AND parser_version = ?", (content_hash, self.version)
+        ).fetchone() is not None
+
+    def __len__(self):
+        return self._connect().execute(
+            "SELECT COUNT(*) FROM resumes WHERE parser_version = ?", (self.version,)
+        ).fetchone()[0]
+
+    def stale_count(self):
+        return self._connect().execute(
+            "SELECT COUNT(*) FROM resumes WHERE parser_version != ?", (self.version,)
+        ).fetchone()[0]
+
+    def purge_stale(self):
+        """Delete rows parsed by another parser version; returns how many."""
+        with self._connect() as conn:
+            return conn.execute("DELETE FROM resumes WHERE parser_version != ?", (self.version,)).rowcount
+
+    def delete(self, content_hash):
+        with self._connect() as conn:
+            return conn.execute("DELETE FROM resumes WHERE content_hash = ?", (content_hash,)).rowcount > 0
+
+    def records(self, with_text=False, with_tokens=False):
+        """
+        Stream (content_hash, filename, metadata, tokens) for every current row.
+        metadata has raw_text only when with_text is set; tokens is the stored
+        token set when with_tokens is set, else None.
+        """
+        columns = ["content_hash", "filename", "metadata"]
+        columns.append("raw_text" if with_text else "NULL")
+        columns.append("tokens" if with_tokens else "NULL")
+        cursor = self._connect().execute(
+            f"SELECT {', '.join(columns)} FROM resumes WHERE parser_version = ? ORDER BY content_hash",
+            (self.version,),
+        )
+        while True:
+            rows = cursor.fetchmany(FETCH_SIZE)
+            if not rows:
+                return
+            for content_hash, filename, metadata, raw_text, tokens in rows:
+                metadata = _unpack(metadata)
+                if raw_text is not None:
+                    metadata["raw_text"] = _unpack(raw_text)
+                yield content_hash, filename, metadata, set(_unpack(tokens)) if tokens is not None else None
+
+    def rescore(self, jd=None, level="entry", with_text=False):
+        """
+        Re-run traditional_ats_score (and jd_based_score when a JD is given) over
+        every stored resume, yielding one dict per resume in the app.batch record
+        layout. Scorers see metadata without raw_text unless with_text is set.
+        """
+        compiled = compile_jd(jd) if isinstance(jd, str) and jd else (jd or None)
+        records = self.records(with_text, with_tokens=compiled is not None)
+        while True:
+            # rule scores are computed FETCH_SIZE records at a time, in one vectorized pass
+            chunk = list(islice(records, FETCH_SIZE))
+            if not chunk:
+                return
+            scores = traditional_ats_scores([metadata for _, _, metadata, _ in chunk], level)
+            for (content_hash, filename, metadata, tokens), ats in zip(chunk, scores):
+                jd_result = jd_based_score(metadata, compiled, level, tokens=tokens) if compiled else None
+                yield {
+                    "file": filename,
+                    "content_hash": content_hash,
+                    "name": metadata.get("name"),
+                    "ats_score": ats["score"],
+                    "ats_details": ats["details"],
+                    "jd_score": jd_result["score"] if jd_result else None,
+                    "jd_details": jd_result["details"] if jd_result else None,
+                }
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("command", choices=["rescore", "stats", "purge"])
+    ap.add_argument("--store", default=DEFAULT_STORE_PATH, help="store path (default: ATS_RESUME_STORE_PATH)")
+    ap.add_argument("--jd", help="path to a job description text file")
+    ap.add_argument("--level", choices=["entry", "mid", "senior"], default="entry")
+    ap.add_argument("-o", "--output", help="JSONL file to write rescored records to (default: stdout)")
+    args = ap.parse_args(argv)
+
+    store = ResumeStore(args.store)
+    if args.command == "stats":
+        print(json.dumps({"parser_version": store.version, "resumes": len(store), "stale": store.stale_count()}))
+        return 0
+    if args.command == "purge":
+        print(f"deleted {store.purge_stale()} stale resumes", file=sys.stderr)
+        return 0
+
+    jd = None
+    if args.jd:
+        with open(args.jd, encoding="utf-8") as f:
+            jd = f.read()
+    started = time.perf_counter()
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    count = 0
+    try:
+        for record in store.rescore(jd, args.level):
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            count += 1
+    finally:
+        if args.output:
+            out.close()
+    elapsed = time.perf_counter() - started
+    print(f"rescored {count} resumes in {elapsed:.2f}s", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
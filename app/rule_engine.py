@@ -0,0 +1,160 @@
+# app/rule_engine.py
+"""
+Table-driven rule scoring, for one resume or a whole batch at once.
+
+    table = RuleTable(SECTION_WEIGHTS_BY_LEVEL, "entry", skills_bonus=((5, 5), (10, 10)))
+    scores = table.score(presence(records, table.fields), skill_counts, experience_years, level="mid")
+    for score, bonus, exp_match, sections, warnings in scores.rows(): ...
+
+A RuleTable compiles per-level section weights into one (levels x fields)
+integer matrix, together with the skills bonus tiers, each level's minimum
+years of experience and the weight from which a missing section is warned
+about. A batch arrives as arrays (a records x fields presence matrix, skill
+counts, experience years), so scoring it is one matrix-vector product plus a
+few elementwise operations, with no per-record branching.
+
+The per-section breakdown and the warnings depend only on the level and a
+record's presence flags, so each distinct pattern is built once and copied
+out per record. score_one uses the same table and patterns without NumPy,
+which is faster for a single resume.
+"""
+
+from itertools import chain
+from operator import itemgetter, methodcaller
+
+import numpy as np
+
+SECTION_KEYS = ("section", "present", "weight", "score")
+
+class RuleTable:
+    def __init__(self, weights_by_level, default_level, skills_bonus=(), min_experience=None,
+                 warn_weight=None, warning="{field} missing!", max_score=100, section_keys=SECTION_KEYS):
+        """
+        weights_by_level: {level: {field: points}}; a level's own field order is
+        the order of its breakdown. skills_bonus: (minimum skills, points) tiers,
+        the highest one met applies. min_experience: {level: years}; levels
+        without an entry never match. Missing fields weighing at least
+        warn_weight get warning.format(field=Field). section_keys orders the
+        keys of each breakdown entry.
+        """
+        self.levels = {level: row for row, level in enumerate(weights_by_level)}
+        self.default_level = default_level
+        self.fields = list(dict.fromkeys(field for weights in weights_by_level.values() for field in weights))
+        column = {field: i for i, field in enumerate(self.fields)}
+        self.weights = np.zeros((len(self.levels), len(self.fields)), dtype=np.int64)
+        self._layout = []  # per level: (field, column, weight) in the level's own order
+        for row, weights in enumerate(weights_by_level.values()):
+            self._layout.append([(field, column[field], weight) for field, weight in weights.items()])
+            for field, weight in weights.items():
+                self.weights[row, column[field]] = weight
+        self.skills_bonus = sorted(skills_bonus)
+        self.min_experience = dict(min_experience or {})
+        self.warn_weight = warn_weight
+        self.warning = warning
+        self.max_score = max_score
+        self.section_keys = tuple(section_keys)
+        self._bits = 1 << np.arange(len(self.fields), dtype=np.int64)
+        self._breakdowns = {}
+
+    def row(self, level):
+        return self.levels.get(level, self.levels[self.default_level])
+
+    def score(self, flags, skill_counts=None, experience=None, level=None):
+        """
+        Score a batch. flags: (records x len(self.fields)) bool array in
+        self.fields order; skill_counts and experience: one number per record
+        (experience None when the table has no thresholds).
+        """
+        flags = np.asarray(flags, dtype=bool).reshape(-1, len(self.fields))
+        row = self.row(level)
+        total = flags @ self.weights[row]
+        bonus = np.zeros(len(flags), dtype=np.int64)
+        if skill_counts is not None:
+            counts = np.asarray(skill_counts)
+            for minimum, points in self.skills_bonus:  # ascending, so the highest tier met wins
+                bonus[counts >= minimum] = points
+        minimum = self.min_experience.get(level)
+        if minimum is None or experience is None:
+            exp_match = np.zeros(len(flags), dtype=bool)
+        else:
+            exp_match = np.asarray(experience) >= minimum
+        return RuleScores(self, row, np.minimum(total + bonus, self.max_score), bonus, exp_match, flags @ self._bits)
+
+    def score_one(self, flags, skill_count=0, experience=None, level=None):
+        """score() for a single record, as (score, skills bonus, exp match, sections, warnings)."""
+        row = self.row(level)
+        pattern = sum(1 << column for column, present in enumerate(flags) if present)
+        base, sections, warnings = self.breakdown(row, pattern)
+        bonus = 0
+        for minimum, points in self.skills_bonus:
+            if skill_count >= minimum:
+                bonus = points
+        minimum = self.min_experience.get(level)
+        exp_match = minimum is not None and experience is not None and experience >= minimum
+        return min(base + bonus, self.max_score), bonus, exp_match, list(map(dict.copy, sections)), list(warnings)
+
+    def breakdown(self, row, pattern):
+        """(points, breakdown entries, warnings) for one level row and presence pattern."""
+        key = (row, pattern)
+        cached = self._breakdowns.get(key)
+        if cached is None:
+            base, sections, warnings = 0, [], []
+            for field, column, weight in self._layout[row]:
+                present = bool(pattern >> column & 1)
+                points = weight if present else 0
+                base += points
+                values = {"section": field, "present": present, "weight": weight, "score": points}
+                sections.append({name: values[name] for name in self.section_keys})
+                if not present and self.warn_weight is not None and weight >= self.warn_weight:
+                    warnings.append(self.warning.format(field=field.capitalize()))
+            cached = self._breakdowns[key] = (base, tuple(sections), tuple(warnings))
+        return cached
+
+class RuleScores:
+    """The result of RuleTable.score: NumPy arrays indexed by record."""
+
+    def __init__(self, table, row, score, skills_bonus, exp_match, patterns):
+        self.table = table
+        self.row = row
+        self.score = score
+        self.skills_bonus = skills_bonus
+        self.exp_match = exp_match
+        self.patterns = patterns
+
+    def __len__(self):
+        return len(self.score)
+
+    def rows(self):
+        """
+        (score, skills bonus, exp match, sections, warnings) per record, as
+        plain Python values; sections and warnings are fresh lists each time.
+        """
+        breakdown = self.table.breakdown
+        row = self.row
+        for score, bonus, exp_match, pattern in zip(
+            self.score.tolist(), self.skills_bonus.tolist(), self.exp_match.tolist(), self.patterns.tolist()
+        ):
+            _, sections, warnings = breakdown(row, pattern)
+            yield score, bonus, exp_match, list(map(dict.copy, sections)), list(warnings)
+
+def presence(records, fields, present=None):
+    """
+    (records x fields) bool matrix. present(record, field) decides each cell;
+    by default a field is present when record.get(field) is truthy.
+    """
+    count, width = len(records), len(fields)
+    if present is None and width > 1:
+        try:
+            # one C-level pass when every record has every field
+            values = chain.from_iterable(map(itemgetter(*fields), records))
+            return np.fromiter(map(bool, values), dtype=bool, count=count * width).reshape(count, width)
+        except KeyError:
+            pass
+    flags = np.empty((count, width), dtype=bool)
+    for column, field in enumerate(fields):
+        if present is None:
+            values = map(bool, map(methodcaller("get", field), records))
+        else:
+            values = (present(record, field) for record in records)
+        flags[:, column] = np.fromiter(values, dtype=bool, count=count)
+    return flags
@@ -1,8 +1,17 @@
 # app/scoring.py
 
+import heapq
 import re
-from collections import Counter
-from app.parsers import COMMON_SKILLS
+import threading
+from collections import Counter, OrderedDict
+from functools import lru_cache
+from operator import methodcaller
+
+import numpy as np
+
+from app import metrics
+from app.parsers import extract_skills, resume_metadata
+from app.rule_engine import RuleTable, presence
 # app/scoring.py
 
 from collections import defaultdict
@@ -26,99 +35,131 @@ SECTION_WEIGHTS_BY_LEVEL = {
     }
 }
 
-def traditional_ats_score(metadata, level):
-    weights = SECTION_WEIGHTS_BY_LEVEL.get(level, SECTION_WEIGHTS_BY_LEVEL["entry"])
-    score = 0
-    section_breakdown = []
-    warnings = []
-
-    # Section-wise scoring, with dynamic weights
-    for field, weight in weights.items():
-        present = bool(metadata.get(field)) and metadata.get(field) not in ["", [], None]
-        field_score = weight if present else 0
-        score += field_score
-        section_breakdown.append({
-            "section": field,
-            "present": present,
-            "weight": weight,
-            "score": field_score
-        })
-        # Warn if missing a high-weight section (>15%)
-        if not present and weight >= 15:
-            warnings.append(f"Your '{field.capitalize()}' section is critical for this level. Please add or improve it.")
-
-    # Skills bonus (optional, based on detected skills)
-    num_skills = len(metadata.get("skills", []))
-    skills_bonus = 0
-    if num_skills >= 10:
-        skills_bonus = 10
-        score += 10
-    elif num_skills >= 5:
-        skills_bonus = 5
-        score += 5
-
-    # Experience check for minimum thresholds (optional)
-    exp = metadata.get("experience_years")
-    if exp is None:
-        exp = 0  # Safest default for ATS
-
-    exp_match = False  # <-- Always initialize!
-
-    if level == "entry" and exp >= 0:
-        exp_match = True
-    elif level == "mid" and exp >= 3:
-        exp_match = True
-    elif level == "senior" and exp >= 7:
-        exp_match = True
-    # (Can add bonus points here if wanted)
-
-    # Final normalize and cap at 100
-    final_score = min(int(score), 100)
-
+# Compiled once; edit SECTION_WEIGHTS_BY_LEVEL before import, not at runtime
+TRADITIONAL_RULES = RuleTable(
+    SECTION_WEIGHTS_BY_LEVEL, "entry",
+    skills_bonus=((5, 5), (10, 10)),
+    # years of experience each level expects (reported as exp_match, not scored)
+    min_experience={"entry": 0, "mid": 3, "senior": 7},
+    # warn if missing a high-weight section (>15%)
+    warn_weight=15,
+    warning="Your '{field}' section is critical for this level. Please add or improve it.",
+)
+
+def _traditional_result(level, score, skills_bonus, exp_match, sections, warnings):
     # Return all breakdown for UI/analysis
     return {
-        "score": final_score,
+        "score": score,
         "details": {
-            "sections": section_breakdown,
+            "sections": sections,
             "skills_bonus": skills_bonus,
             "exp_match": exp_match,
             "level": level,
-            "warnings": warnings
-        }
+            "warnings": warnings,
+        },
     }
 
-def clean_and_tokenize(text):
-    return set(re.sub(r"[^A-Za-z0-9]", " ", text).lower().split())
+@metrics.timed("score.traditional")
+def traditional_ats_score(resume, level):
+    metadata = resume_metadata(resume)
+    flags = [bool(metadata.get(field)) for field in TRADITIONAL_RULES.fields]
+    # no experience found counts as 0 years, the safest default for ATS
+    experience = metadata.get("experience_years") or 0
+    return _traditional_result(
+        level, *TRADITIONAL_RULES.score_one(flags, len(metadata.get("skills", [])), experience, level)
+    )
+
+@metrics.timed("score.traditional_batch")
+def traditional_ats_scores(resumes, level):
+    """
+    traditional_ats_score for many resumes (ParsedResume objects or metadata
+    dicts) in one vectorized pass over TRADITIONAL_RULES.
+    """
+    records = [resume_metadata(resume) for resume in resumes]
+    flags = presence(records, TRADITIONAL_RULES.fields)
+    skill_counts = np.fromiter((len(m.get("skills", [])) for m in records), dtype=np.int64, count=len(records))
+    experience = np.fromiter(
+        (exp or 0 for exp in map(methodcaller("get", "experience_years"), records)),
+        dtype=np.float64, count=len(records),
+    )
+    scores = TRADITIONAL_RULES.score(flags, skill_counts, experience, level)
+    return [_traditional_result(level, *row) for row in scores.rows()]
+
+_NON_ALNUM = re.compile(r"[^A-Za-z0-9]")
+
+def tokenize(text):
+    """Tokens in order, with repeats (term frequencies for app.search_index)."""
+    return _NON_ALNUM.sub(" ", text).lower().split()
 
-def jd_based_score(metadata, jd, level):
+def clean_and_tokenize(text):
+    return set(tokenize(text))
+
+class CompiledJD:
+    """
+    Everything jd_based_score derives from a job description (token set, skill
+    set, required experience), computed once so ranking thousands of resumes
+    against one requisition does not redo the JD work per resume.
+    """
+
+    def __init__(self, jd):
+        self.text = jd
+        self.tokens = clean_and_tokenize(jd)
+        self.skills = set(extract_skills(jd))
+        self.required_exp = None
+        for s in self.tokens:
+            if s.isdigit():
+                self.required_exp = int(s)
+                break
+
+@lru_cache(maxsize=32)
+@metrics.timed("score.compile_jd")  # inside the cache: only misses are timed
+def compile_jd(jd):
+    return CompiledJD(jd)
+
+# Resume token sets keyed by raw_text. str caches its own hash, so a repeat
+# lookup for the same text object costs no rehash of the resume.
+RESUME_TOKEN_CACHE_SIZE = 4096
+_resume_tokens = OrderedDict()
+_resume_tokens_lock = threading.Lock()
+
+def resume_tokens(raw_text):
+    with _resume_tokens_lock:
+        tokens = _resume_tokens.get(raw_text)
+        if tokens is not None:
+            _resume_tokens.move_to_end(raw_text)
+            return tokens
+    tokens = clean_and_tokenize(raw_text)
+    with _resume_tokens_lock:
+        _resume_tokens[raw_text] = tokens
+        if len(_resume_tokens) > RESUME_TOKEN_CACHE_SIZE:
+            _resume_tokens.popitem(last=False)
+    return tokens
+
+@metrics.timed("score.jd")
+def jd_based_score(resume, jd, level, tokens=None):
+    """tokens: clean_and_tokenize(raw_text) if the caller already has it (app.resume_store does)."""
     if not jd:
         return None
-
-    # Extract JD keywords
-    jd_tokens = clean_and_tokenize(jd)
-    jd_skills = [skill for skill in COMMON_SKILLS if skill in jd.lower()]
+    metadata = resume_metadata(resume)
+    compiled = jd if isinstance(jd, CompiledJD) else compile_jd(jd)
 
     # Resume skills
     resume_skills = set(metadata.get("skills", []))
-    resume_tokens = clean_and_tokenize(metadata.get("raw_text", ""))
+    resume_token_set = tokens if tokens is not None else resume_tokens(metadata.get("raw_text", ""))
 
     # Skill overlap
-    skills_matched = resume_skills & set(jd_skills)
-    skill_match_pct = round((len(skills_matched) / max(len(jd_skills), 1)) * 100, 1)
+    skills_matched = resume_skills & compiled.skills
+    skill_match_pct = round((len(skills_matched) / max(len(compiled.skills), 1)) * 100, 1)
 
     # JD keyword overlap (not just skills)
-    word_overlap = jd_tokens & resume_tokens
-    word_match_pct = round((len(word_overlap) / max(len(jd_tokens), 1)) * 100, 1)
+    word_overlap = compiled.tokens & resume_token_set
+    word_match_pct = round((len(word_overlap) / max(len(compiled.tokens), 1)) * 100, 1)
 
     # Experience
-    required_exp = None
+    required_exp = compiled.required_exp
     exp_match = False
-    for s in jd_tokens:
-        if s.isdigit():
-            required_exp = int(s)
-            break
     candidate_exp = metadata.get("experience_years", 0)
-    if required_exp is not None:
+    if required_exp is not None and candidate_exp is not None:
         exp_match = candidate_exp >= required_exp
 
     score = int(skill_match_pct * 0.5 + word_match_pct * 0.3 + (20 if exp_match else 0))
@@ -135,3 +176,27 @@ def jd_based_score(metadata, jd, level):
             "candidate_exp": candidate_exp
         }
     }
+
+@metrics.timed("score.rank")
+def rank(compiled_jd, resumes, top_k=10):
+    """
+    Stream resumes (ParsedResume objects or metadata dicts) through
+    jd_based_score and keep only the best top_k in a min-heap. Returns
+    (score, resume, result) tuples, best first; ties keep input order.
+    The JD match does not depend on the level, so rank takes none.
+    """
+    if top_k <= 0:
+        return []
+    if not isinstance(compiled_jd, CompiledJD):
+        compiled_jd = compile_jd(compiled_jd)
+    heap = []
+    for i, resume in enumerate(resumes):
+        result = jd_based_score(resume, compiled_jd, None)
+        # -i so that among equal scores the earlier resume ranks higher
+        entry = (result["score"], -i, resume, result)
+        if len(heap) < top_k:
+            heapq.heappush(heap, entry)
+        elif entry[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, entry)
+    heap.sort(key=lambda e: e[:2], reverse=True)
+    return [(score, resume, result) for score, _, resume, result in heap]
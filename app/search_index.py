@@ -0,0 +1,361 @@
+# app/search_index.py
+"""
+On-disk BM25 candidate search over parsed resumes.
+
+    index = SearchIndex("candidates.sqlite3")
+    index.add(resume.content_hash, resume, filename=resume.filename)
+    index.flush()
+    index.search(jd_text, k=20)   # or a CompiledJD
+
+Terms are the tokens of clean_and_tokenize (via scoring.tokenize) over
+raw_text, plus one "skill:<name>" term per extracted skill, so a query matches
+the same words and skills jd_based_score would. Skill terms weigh SKILL_BOOST
+times a word, echoing the 0.5/0.3 skill/word split of the JD score.
+
+Storage is a small LSM in SQLite: each flush() writes the buffered documents
+as a new segment whose posting lists (doc ids delta-encoded, term frequencies)
+are zlib-compressed numpy arrays. delete() only tombstones a document;
+compact() merges all segments into one and drops tombstoned postings, and
+runs automatically once there are more than MAX_SEGMENTS segments. Document
+lengths and tombstones are kept in memory as arrays, and each term's
+BM25-weighted postings are cached until the next write, so a query is a few
+indexed SQLite reads plus vectorized numpy arithmetic.
+"""
+
+import json
+import math
+import os
+import sqlite3
+import threading
+import zlib
+from collections import Counter, OrderedDict
+
+import numpy as np
+
+from app.parsers import resume_metadata
+from app.scoring import CompiledJD, tokenize
+
+SKILL_PREFIX = "skill:"
+SKILL_BOOST = 1.5
+MAX_SEGMENTS = 8
+DEFAULT_SEGMENT_DOCS = 50000
+# Decoded, BM25-weighted postings kept per term for repeat queries
+IMPACT_CACHE_TERMS = 4096
+# Long JDs: only the rarest terms carry signal, common ones just cost time
+MAX_QUERY_TERMS = 64
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    doc_id INTEGER PRIMARY KEY, key TEXT NOT NULL, length INTEGER NOT NULL,
+    deleted INTEGER NOT NULL DEFAULT 0, info TEXT
+);
+CREATE INDEX IF NOT EXISTS docs_key ON docs(key) WHERE deleted = 0;
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT NOT NULL, segment INTEGER NOT NULL, df INTEGER NOT NULL,
+    doc_ids BLOB NOT NULL, tfs BLOB NOT NULL, PRIMARY KEY (term, segment)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS segments (segment INTEGER PRIMARY KEY, docs INTEGER NOT NULL);
+"""
+
+def encode_postings(doc_ids, tfs):
+    """Sorted doc ids as zlib'd uint32 deltas, term frequencies as zlib'd uint16."""
+    doc_ids = np.asarray(doc_ids, dtype=np.uint32)
+    deltas = doc_ids.copy()
+    deltas[1:] -= doc_ids[:-1]
+    tfs = np.minimum(np.asarray(tfs), 65535).astype(np.uint16)
+    return zlib.compress(deltas.tobytes()), zlib.compress(tfs.tobytes())
+
+def encode_segment(term_ids, doc_ids, tfs):
+    """
+    encode_postings for every term of a segment at once: (term id, doc id, tf)
+    rows, in ascending doc id order, are grouped by term and delta-encoded in
+    one vectorized pass, then sliced per term. Yields (term id, df, doc_ids
+    blob, tfs blob).
+    """
+    order = np.argsort(term_ids, kind="stable")
+    term_ids = term_ids[order]
+    doc_ids = doc_ids[order].astype(np.uint32)
+    tfs = np.minimum(tfs[order], 65535).astype(np.uint16)
+    starts = np.flatnonzero(np.diff(term_ids, prepend=-1))
+    deltas = doc_ids.copy()
+    deltas[1:] -= doc_ids[:-1]
+    deltas[starts] = doc_ids[starts]  # each posting list restarts from zero
+    ids_bytes, tfs_bytes = deltas.tobytes(), tfs.tobytes()
+    bounds = starts.tolist() + [len(term_ids)]
+    for term_id, lo, hi in zip(term_ids[starts].tolist(), bounds, bounds[1:]):
+        yield term_id, hi - lo, zlib.compress(ids_bytes[4 * lo:4 * hi]), zlib.compress(tfs_bytes[2 * lo:2 * hi])
+
+def decode_postings(doc_ids_blob, tfs_blob):
+    doc_ids = np.cumsum(np.frombuffer(zlib.decompress(doc_ids_blob), dtype=np.uint32), dtype=np.uint32)
+    tfs = np.frombuffer(zlib.decompress(tfs_blob), dtype=np.uint16)
+    return doc_ids, tfs
+
+def document_terms(metadata):
+    """Term frequencies for one resume's extract_metadata output."""
+    terms = Counter(tokenize(metadata.get("raw_text") or ""))
+    for skill in set(metadata.get("skills") or []):
+        terms[SKILL_PREFIX + skill.lower()] += 1
+    return terms
+
+def query_terms(query):
+    """{term: weight} for a query string or a CompiledJD."""
+    if isinstance(query, CompiledJD):
+        words, skills = query.tokens, query.skills
+    else:
+        from app.parsers import extract_skills
+        words, skills = set(tokenize(query)), extract_skills(query)
+    terms = dict.fromkeys(words, 1.0)
+    for skill in skills:
+        terms[SKILL_PREFIX + skill.lower()] = SKILL_BOOST
+    return terms
+
+class SearchIndex:
+    def __init__(self, path, k1=1.2, b=0.75, segment_docs=DEFAULT_SEGMENT_DOCS):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self.segment_docs = segment_docs
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.RLock()
+        self._pending = []  # (doc_id, key, terms, info) not yet in a segment
+        self._impact_cache = OrderedDict()
+        self._norm = None  # per-document BM25 length normalization
+        self._dead = None  # tombstoned doc ids
+        self._load_docs()
+
+    def _load_docs(self):
+        rows = self._conn.execute("SELECT doc_id, length, deleted FROM docs").fetchall()
+        size = max((row[0] for row in rows), default=0) + 1
+        self._lengths = np.zeros(size, dtype=np.float32)
+        self._live = np.zeros(size, dtype=bool)
+        if rows:
+            ids, lengths, deleted = (np.array(col) for col in zip(*rows))
+            self._lengths[ids] = lengths
+            self._live[ids] = deleted == 0
+        self._next_id = size
+        self._key_ids = dict(self._conn.execute("SELECT key, doc_id FROM docs WHERE deleted = 0"))
+        self._total_length = float(self._lengths[self._live].sum())
+
+    def _grow(self, needed):
+        if needed <= len(self._lengths):
+            return
+        size = max(needed, 2 * len(self._lengths))
+        self._lengths = np.concatenate([self._lengths, np.zeros(size - len(self._lengths), dtype=np.float32)])
+        self._live = np.concatenate([self._live, np.zeros(size - len(self._live), dtype=bool)])
+
+    def __len__(self):
+        return len(self._key_ids)
+
+    def __contains__(self, key):
+        return key in self._key_ids
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        with self._lock:
+            self.flush()
+            self._conn.close()
+
+    # ----------- writes -------------
+
+    def add(self, key, resume, **info):
+        """
+        Index a ParsedResume or metadata dict under key (e.g. its content hash),
+        replacing any document already stored under that key. Extra keyword
+        arguments (filename, name, ...) are returned with search results.
+        """
+        terms = document_terms(resume_metadata(resume))
+        with self._lock:
+            if key in self._key_ids:
+                self.delete(key)
+            doc_id = self._next_id
+            self._next_id += 1
+            self._grow(self._next_id)
+            length = sum(terms.values())
+            self._lengths[doc_id] = length
+            self._live[doc_id] = True
+            self._total_length += length
+            self._key_ids[key] = doc_id
+            self._invalidate()
+            self._pending.append((doc_id, key, terms, json.dumps(info) if info else None))
+            if len(self._pending) >= self.segment_docs:
+                self.flush()
+        return doc_id
+
+    def add_many(self, items):
+        """items: iterable of (key, resume) or (key, resume, info_dict)."""
+        for item in items:
+            self.add(item[0], item[1], **(item[2] if len(item) > 2 else {}))
+        self.flush()
+
+    def delete(self, key):
+        """Tombstone the document stored under key; returns whether there was one."""
+        with self._lock:
+            doc_id = self._key_ids.pop(key, None)
+            if doc_id is None:
+                return False
+            self._live[doc_id] = False
+            self._total_length -= float(self._lengths[doc_id])
+            self._invalidate()
+            if any(pending[0] == doc_id for pending in self._pending):
+                self._pending = [pending for pending in self._pending if pending[0] != doc_id]
+            else:
+                with self._conn:
+                    self._conn.execute("UPDATE docs SET deleted = 1 WHERE doc_id = ?", (doc_id,))
+            return True
+
+    def flush(self):
+        """Write the buffered documents as one new segment."""
+        with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, []
+            words, tfs = [], []
+            for _, _, terms, _ in pending:
+                words.extend(terms)
+                tfs.extend(terms.values())
+            vocab = {term: i for i, term in enumerate(dict.fromkeys(words))}
+            term_ids = np.fromiter(map(vocab.__getitem__, words), dtype=np.int64, count=len(words))
+            doc_ids = np.repeat([p[0] for p in pending], [len(p[2]) for p in pending])
+            tfs = np.fromiter(tfs, dtype=np.int64, count=len(tfs))
+            words = list(vocab)
+            with self._conn:
+                segment = self._conn.execute("SELECT COALESCE(MAX(segment), 0) + 1 FROM segments").fetchone()[0]
+                self._conn.execute("INSERT INTO segments VALUES (?, ?)", (segment, len(pending)))
+                self._conn.executemany(
+                    "INSERT INTO docs (doc_id, key, length, info) VALUES (?, ?, ?, ?)",
+                    [(doc_id, key, sum(terms.values()), info) for doc_id, key, terms, info in pending],
+                )
+                self._conn.executemany(
+                    "INSERT INTO postings VALUES (?, ?, ?, ?, ?)",
+                    [(words[term_id], segment, df, ids_blob, tfs_blob) for term_id, df, ids_blob, tfs_blob
+                     in encode_segment(term_ids, doc_ids, tfs)],
+                )
+            self._invalidate()
+            segments = self._conn.execute("SELECT COUNT(*) FROM segments").fetchone()[0]
+        if segments > MAX_SEGMENTS:
+            self.compact()
+
+    def compact(self):
+        """Merge every segment into one, dropping postings of deleted documents."""
+        with self._lock:
+            self.flush()
+            live = self._live
+            with self._conn:
+                segment = self._conn.execute("SELECT COALESCE(MAX(segment), 0) + 1 FROM segments").fetchone()[0]
+                rows = self._conn.execute("SELECT term, doc_ids, tfs FROM postings ORDER BY term")
+                merged, term, parts = [], None, []
+                for row_term, ids_blob, tfs_blob in rows:
+                    if row_term != term and parts:
+                        merged.append(self._merge_term(term, parts, live, segment))
+                        parts = []
+                    term = row_term
+                    parts.append(decode_postings(ids_blob, tfs_blob))
+                if parts:
+                    merged.append(self._merge_term(term, parts, live, segment))
+                self._conn.execute("DELETE FROM postings")
+                self._conn.executemany("INSERT INTO postings VALUES (?, ?, ?, ?, ?)", [m for m in merged if m])
+                self._conn.execute("DELETE FROM segments")
+                self._conn.execute("INSERT INTO segments VALUES (?, ?)", (segment, len(self._key_ids)))
+                self._conn.execute("DELETE FROM docs WHERE deleted = 1")
+            self._invalidate()
+
+    @staticmethod
+    def _merge_term(term, parts, live, segment):
+        doc_ids = np.concatenate([ids for ids, _ in parts])
+        tfs = np.concatenate([t for _, t in parts])
+        keep = live[doc_ids]
+        doc_ids, tfs = doc_ids[keep], tfs[keep]
+        if not len(doc_ids):
+            return None
+        order = np.argsort(doc_ids, kind="stable")
+        return (term, segment, len(doc_ids), *encode_postings(doc_ids[order], tfs[order]))
+
+    # ----------- queries -------------
+
+    def _invalidate(self):
+        """Writes change N, avgdl or document frequencies: drop everything derived from them."""
+        self._norm = None
+        self._dead = None
+        self._impact_cache.clear()
+
+    def _read_postings(self, term):
+        parts = [
+            decode_postings(ids_blob, tfs_blob)
+            for ids_blob, tfs_blob in self._conn.execute("SELECT doc_ids, tfs FROM postings WHERE term = ?", (term,))
+        ]
+        if not parts:
+            return np.empty(0, dtype=np.uint32), np.empty(0, dtype=np.uint16)
+        if len(parts) == 1:
+            return parts[0]
+        return np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts])
+
+    def _impacts(self, term):
+        """(doc ids, idf-weighted BM25 term scores) for one term, cached until the next write."""
+        cached = self._impact_cache.get(term)
+        if cached is not None:
+            self._impact_cache.move_to_end(term)
+            return cached
+        if self._norm is None:
+            avgdl = self._total_length / len(self._key_ids)
+            self._norm = self.k1 * (1 - self.b + self.b * self._lengths[:self._next_id] / avgdl)
+        doc_ids, tfs = self._read_postings(term)
+        df = len(doc_ids)
+        idf = math.log(1 + (len(self._key_ids) - df + 0.5) / (df + 0.5))
+        tf = tfs.astype(np.float32)
+        impacts = (idf * (self.k1 + 1)) * tf / (tf + self._norm[doc_ids])
+        self._impact_cache[term] = cached = (doc_ids, impacts.astype(np.float32))
+        if len(self._impact_cache) > IMPACT_CACHE_TERMS:
+            self._impact_cache.popitem(last=False)
+        return cached
+
+    def search(self, query, k=10):
+        """
+        Top-k documents for a query string or CompiledJD, best first, as
+        (key, score, info) tuples.
+        """
+        weights = query_terms(query)
+        with self._lock:
+            self.flush()
+            n = len(self._key_ids)
+            if not n or not weights or k <= 0:
+                return []
+            impacts = {term: self._impacts(term) for term in weights}
+            impacts = {term: i for term, i in impacts.items() if len(i[0])}
+            if len(impacts) > MAX_QUERY_TERMS:
+                rarest = sorted(impacts, key=lambda term: len(impacts[term][0]))[:MAX_QUERY_TERMS]
+                impacts = {term: impacts[term] for term in rarest}
+
+            scores = np.zeros(self._next_id, dtype=np.float32)
+            for term, (doc_ids, term_scores) in impacts.items():
+                # doc ids are unique within a term's postings, so fancy-index += is safe
+                scores[doc_ids] += weights[term] * term_scores
+            if self._dead is None:
+                self._dead = np.flatnonzero(~self._live[:self._next_id])
+            scores[self._dead] = 0.0  # tombstoned, postings not compacted away yet
+
+            # argpartition degrades on long runs of equal values, so rank matched docs only
+            candidates = np.flatnonzero(scores)
+            if len(candidates) > k:
+                candidates = candidates[np.argpartition(scores[candidates], len(candidates) - k)[-k:]]
+            # best first, ties in insertion order
+            top = candidates[np.lexsort((candidates, -scores[candidates]))].tolist()
+            if not top:
+                return []
+            placeholders = ",".join("?" * len(top))
+            found = {
+                doc_id: (key, json.loads(info) if info else {})
+                for doc_id, key, info in self._conn.execute(
+                    f"SELECT doc_id, key, info FROM docs WHERE doc_id IN ({placeholders})", top
+                )
+            }
+            return [(found[doc_id][0], float(scores[doc_id]), found[doc_id][1]) for doc_id in top]
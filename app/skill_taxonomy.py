@@ -0,0 +1,111 @@
+# app/skill_taxonomy.py
+
+import json
+import os
+from spacy.matcher import PhraseMatcher
+from spacy.util import filter_spans
+
+TAXONOMY_PATH = os.path.join(os.path.dirname(__file__), "data", "skills_taxonomy.json")
+
+# Tokens that put a word in a list ("Python, Go", "Skills: Excel", "C/C++", "• Swift")
+LIST_SEPARATORS = {",", ";", ":", "/", "|", "(", ")", "[", "]", "&", "+"}
+BULLETS = {"•", "·", "-", "*", "–", "▪", "◦"}
+# How far (in tokens) a context cue may be from an ambiguous word
+CONTEXT_WINDOW = 4
+
+class SkillTaxonomy:
+    """
+    Skill names and aliases compiled once into spaCy PhraseMatchers. Matching
+    walks the document's tokens a single time, so the per-document cost stays
+    flat as the taxonomy grows, and whole-token matching means "java" is never
+    found inside "javascript".
+
+    An entry with "context" is an everyday word as well as a skill ("Spring
+    2019", "Go further", "Excel at"): its exact-case form only counts when it
+    stands in a list, alone on a line, or within CONTEXT_WINDOW tokens of one
+    of its context cues or of another skill in the same category (which may
+    itself be a context word: "Go and Rust" confirms both). Aliases
+    ("golang", "spring boot") always count.
+    """
+
+    def __init__(self, nlp, skills, version=None):
+        self.version = version
+        self.names = []
+        self._category = {}
+        self._context = {}  # name -> cue words, for entries that need context
+        self._lower = PhraseMatcher(nlp.vocab, attr="LOWER")
+        self._exact = PhraseMatcher(nlp.vocab, attr="ORTH")
+
+        lower_forms, exact_forms = [], []
+        for entry in skills:
+            name = entry["name"]
+            self.names.append(name)
+            self._category[name] = entry.get("category")
+            if "context" in entry:
+                self._context[name] = {cue.lower() for cue in entry["context"]}
+            # Ambiguous words (Go, R, Spring) only match in their exact casing
+            if not entry.get("match_case"):
+                lower_forms.append((name, name))
+            lower_forms.extend((name, alias) for alias in entry.get("aliases", []))
+            exact_forms.extend((name, form) for form in entry.get("match_case", []))
+
+        for matcher, forms in ((self._lower, lower_forms), (self._exact, exact_forms)):
+            patterns = {}
+            docs = nlp.tokenizer.pipe(form for _, form in forms)
+            for (name, _), doc in zip(forms, docs):
+                patterns.setdefault(name, []).append(doc)
+            for name, docs in patterns.items():
+                matcher.add(name, docs)
+
+    @classmethod
+    def load(cls, nlp, path=TAXONOMY_PATH):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(nlp, data["skills"], version=data.get("version"))
+
+    def __len__(self):
+        return len(self.names)
+
+    def match(self, doc):
+        """Canonical skill names found in doc, in order of first appearance."""
+        spans = self._lower(doc, as_spans=True)
+        exact = self._exact(doc, as_spans=True)
+        if self._context:
+            # any other hit is a neighbour, including another context word ("Go and Rust")
+            hits = spans + exact
+            exact = [span for span in exact if span.label_ not in self._context or self._in_context(span, hits)]
+        spans = spans + exact
+        # Longest match wins on overlap, e.g. "c++" over "c", "spring boot" over "spring"
+        spans = sorted(filter_spans(spans), key=lambda span: span.start)
+        return list(dict.fromkeys(span.label_ for span in spans))
+
+    def _in_context(self, span, hits):
+        doc = span.doc
+        before, after = _neighbour(doc, span.start - 1, -1), _neighbour(doc, span.end, 1)
+        if before is None and after is None:
+            return True  # alone on its line
+        if (before is None or before.text in LIST_SEPARATORS or before.text in BULLETS) and (
+            after is None or after.text in LIST_SEPARATORS
+        ):
+            return True  # an item in a list
+        cues = self._context[span.label_]
+        lo, hi = max(span.start - CONTEXT_WINDOW, 0), min(span.end + CONTEXT_WINDOW, len(doc))
+        if any(token.lower_ in cues for token in doc[lo:hi]):
+            return True
+        category = self._category[span.label_]
+        return any(
+            other.start < hi and other.end > lo and other.label_ != span.label_
+            and self._category[other.label_] == category
+            for other in hits
+        )
+
+def _neighbour(doc, i, step):
+    """The nearest non-space token from i in direction step, or None at a line break or the doc's edge."""
+    while 0 <= i < len(doc):
+        token = doc[i]
+        if not token.is_space:
+            return token
+        if "\n" in token.text:
+            return None
+        i += step
+    return None
@@ -0,0 +1,192 @@
+# app/upload_store.py
+"""
+Uploaded files spooled to a content-addressed directory on local disk, so a
+UI session keeps a small Upload handle instead of the file's bytes.
+
+    upload = default_store().put(uploaded_file)   # bytes or a binary file object
+    upload.key                                    # sha256, same as ParsedResume.content_hash
+    store.read(upload.key), store.page_count(upload.key), store.page_image(upload.key, 0)
+    upload.release()                              # or just drop the handle
+
+Files are named by the SHA-256 of their content, so two sessions uploading
+the same resume share one file. Each live Upload handle holds a reference;
+the file is deleted when the last one is released or garbage collected
+(which is what happens to a Streamlit session's state when the session
+ends). Files orphaned by a crash or restart are removed by sweep() once they
+are older than UPLOAD_TTL_SECONDS; put() runs it at most once per
+SWEEP_INTERVAL_SECONDS.
+
+PDF previews are PNG page images rendered by PyMuPDF at PREVIEW_DPI, one
+page at a time when it is first shown, straight from the spooled file. They
+are kept in an LRU shared by all sessions and bounded to
+PREVIEW_CACHE_BYTES.
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+DEFAULT_UPLOAD_DIR = os.getenv("ATS_UPLOAD_DIR", os.path.join(tempfile.gettempdir(), "ats_uploads"))
+UPLOAD_TTL_SECONDS = int(os.getenv("ATS_UPLOAD_TTL_SECONDS", str(6 * 3600)))
+SWEEP_INTERVAL_SECONDS = 600
+PREVIEW_DPI = int(os.getenv("ATS_PREVIEW_DPI", "60"))
+PREVIEW_CACHE_BYTES = int(os.getenv("ATS_PREVIEW_CACHE_BYTES", str(32 * 2**20)))
+CHUNK_SIZE = 2**20
+
+_KEY = re.compile(r"[0-9a-f]{64}")
+_TMP_PREFIX = ".upload-"
+
+class Upload:
+    """One holder's reference to a stored file; released once, explicitly or when collected."""
+
+    def __init__(self, store, key):
+        self.key = key
+        self._finalizer = weakref.finalize(self, store.release, key)
+
+    def release(self):
+        self._finalizer()
+
+class UploadStore:
+    def __init__(self, root=DEFAULT_UPLOAD_DIR, ttl=UPLOAD_TTL_SECONDS, preview_dpi=PREVIEW_DPI,
+                 preview_cache_bytes=PREVIEW_CACHE_BYTES):
+        self.root = root
+        self.ttl = ttl
+        self.preview_dpi = preview_dpi
+        self.preview_cache_bytes = preview_cache_bytes
+        os.makedirs(root, exist_ok=True)
+        self._lock = threading.Lock()
+        self._refs = {}              # key -> live Upload handles
+        self._pages = OrderedDict()  # (key, page) -> PNG bytes, least recently shown first
+        self._page_bytes = 0
+        self._page_counts = {}
+        self._last_sweep = 0.0
+        self.stats = {"rendered": 0, "hits": 0, "evicted": 0}
+
+    def path(self, key):
+        # keys come back from session state; never let one name another path
+        if not _KEY.fullmatch(key or ""):
+            raise ValueError(f"not an upload key: {key!r}")
+        return os.path.join(self.root, key)
+
+    def put(self, source):
+        """Spool bytes or a binary file object to disk and return an Upload for it."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=_TMP_PREFIX)
+        digest = hashlib.sha256()
+        try:
+            with os.fdopen(fd, "wb") as f:
+                if isinstance(source, (bytes, bytearray, memoryview)):
+                    digest.update(source)
+                    f.write(source)
+                else:
+                    source.seek(0)
+                    for chunk in iter(lambda: source.read(CHUNK_SIZE), b""):
+                        digest.update(chunk)
+                        f.write(chunk)
+            key = digest.hexdigest()
+            with self._lock:
+                self._refs[key] = self._refs.get(key, 0) + 1
+                # replacing an identical file is harmless and refreshes its mtime for sweep()
+                os.replace(tmp_path, self.path(key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        if time.time() - self._last_sweep > SWEEP_INTERVAL_SECONDS:
+            self.sweep()
+        return Upload(self, key)
+
+    def read(self, key):
+        """The file's bytes; FileNotFoundError once it has been released or swept."""
+        with open(self.path(key), "rb") as f:
+            return f.read()
+
+    def __contains__(self, key):
+        return os.path.exists(self.path(key))
+
+    def release(self, key):
+        """Drop one reference; the last one deletes the file and its cached pages."""
+        with self._lock:
+            remaining = self._refs.get(key, 0) - 1
+            if remaining > 0:
+                self._refs[key] = remaining
+                return
+            self._refs.pop(key, None)
+            self._forget(key)
+            try:
+                os.remove(self.path(key))
+            except FileNotFoundError:
+                pass
+
+    def sweep(self, now=None):
+        """Delete unreferenced files (and stray temp files) older than ttl; returns how many."""
+        now = time.time() if now is None else now
+        removed = 0
+        with self._lock:
+            self._last_sweep = now
+            for entry in os.scandir(self.root):
+                if entry.name in self._refs:
+                    continue
+                try:
+                    if entry.stat().st_mtime < now - self.ttl:
+                        os.remove(entry.path)
+                        self._forget(entry.name)
+                        removed += 1
+                except FileNotFoundError:
+                    continue
+        return removed
+
+    def _forget(self, key):
+        # caller holds self._lock
+        self._page_counts.pop(key, None)
+        for cache_key in [k for k in self._pages if k[0] == key]:
+            self._page_bytes -= len(self._pages.pop(cache_key))
+
+    def page_count(self, key):
+        count = self._page_counts.get(key)
+        if count is None:
+            import fitz  # PyMuPDF
+            with fitz.open(self.path(key)) as doc:
+                count = doc.page_count
+            self._page_counts[key] = count
+        return count
+
+    def page_image(self, key, page):
+        """PNG of one PDF page (0-based) at preview_dpi, rendered on first request."""
+        cache_key = (key, page)
+        with self._lock:
+            png = self._pages.get(cache_key)
+            if png is not None:
+                self._pages.move_to_end(cache_key)
+                self.stats["hits"] += 1
+                return png
+        import fitz  # PyMuPDF
+        # opened from the spooled file: MuPDF reads only what this page needs
+        with fitz.open(self.path(key)) as doc:
+            png = doc[page].get_pixmap(dpi=self.preview_dpi).tobytes("png")
+        with self._lock:
+            self.stats["rendered"] += 1
+            if key in self._refs and cache_key not in self._pages:
+                self._pages[cache_key] = png
+                self._page_bytes += len(png)
+                while self._page_bytes > self.preview_cache_bytes and len(self._pages) > 1:
+                    _, evicted = self._pages.popitem(last=False)
+                    self._page_bytes -= len(evicted)
+                    self.stats["evicted"] += 1
+        return png
+
+_default_store = None
+_default_lock = threading.Lock()
+
+def default_store():
+    """The process-wide store under DEFAULT_UPLOAD_DIR, created on first use."""
+    global _default_store
+    if _default_store is None:
+        with _default_lock:
+            if _default_store is None:
+                _default_store = UploadStore()
+    return _default_store
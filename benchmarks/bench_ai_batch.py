@@ -0,0 +1,311 @@
+# benchmarks/bench_ai_batch.py
+"""
+Batched vs. one-prompt-per-resume Gemini scoring, against a local fake model.
+
+    python -m benchmarks.bench_ai_batch --resumes 1000 --drop 0.05 --garble 0.05 --poison 0.01
+
+The fake answers with a JSON array for batched prompts (and a single JSON
+object otherwise) after --latency seconds. It leaves out --drop of the
+entries, gives --garble of them an out-of-range score, and never answers for
+the --poison resumes, so the retry rounds and the "no valid answer" path of
+app.ai_batch both run. Like the real SDK's gRPC channel, it is bound to the
+event loop of its first call and fails on any other, and the batched path is
+run in --flush sized chunks the way app.batch calls it, so a client that
+changes loops between calls shows up as problems. No API key or network is
+needed; the AI cache goes to a temporary directory.
+
+Before that, app.ai_batch.validate is run on malformed responses (ids that
+are not strings, duplicates, out-of-range or boolean scores, prose around
+the array) and GeminiClient itself is checked against scripted fakes:
+retryable errors are retried and others are not, a hung call hits its
+deadline, identical in-flight prompts (from coroutines and from threads)
+share one upstream call, the concurrency limit holds, and callers on
+different event loops all reach the model on the client's loop.
+
+Reported: upstream requests per 1000 resumes for each path, prompt tokens
+sent, and a check that every resume got either a valid score or an error,
+never a silent 0. Exits 1 if any check fails.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+
+from benchmarks.bench_stages import JD
+from benchmarks.corpus import resume_lines
+
+POISON = "ZZPOISONZZ"
+_BLOCK = re.compile(r'<resume id="([^"]+)">\n(.*?)\n</resume>', re.DOTALL)
+
+class FakeModel:
+    def __init__(self, latency=0.05, drop=0.0, garble=0.0, seed=0):
+        self.latency = latency
+        self.drop = drop
+        self.garble = garble
+        self.rng = random.Random(seed)
+        self.calls = 0
+        self.prompt_chars = 0
+        self.loop = None
+        self.wrong_loop = 0
+
+    @staticmethod
+    def _score(text):
+        return int(hashlib.sha256(text.encode("utf-8")).hexdigest(), 16) % 101
+
+    async def generate_content_async(self, prompt, generation_config=None):
+        loop = asyncio.get_running_loop()
+        if self.loop is None:
+            self.loop = loop
+        elif loop is not self.loop:
+            self.wrong_loop += 1
+            raise RuntimeError("Event loop is closed")
+        self.calls += 1
+        self.prompt_chars += len(prompt)
+        await asyncio.sleep(self.latency)
+        blocks = _BLOCK.findall(prompt)
+        if not blocks:
+            return SimpleNamespace(text=json.dumps({"score": self._score(prompt), "feedback": "Add metrics."}))
+        answers = []
+        for item_id, text in blocks:
+            if POISON in text or self.rng.random() < self.drop:
+                continue
+            score = 150 if self.rng.random() < self.garble else self._score(text)
+            answers.append({"id": item_id, "score": score, "feedback": f"Feedback for {item_id}."})
+        self.rng.shuffle(answers)  # results must be matched by id, not position
+        return SimpleNamespace(text=json.dumps(answers))
+
+class ServiceUnavailable(Exception):
+    """Named like the google.api_core error GeminiClient retries."""
+
+class ScriptedModel:
+    """Fails, hangs or answers per call, from a list of steps; records what it saw."""
+
+    def __init__(self, steps=(), latency=0.0):
+        self.steps = list(steps)
+        self.latency = latency
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+        self.loops = set()
+
+    async def generate_content_async(self, prompt, generation_config=None):
+        self.loops.add(asyncio.get_running_loop())
+        self.calls += 1
+        step = self.steps.pop(0) if self.steps else "ok"
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            if step == "hang":
+                await asyncio.sleep(3600)
+            await asyncio.sleep(self.latency)
+            if isinstance(step, Exception):
+                raise step
+            return SimpleNamespace(text=f"answer to {prompt}")
+        finally:
+            self.active -= 1
+
+def check_client():
+    """GeminiClient retries, deadline, coalescing and concurrency; returns the number of failed checks."""
+    from app.gemini_client import GeminiClient
+
+    def client(model, **kwargs):
+        return GeminiClient("fake", model=model, backoff=0.001, max_backoff=0.002, **kwargs)
+
+    def outcome(gemini, prompt="p"):
+        try:
+            return gemini.generate_sync(prompt)
+        except Exception as e:
+            return type(e).__name__
+
+    checks = []
+
+    model = ScriptedModel([ServiceUnavailable(), ServiceUnavailable()])
+    gemini = client(model, retries=3)
+    checks.append(("retryable errors are retried",
+                   outcome(gemini) == "answer to p" and model.calls == 3 and gemini.stats["retries"] == 2))
+
+    model = ScriptedModel([ServiceUnavailable()] * 5)
+    gemini = client(model, retries=2)
+    checks.append(("retries stop after `retries`",
+                   outcome(gemini) == "ServiceUnavailable" and model.calls == 3 and gemini.stats["failures"] == 1))
+
+    model = ScriptedModel([ValueError("bad request")])
+    gemini = client(model, retries=3)
+    checks.append(("other errors fail at once", outcome(gemini) == "ValueError" and model.calls == 1))
+
+    model = ScriptedModel(["hang", "hang"])
+    gemini = client(model, retries=1, timeout=0.05)
+    start = time.perf_counter()
+    result = outcome(gemini)
+    checks.append(("a hung call hits the deadline and is retried",
+                   result == "TimeoutError" and model.calls == 2 and time.perf_counter() - start < 1.0))
+
+    model = ScriptedModel(["hang"])
+    gemini = client(model, retries=1, timeout=0.05)
+    checks.append(("the retry after a deadline can succeed", outcome(gemini) == "answer to p" and model.calls == 2))
+
+    model = ScriptedModel(latency=0.05)
+    gemini = client(model)
+
+    async def same_prompt():
+        return await asyncio.gather(*(gemini.generate("same") for _ in range(5)))
+
+    answers = asyncio.run(same_prompt())
+    checks.append(("identical in-flight prompts share one call",
+                   answers == ["answer to same"] * 5 and model.calls == 1 and gemini.stats["coalesced"] == 4))
+
+    model = ScriptedModel(latency=0.05)
+    gemini = client(model)
+    answers = []
+    threads = [threading.Thread(target=lambda: answers.append(gemini.generate_sync("same"))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    checks.append(("threads share one call too", answers == ["answer to same"] * 5 and model.calls == 1))
+
+    model = ScriptedModel(latency=0.02)
+    gemini = client(model, max_concurrency=3)
+
+    async def distinct_prompts():
+        return await asyncio.gather(*(gemini.generate(f"p{i}") for i in range(12)))
+
+    asyncio.run(distinct_prompts())
+    asyncio.run(distinct_prompts())  # a second caller loop, handed over to the client's
+    checks.append(("concurrency limit and one loop for every caller",
+                   model.calls == 24 and model.max_active == 3 and len(model.loops) == 1))
+
+    failures = 0
+    for name, ok in checks:
+        if not ok:
+            failures += 1
+            print(f"client check failed: {name}")
+    print(f"client checks: {len(checks) - failures}/{len(checks)} passed")
+    return failures
+
+# (response text, {id: score} expected valid; every other id must come back as an error)
+VALIDATE_CASES = [
+    ('[{"id": "r0", "score": 80, "feedback": "ok"}, {"id": "r1", "score": 70, "feedback": "ok"}]',
+     {"r0": 80, "r1": 70}),
+    ('Here you go: [{"id": "r0", "score": 80.0, "feedback": "ok"}] Thanks!', {"r0": 80}),
+    ('[{"id": ["r0"], "score": 80, "feedback": "ok"}, {"id": {"r": 1}, "score": 80, "feedback": "ok"}, '
+     '{"id": 1, "score": 80, "feedback": "ok"}, {"id": "r1", "score": 60, "feedback": "ok"}]', {"r1": 60}),
+    ('[{"id": "r0", "score": 80, "feedback": "ok"}, {"id": "r0", "score": 10, "feedback": "dup"}]', {"r0": 80}),
+    ('[{"id": "r0", "score": 101, "feedback": "ok"}, {"id": "r1", "score": true, "feedback": "ok"}]', {}),
+    ('[{"id": "r0", "score": 50, "feedback": " "}, {"id": "r9", "score": 50, "feedback": "ok"}, "r1"]', {}),
+    ('{"id": "r0", "score": 50, "feedback": "ok"}', {}),
+    ("I cannot score these resumes.", {}),
+]
+
+def check_validate():
+    """app.ai_batch.validate on malformed responses; returns the number of failed cases."""
+    from app.ai_batch import validate
+
+    expected_ids = {"r0", "r1"}
+    failures = 0
+    for text, expected in VALIDATE_CASES:
+        try:
+            valid, errors = validate(text, expected_ids)
+            ok = ({item_id: score for item_id, (score, _) in valid.items()} == expected
+                  and set(errors) == expected_ids - set(expected))
+        except Exception as e:
+            valid, errors, ok = type(e).__name__, e, False
+        if not ok:
+            failures += 1
+            print(f"validate check failed: {text!r}: valid {valid}, errors {errors}")
+    print(f"validate checks: {len(VALIDATE_CASES) - failures}/{len(VALIDATE_CASES)} passed")
+    return failures
+
+def make_resumes(count, poison, seed=0):
+    rng = random.Random(seed)
+    resumes = []
+    for i in range(count):
+        text = "\n".join(resume_lines(rng, pages=1, layout="standard"))
+        if rng.random() < poison:
+            text += f"\n{POISON}"
+        resumes.append((f"resume-{i}", text))
+    return resumes
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--resumes", type=int, default=1000)
+    ap.add_argument("--latency", type=float, default=0.05, help="fake model seconds per request")
+    ap.add_argument("--drop", type=float, default=0.05, help="share of batch entries left out")
+    ap.add_argument("--garble", type=float, default=0.05, help="share of batch entries with an invalid score")
+    ap.add_argument("--poison", type=float, default=0.01, help="share of resumes never answered")
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--flush", type=int, default=250, help="resumes per ai_score_batch call, like --ai-batch")
+    args = ap.parse_args(argv)
+
+    tmp = tempfile.mkdtemp()
+    os.environ["ATS_AI_CACHE_PATH"] = os.path.join(tmp, "ai_scores.sqlite3")
+    failures = check_validate() + check_client()
+    from app.ai_batch import BATCH_TOKEN_BUDGET, MAX_BATCH_ITEMS, ai_score_batch
+    from app.ai_scoring import ai_ats_score_async
+    from app.gemini_client import GeminiClient
+    from app.prompt_builder import CHARS_PER_TOKEN
+
+    resumes = make_resumes(args.resumes, args.poison)
+    per_1000 = 1000 / len(resumes)
+
+    single_model = FakeModel(args.latency)
+    single = GeminiClient("fake-single", max_concurrency=args.concurrency, model=single_model)
+
+    async def score_each():
+        return await asyncio.gather(*(
+            ai_ats_score_async(SimpleNamespace(text=text), JD, client=single) for _, text in resumes
+        ))
+
+    start = time.perf_counter()
+    asyncio.run(score_each())
+    single_seconds = time.perf_counter() - start
+    print(f"one per request: {single_model.calls * per_1000:.0f} requests/1000 resumes, "
+          f"{single_model.prompt_chars / CHARS_PER_TOKEN / len(resumes):.0f} prompt tokens/resume, "
+          f"{single_seconds:.2f}s")
+
+    batch_model = FakeModel(args.latency, args.drop, args.garble)
+    batched = GeminiClient("fake-batch", max_concurrency=args.concurrency, model=batch_model)
+    stats, results = {}, {}
+    start = time.perf_counter()
+    for i in range(0, len(resumes), args.flush):
+        chunk_stats = {}
+        results.update(ai_score_batch(resumes[i:i + args.flush], JD, client=batched, stats=chunk_stats))
+        for name, n in chunk_stats.items():
+            stats[name] = stats.get(name, 0) + n
+    batch_seconds = time.perf_counter() - start
+    print(f"batched (<= {MAX_BATCH_ITEMS} resumes, {BATCH_TOKEN_BUDGET} tokens per request): "
+          f"{batch_model.calls * per_1000:.0f} requests/1000 resumes, "
+          f"{batch_model.prompt_chars / CHARS_PER_TOKEN / len(resumes):.0f} prompt tokens/resume, "
+          f"{batch_seconds:.2f}s")
+    print(f"  retried {stats['retried']} items, {stats['failed']} without a valid score")
+
+    poisoned = {key for key, text in resumes if POISON in text}
+    problems = unlucky = 0
+    for key, _ in resumes:
+        result = results[key]
+        scored = isinstance(result["score"], int) and 0 <= result["score"] <= 100 and result["error"] is None
+        errored = result["score"] is None and bool(result["error"])
+        problems += not (errored if key in poisoned else scored or errored)
+        unlucky += key not in poisoned and errored
+    problems += single_model.wrong_loop + batch_model.wrong_loop
+    print(f"  {len(poisoned)} never-answered resumes reported as errors, {unlucky} more dropped in every round; "
+          f"calls on the wrong event loop: {single_model.wrong_loop + batch_model.wrong_loop}; problems: {problems}")
+
+    # a second run only re-requests the resumes that never got a valid score
+    calls = batch_model.calls
+    ai_score_batch(resumes, JD, client=batched)
+    print(f"  re-run: {batch_model.calls - calls} requests (the rest cached), "
+          f"wrong event loop: {batch_model.wrong_loop}")
+    return 1 if failures or problems or batch_model.wrong_loop else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
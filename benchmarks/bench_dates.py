@@ -0,0 +1,96 @@
+# benchmarks/bench_dates.py
+"""
+Experience-year extraction: month-table fast path vs. fuzzy dateutil.
+
+    python -m benchmarks.bench_dates --docs 2000
+
+Builds a corpus of work histories in every supported format (plus odd ones
+that must fall back to dateutil), checks that extract_experience_years gives
+the same total as a dateutil-only reference for every document, and reports
+the speedup. Exits 1 if any document differs.
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime
+
+from app import parsers
+from app.parsers import DATE_RANGE_PATTERN, extract_experience_years
+
+MONTH_FORMS = ["Jan", "January", "Feb", "Mar", "March", "Apr", "May", "Jun", "June", "Jul",
+               "Aug", "August", "Sep", "Sept", "September", "Oct", "October", "Nov", "Dec", "December"]
+ODD_FORMS = ["Jan/", "Feb-", "Summer", "Spring", "Mon", "Since", "Q3"]
+SEPARATORS = [" - ", "–", " — ", " to ", "-", " – "]
+
+def date_text(rng, year):
+    roll = rng.random()
+    if roll < 0.3:
+        return str(year)
+    if roll < 0.9:
+        return f"{rng.choice(MONTH_FORMS)}{rng.choice(['', '.', ','])} {year}"
+    return f"{rng.choice(ODD_FORMS)} {year}"
+
+def synthetic_history(rng, jobs):
+    lines = ["Experience"]
+    for _ in range(jobs):
+        start = rng.randint(1990, 2023)
+        end = "Present" if rng.random() < 0.1 else str(rng.randint(start, 2024))
+        end_text = end if end == "Present" else date_text(rng, end)
+        lines.append(f"Engineer, Acme Corp, Toronto, {date_text(rng, start)}{rng.choice(SEPARATORS)}{end_text}")
+        lines.append("Built services and mentored a team of four engineers.")
+    return "\n".join(lines)
+
+def reference_years(text):
+    """Same normalization and merge, but every date goes through fuzzy dateutil."""
+    text = text.replace('–', '-').replace('—', '-').lower()
+    intervals = []
+    for match in DATE_RANGE_PATTERN.finditer(text):
+        start_dt = parsers.parse_date_safe.__wrapped__(f"{match.group(1) or ''} {match.group(2)}".strip())
+        if match.group(4) == "present":
+            end_dt = datetime.now()
+        else:
+            end_dt = parsers.parse_date_safe.__wrapped__(f"{match.group(3) or ''} {match.group(4)}".strip())
+        if start_dt and end_dt and end_dt > start_dt:
+            intervals.append((start_dt, end_dt))
+    intervals.sort()
+    merged = []
+    for start, end in intervals:
+        if not merged or start > merged[-1][1]:
+            merged.append([start, end])
+        else:
+            merged[-1][1] = max(merged[-1][1], end)
+    total_months = sum((e.year - s.year) * 12 + (e.month - s.month) for s, e in merged)
+    years = round(total_months / 12.0, 1)
+    return int(round(years)) if years > 0 else None
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--docs", type=int, default=2000)
+    ap.add_argument("--max-jobs", type=int, default=15)
+    args = ap.parse_args(argv)
+
+    rng = random.Random(0)
+    corpus = [synthetic_history(rng, rng.randint(1, args.max_jobs)) for _ in range(args.docs)]
+
+    start = time.perf_counter()
+    expected = [reference_years(text) for text in corpus]
+    reference_s = time.perf_counter() - start
+
+    parsers.parse_date_safe.cache_clear()
+    start = time.perf_counter()
+    actual = [extract_experience_years(text) for text in corpus]
+    fast_s = time.perf_counter() - start
+
+    mismatches = [i for i, (a, b) in enumerate(zip(actual, expected)) if a != b]
+    for i in mismatches[:5]:
+        print(f"mismatch: expected {expected[i]}, got {actual[i]}: {corpus[i]!r}")
+    print(f"{args.docs} documents, {len(mismatches)} with a different year total")
+    print(f"dateutil only: {reference_s * 1000 / args.docs:8.3f} ms/doc")
+    print(f"fast path:     {fast_s * 1000 / args.docs:8.3f} ms/doc")
+    print(f"speedup:       {reference_s / fast_s:8.1f}x  ({parsers.parse_date_safe.cache_info()})")
+    return 1 if mismatches else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+# benchmarks/bench_docx.py
+"""
+Streaming DOCX extraction (app.parsers.DocxTextStream) vs. python-docx.
+
+    python -m benchmarks.bench_docx --count 20 --pages 2
+
+Synthetic .docx resumes in every layout (benchmarks/corpus.py) are extracted
+both ways and timed. Parity: every paragraph python-docx returns must appear,
+in the same order, in the streamed text, and for layouts without tables the
+two texts must be identical (page headers and footers are kept out of the
+text, as python-docx's paragraphs do). Lines found only by the streaming
+extractor (table cells) are counted per layout. A resume whose email and
+phone are only in the page footer is also parsed end to end: the footer and
+the "Curriculum Vitae" header must stay out of the text and the name, while
+the email and phone are still found. The exit code is 1 on any failure.
+"""
+
+import argparse
+import io
+import sys
+import time
+
+from app.parsers import extract_text_from_docx
+from benchmarks.corpus import LAYOUTS, generate_corpus
+
+def python_docx_text(docx_bytes):
+    """extract_text_from_docx as it was: body paragraphs from the python-docx object model."""
+    import docx
+    return "\n".join(para.text for para in docx.Document(io.BytesIO(docx_bytes)).paragraphs)
+
+def is_subsequence(lines, of):
+    remaining = iter(of)
+    return all(line in remaining for line in lines)
+
+def check_header_footer():
+    """Returns the number of failed checks for a resume with contact details only in its header/footer."""
+    import docx
+    from app.parsers import parse_resume
+
+    document = docx.Document()
+    section = document.sections[0]
+    section.header.paragraphs[0].text = "Curriculum Vitae"
+    section.footer.paragraphs[0].text = "jane.doe@example.com | +1 555 123 4567"
+    for line in ["Jane Doe", "Experience", "Engineer, Acme Corp, 2019 to 2023", "Education", "BSc Computer Science"]:
+        document.add_paragraph(line)
+    buf = io.BytesIO()
+    document.save(buf)
+    resume = parse_resume(buf.getvalue(), "footer_contact.docx")
+    checks = [
+        ("header/footer kept out of the text",
+         "Curriculum Vitae" not in resume.text and "example.com" not in resume.text),
+        ("header/footer kept for the fallback",
+         "Curriculum Vitae" in resume.extraction.get("header_footer_text", "")),
+        ("name taken from the body", resume.metadata["name"] != "Curriculum Vitae"),
+        ("email found in the footer", resume.metadata["email"] == "jane.doe@example.com"),
+        ("phone found in the footer", resume.metadata["phone"] == "+1 555 123 4567"),
+    ]
+    failures = 0
+    for name, ok in checks:
+        if not ok:
+            failures += 1
+            print(f"header/footer check failed: {name}")
+    print(f"header/footer checks: {len(checks) - failures}/{len(checks)} passed")
+    return failures
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--count", type=int, default=20, help="documents per layout")
+    ap.add_argument("--pages", type=int, default=2)
+    ap.add_argument("--repeat", type=int, default=3, help="timed passes over each document")
+    args = ap.parse_args(argv)
+
+    python_docx_text(next(iter(generate_corpus(1, "docx", 1)))[1])  # import python-docx before timing
+    failures = check_header_footer()
+    totals = {"python-docx": 0.0, "streaming": 0.0}
+    for layout in LAYOUTS:
+        docs = [data for _, data in generate_corpus(args.count, "docx", args.pages, layout=layout)]
+        seconds = {}
+        for label, extract in (("python-docx", python_docx_text), ("streaming", extract_text_from_docx)):
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                texts = [extract(data) for data in docs]
+            seconds[label] = (time.perf_counter() - start) / (args.repeat * len(docs))
+            totals[label] += seconds[label]
+            if label == "python-docx":
+                reference = texts
+        extra = mismatched = 0
+        for old, new in zip(reference, texts):
+            old_lines, new_lines = old.split("\n"), new.split("\n")
+            extra += len(new_lines) - len(old_lines)
+            if not is_subsequence(old_lines, new_lines) or (layout != "table" and old != new):
+                mismatched += 1
+        failures += mismatched
+        print(f"{layout:16} python-docx {seconds['python-docx'] * 1000:6.2f} ms  "
+              f"streaming {seconds['streaming'] * 1000:6.2f} ms  "
+              f"({seconds['python-docx'] / seconds['streaming']:.1f}x)  "
+              f"extra lines/doc {extra / len(docs):6.1f}  parity failures {mismatched}")
+    print(f"overall: {totals['python-docx'] / totals['streaming']:.1f}x faster, {failures} failures")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+# benchmarks/bench_match_matrix.py
+"""
+Vectorized resume x JD matrix vs. pairwise jd_based_score.
+
+    python -m benchmarks.bench_match_matrix --resumes 5000 --jds 100
+
+Checks that every cell matches the scalar function exactly (on a sample of
+pairs when the full scalar run would be too slow), then reports timings.
+"""
+
+import argparse
+import random
+import time
+
+from app.match_matrix import match_matrix
+from app.scoring import compile_jd, jd_based_score
+
+WORDS = (
+    "python java sql docker kubernetes aws azure react node.js linux git agile scrum "
+    "team lead senior engineer developer design build deploy scale data analysis "
+    "machine learning pipelines testing api microservices cloud security years "
+    "experience communication stakeholders product delivery mentoring"
+).split()
+SKILLS = ["python", "java", "sql", "docker", "kubernetes", "aws", "azure", "react", "node.js", "linux", "git"]
+
+def synthetic_metadata(rng):
+    return {
+        "raw_text": " ".join(rng.choices(WORDS, k=rng.randint(100, 600))) + f" id{rng.randint(0, 10**6)}",
+        "skills": rng.sample(SKILLS, rng.randint(0, 8)),
+        "experience_years": rng.choice([None, 0, 1, 2, 3, 5, 8, 12]),
+    }
+
+def synthetic_jd(rng):
+    return " ".join(rng.choices(WORDS, k=rng.randint(30, 120))) + f" {rng.randint(1, 9)} years"
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--resumes", type=int, default=5000)
+    ap.add_argument("--jds", type=int, default=100)
+    ap.add_argument("--check-pairs", type=int, default=20000, help="pairs verified against the scalar function")
+    args = ap.parse_args()
+
+    rng = random.Random(0)
+    resumes = [synthetic_metadata(rng) for _ in range(args.resumes)]
+    jds = [compile_jd(synthetic_jd(rng)) for _ in range(args.jds)]
+
+    start = time.perf_counter()
+    m = match_matrix(resumes, jds)
+    vector_s = time.perf_counter() - start
+
+    pairs = [(i, j) for i in range(args.resumes) for j in range(args.jds)]
+    if len(pairs) > args.check_pairs:
+        pairs = rng.sample(pairs, args.check_pairs)
+    start = time.perf_counter()
+    for i, j in pairs:
+        expected = jd_based_score(resumes[i], jds[j], "entry")
+        details = expected["details"]
+        assert m["score"][i, j] == expected["score"], (i, j)
+        assert m["skill_match_pct"][i, j] == details["skill_match_pct"], (i, j)
+        assert m["word_match_pct"][i, j] == details["word_match_pct"], (i, j)
+        assert bool(m["exp_match"][i, j]) == details["exp_match"], (i, j)
+    scalar_s = (time.perf_counter() - start) / len(pairs) * args.resumes * args.jds
+
+    cells = args.resumes * args.jds
+    print(f"{cells} cells, {len(pairs)} verified identical to jd_based_score")
+    print(f"vectorized: {vector_s:8.2f} s")
+    print(f"scalar:     {scalar_s:8.2f} s (extrapolated)")
+    print(f"speedup:    {scalar_s / vector_s:8.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# benchmarks/bench_reports.py
+"""
+PDF report throughput: per-call font parsing vs. the prepared font.
+
+    python -m benchmarks.bench_reports --reports 200 --workers 4
+
+The legacy path is the previous generate_pdf_report: a fresh add_font() of
+the full DejaVuSans.ttf (twice) and multi_cell on hand-chunked lines for every
+report. Then app.report.render_reports writes the same reports to a temp
+folder across a worker pool.
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from fpdf.enums import XPos, YPos
+
+from app.report import FONT_PATH, PDF, clean_text, generate_pdf_report, render_reports, warmup
+from app.parsers import ParsedResume
+
+SECTIONS = ["name", "email", "phone", "skills", "education", "experience_years", "projects", "summary"]
+PHRASES = [
+    "Consider adding quantified results to your experience bullets.",
+    "Your summary is generic; tailor it to the role.",
+    "Strong use of action verbs throughout.",
+    "Add links to your GitHub projects.",
+    "Skills section should group tools by category.",
+]
+
+def synthetic_record(rng, i):
+    return {
+        "file": f"resume_{i:05d}.pdf",
+        "ats_score": rng.randint(20, 95),
+        "jd_score": rng.randint(0, 100),
+        "ai_score": rng.randint(0, 100),
+        "ats_details": {
+            "sections": [{"section": s, "weight": rng.choice([5, 10, 20]), "present": rng.random() < 0.7}
+                         for s in SECTIONS],
+            "warnings": [f"Missing {s} section." for s in rng.sample(SECTIONS, rng.randint(0, 3))],
+        },
+        "ai_feedback": "\n".join(f"• {rng.choice(PHRASES)}" for _ in range(rng.randint(5, 30))),
+    }
+
+def legacy_report(record, level):
+    pdf = PDF()
+    pdf.add_font("DejaVu", "", FONT_PATH)
+    pdf.add_font("DejaVu", "B", FONT_PATH)
+    pdf.add_page()
+    pdf.set_font("DejaVu", "", 12)
+    pdf.cell(190, 10, clean_text(f"Resume: {record['file']}"), new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+    for s in record["ats_details"]["sections"]:
+        pdf.multi_cell(190, 10, clean_text(f"{s['section']} (Importance: {s['weight']}%): {'✔️' if s['present'] else '✗'}"))
+    for warning in record["ats_details"]["warnings"]:
+        for chunk in [warning[i:i+80] for i in range(0, len(warning), 80)]:
+            pdf.multi_cell(190, 10, clean_text(f"⚠️ {chunk}"))
+    pdf.set_font("DejaVu", "", 11)
+    for line in clean_text(record["ai_feedback"]).split("\n"):
+        for chunk in [line[i:i+110] for i in range(0, len(line), 110)]:
+            pdf.multi_cell(190, 8, chunk)
+    return bytes(pdf.output(name=None))
+
+def prepared_report(record, level):
+    details = record["ats_details"]
+    return generate_pdf_report(
+        ParsedResume("", record["file"], ""), level, record["ats_score"], record["jd_score"],
+        record["ai_score"], details["sections"], details["warnings"], record["ai_feedback"],
+    )
+
+def per_second(fn, records, level):
+    start = time.perf_counter()
+    for record in records:
+        fn(record, level)
+    return len(records) / (time.perf_counter() - start)
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--reports", type=int, default=200)
+    ap.add_argument("--legacy-reports", type=int, default=30, help="the legacy path is slow; time fewer")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = ap.parse_args()
+
+    rng = random.Random(0)
+    records = [synthetic_record(rng, i) for i in range(args.reports)]
+
+    start = time.perf_counter()
+    warmup()
+    prepare_s = time.perf_counter() - start
+    legacy = per_second(legacy_report, records[:args.legacy_reports], "mid")
+    prepared = per_second(prepared_report, records, "mid")
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        start = time.perf_counter()
+        written = sum(1 for _, path, _ in render_reports(iter(records), out_dir, "mid", args.workers) if path)
+        pooled = written / (time.perf_counter() - start)
+
+    print(f"font prepare (once per process): {prepare_s * 1000:8.1f} ms")
+    print(f"legacy, 1 process:   {legacy:8.1f} reports/s")
+    print(f"prepared, 1 process: {prepared:8.1f} reports/s ({prepared / legacy:.1f}x)")
+    print(f"render_reports, {args.workers} workers, to disk: {pooled:8.1f} reports/s (incl. pool start)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# benchmarks/bench_resume_store.py
+"""
+Re-scoring from app.resume_store vs. re-parsing.
+
+    python -m benchmarks.bench_resume_store --resumes 100000 --unique 60
+
+A few synthetic resumes (benchmarks/corpus.py, every layout) are parsed for
+real and timed; their metadata is then stored under --resumes distinct content
+hashes, and ResumeStore.rescore is timed over the whole store. Every rescored
+record is checked against traditional_ats_score / jd_based_score on the
+original, full metadata.
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+import time
+
+from app import warmup
+from app.parsers import parse_resume
+from app.resume_store import ResumeStore
+from app.scoring import compile_jd, jd_based_score, traditional_ats_score
+from benchmarks.bench_stages import JD
+from benchmarks.corpus import LAYOUTS, generate_corpus
+
+def parse_corpus(unique, pages):
+    files = []
+    for layout in LAYOUTS:
+        files += generate_corpus(max(1, unique // len(LAYOUTS)), "pdf", pages, layout=layout)
+    start = time.perf_counter()
+    parsed = []
+    for name, data in files:
+        resume = parse_resume(data, name)
+        resume.metadata
+        parsed.append(resume)
+    return parsed, (time.perf_counter() - start) / len(parsed)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--resumes", type=int, default=100000, help="rows in the store")
+    ap.add_argument("--unique", type=int, default=60, help="distinct synthetic resumes actually parsed")
+    ap.add_argument("--pages", type=int, default=2)
+    ap.add_argument("--level", choices=["entry", "mid", "senior"], default="mid")
+    args = ap.parse_args(argv)
+
+    warmup()
+    parsed, parse_seconds = parse_corpus(args.unique, args.pages)
+    print(f"parse: {parse_seconds * 1000:.1f} ms/resume over {len(parsed)} resumes "
+          f"-> {parse_seconds * args.resumes:.0f}s to re-parse {args.resumes}")
+
+    compiled = compile_jd(JD)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ResumeStore(os.path.join(tmp, "resumes.sqlite3"))
+        start = time.perf_counter()
+        batch, expected = [], {}
+        for i in range(args.resumes):
+            resume = parsed[i % len(parsed)]
+            key = hashlib.sha256(f"{resume.content_hash}:{i}".encode()).hexdigest()
+            batch.append((resume.metadata, key, resume.filename))
+            expected[key] = i % len(parsed)
+            if len(batch) == 5000:
+                store.put_many(batch)
+                batch = []
+        store.put_many(batch)
+        print(f"store: {args.resumes} rows in {time.perf_counter() - start:.1f}s, "
+              f"{os.path.getsize(store.path) / 2**20:.1f} MiB")
+
+        truth = [(traditional_ats_score(r, args.level), jd_based_score(r, compiled, args.level)) for r in parsed]
+        for label, jd in (("traditional only", None), ("traditional + JD", compiled)):
+            start = time.perf_counter()
+            records = list(store.rescore(jd, args.level))
+            seconds = time.perf_counter() - start
+            mismatches = 0
+            for record in records:
+                ats, jd_result = truth[expected[record["content_hash"]]]
+                mismatches += record["ats_score"] != ats["score"] or record["ats_details"] != ats["details"]
+                if jd is not None:
+                    mismatches += record["jd_score"] != jd_result["score"] or (
+                        sorted(record["jd_details"].pop("skills_matched")) != sorted(jd_result["details"]["skills_matched"])
+                        or record["jd_details"] != {k: v for k, v in jd_result["details"].items() if k != "skills_matched"}
+                    )
+            print(f"rescore ({label}): {len(records)} in {seconds:.2f}s "
+                  f"({len(records) / seconds:.0f}/s), mismatches: {mismatches}")
+            if mismatches:
+                return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+# benchmarks/bench_rule_engine.py
+"""
+Vectorized rule scoring (app.rule_engine) vs. the original per-record loop.
+
+    python -m benchmarks.bench_rule_engine --records 1000000
+
+Synthetic metadata records (every field randomly present or empty, 0-15
+skills, experience from none to 12 years) are scored at every level by:
+
+    reference    the original branching traditional_ats_score loop, kept here
+    one by one   app.scoring.traditional_ats_score per record
+    batch        app.scoring.traditional_ats_scores, full breakdowns
+    arrays       presence extraction + RuleTable.score (scores only)
+
+The one-by-one and batch results must equal the reference exactly (same
+dicts, same key order); the exit code is 1 otherwise.
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+
+import numpy as np
+
+from app import metrics
+from app.rule_engine import presence
+from app.scoring import (
+    SECTION_WEIGHTS_BY_LEVEL, TRADITIONAL_RULES, traditional_ats_score, traditional_ats_scores,
+)
+
+CHUNK = 100000
+
+@metrics.timed("bench.reference")  # the same wrapper the real scorer has
+def reference_score(metadata, level):
+    """traditional_ats_score as it was before app.rule_engine."""
+    weights = SECTION_WEIGHTS_BY_LEVEL.get(level, SECTION_WEIGHTS_BY_LEVEL["entry"])
+    score, section_breakdown, warnings = 0, [], []
+    for field, weight in weights.items():
+        present = bool(metadata.get(field)) and metadata.get(field) not in ["", [], None]
+        field_score = weight if present else 0
+        score += field_score
+        section_breakdown.append({"section": field, "present": present, "weight": weight, "score": field_score})
+        if not present and weight >= 15:
+            warnings.append(f"Your '{field.capitalize()}' section is critical for this level. Please add or improve it.")
+    num_skills = len(metadata.get("skills", []))
+    skills_bonus = 10 if num_skills >= 10 else 5 if num_skills >= 5 else 0
+    score += skills_bonus
+    exp = metadata.get("experience_years")
+    if exp is None:
+        exp = 0
+    exp_match = (level == "entry" and exp >= 0) or (level == "mid" and exp >= 3) or (level == "senior" and exp >= 7)
+    return {"score": min(int(score), 100), "details": {
+        "sections": section_breakdown, "skills_bonus": skills_bonus, "exp_match": exp_match,
+        "level": level, "warnings": warnings,
+    }}
+
+def make_records(count, seed=0):
+    rng = random.Random(seed)
+    records = []
+    for _ in range(count):
+        records.append({
+            "name": rng.choice(["Jane Doe", None]),
+            "email": rng.choice(["jane@example.com", None]),
+            "phone": rng.choice(["+1 555 0100", None, ""]),
+            "skills": ["python"] * rng.randint(0, 15),
+            "education": rng.choice([["BSc"], []]),
+            "experience_years": rng.choice([None, 0, 1, 2.5, 3, 5, 7, 12]),
+            "projects": rng.choice([["api"], []]),
+            "summary": rng.choice(["Engineer", ""]),
+        })
+    return records
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--records", type=int, default=1000000)
+    ap.add_argument("--levels", nargs="+", default=["entry", "mid", "senior"])
+    args = ap.parse_args(argv)
+
+    records = make_records(args.records)
+    mismatches = 0
+    for level in args.levels:
+        seconds = {"reference": 0.0, "one by one": 0.0, "batch": 0.0}
+        level_mismatches = 0
+        # compared CHUNK records at a time so three full result lists never coexist
+        for start in range(0, len(records), CHUNK):
+            chunk = records[start:start + CHUNK]
+            reference, elapsed = timed(lambda: [reference_score(r, level) for r in chunk])
+            seconds["reference"] += elapsed
+            single, elapsed = timed(lambda: [traditional_ats_score(r, level) for r in chunk])
+            seconds["one by one"] += elapsed
+            batch, elapsed = timed(lambda: traditional_ats_scores(chunk, level))
+            seconds["batch"] += elapsed
+            level_mismatches += sum(
+                a != b or json.dumps(a) != json.dumps(b) for results in (single, batch) for a, b in zip(reference, results)
+            )
+
+        def arrays():
+            flags = presence(records, TRADITIONAL_RULES.fields)
+            counts = np.fromiter((len(r["skills"]) for r in records), dtype=np.int64, count=len(records))
+            experience = np.fromiter((r["experience_years"] or 0 for r in records), dtype=np.float64,
+                                     count=len(records))
+            return TRADITIONAL_RULES.score(flags, counts, experience, level)
+
+        scores, seconds["arrays"] = timed(arrays)
+        level_mismatches += sum(reference_score(r, level)["score"] != s for r, s in zip(records, scores.score.tolist()))
+        mismatches += level_mismatches
+        print(f"{level} ({len(records)} records): " + ", ".join(f"{k} {v:.2f}s" for k, v in seconds.items())
+              + f", mismatches: {level_mismatches}")
+    return 1 if mismatches else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+# benchmarks/bench_search_index.py
+"""
+Build a large app.search_index.SearchIndex and time top-k queries.
+
+    python -m benchmarks.bench_search_index --docs 1000000 --path /tmp/candidates.sqlite3
+    python -m benchmarks.bench_search_index --path /tmp/candidates.sqlite3 --reuse
+
+Parsing a million real resumes would take hours, so documents are synthetic
+metadata dicts: raw_text drawn from a Zipf-distributed vocabulary (so common
+words have long posting lists and rare ones short, as in real text) mixed with
+taxonomy skill names, plus a skills list. Queries are the benchmark JD and
+short recruiter-style keyword queries, each timed cold (postings read from
+SQLite) and warm (decoded postings cached).
+"""
+
+import argparse
+import itertools
+import os
+import random
+import sys
+import time
+
+from app import warmup
+from app.scoring import compile_jd
+from app.search_index import SearchIndex
+from benchmarks.bench_stages import JD, percentile
+
+SKILLS = ["python", "django", "sql", "docker", "kubernetes", "aws", "kafka", "redis", "react",
+          "java", "go", "terraform", "spark", "pandas", "excel", "tableau", "figma", "node.js"]
+QUERIES = [
+    "python django postgres",
+    "senior kubernetes terraform aws",
+    "data analyst excel tableau sql",
+    "react typescript frontend",
+    "machine learning pandas spark",
+]
+
+def synthetic_docs(count, words_per_doc, vocab_size, seed):
+    rng = random.Random(seed)
+    vocab = [f"w{i}" for i in range(vocab_size)]
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(vocab_size)))
+    for i in range(count):
+        skills = rng.sample(SKILLS, rng.randint(3, 8))
+        words = rng.choices(vocab, cum_weights=cum_weights, k=words_per_doc) + skills
+        yield f"doc-{i}", {"raw_text": " ".join(words), "skills": skills}
+
+def build(index, args):
+    start = time.perf_counter()
+    for n, (key, metadata) in enumerate(synthetic_docs(args.docs, args.words, args.vocab, args.seed), 1):
+        index.add(key, metadata)
+        if n % 100000 == 0:
+            print(f"  {n} docs ({time.perf_counter() - start:.1f}s)")
+    index.flush()
+    index.compact()
+    return time.perf_counter() - start
+
+def time_queries(index, queries, k, repeat):
+    samples = []
+    for _ in range(repeat):
+        for query in queries:
+            start = time.perf_counter()
+            index.search(query, k)
+            samples.append(time.perf_counter() - start)
+    return sorted(samples)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--docs", type=int, default=100000)
+    ap.add_argument("--words", type=int, default=300, help="words per synthetic resume")
+    ap.add_argument("--vocab", type=int, default=50000)
+    ap.add_argument("--path", default=".cache/bench_search_index.sqlite3")
+    ap.add_argument("--reuse", action="store_true", help="query an index already built at --path")
+    ap.add_argument("-k", type=int, default=20)
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args(argv)
+
+    warmup()
+    if not args.reuse and os.path.exists(args.path):
+        os.remove(args.path)
+    with SearchIndex(args.path) as index:
+        if not args.reuse:
+            seconds = build(index, args)
+            print(f"indexed {len(index)} docs in {seconds:.1f}s ({len(index) / seconds:.0f} docs/s), "
+                  f"{os.path.getsize(args.path) / 2**20:.1f} MiB on disk")
+
+        queries = [compile_jd(JD)] + QUERIES
+        cold = time_queries(index, queries, args.k, 1)
+        warm = time_queries(index, queries, args.k, args.repeat)
+        for label, samples in (("cold", cold), ("warm", warm)):
+            print(f"{label:5} queries: n={len(samples)} p50={percentile(samples, 50) * 1000:.2f} ms "
+                  f"p95={percentile(samples, 95) * 1000:.2f} ms max={samples[-1] * 1000:.2f} ms")
+        for key, score, _ in index.search(QUERIES[0], 5):
+            print(f"  {key:>12} {score:.3f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
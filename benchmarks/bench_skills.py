@@ -0,0 +1,77 @@
+# benchmarks/bench_skills.py
+"""
+Before/after benchmark for skill extraction.
+
+    python -m benchmarks.bench_skills --docs 200
+
+"before" replays the original implementation: two nlp() calls over the full
+en_core_web_sm pipeline (including NER). "after" is app.parsers.extract_skills
+(one Doc, trimmed pipeline) and extract_skills_batch (nlp.pipe).
+"""
+
+import argparse
+import random
+import time
+
+import spacy
+
+from app.parsers import extract_skills, extract_skills_batch
+
+# The 21-entry list the original implementation scanned
+LEGACY_SKILLS = [
+    "python", "java", "c++", "sql", "aws", "azure", "docker", "kubernetes",
+    "javascript", "typescript", "node.js", "react", "django", "flask",
+    "git", "linux", "html", "css", "nlp", "machine learning", "data analysis"
+]
+
+FILLER = (
+    "Led a team of engineers to deliver features on time and improved reliability "
+    "of production systems while mentoring junior developers and reviewing code."
+).split()
+
+def synthetic_resume(rng, lines=60):
+    out = []
+    for _ in range(lines):
+        words = rng.sample(FILLER, 10) + rng.sample(LEGACY_SKILLS, 2)
+        rng.shuffle(words)
+        out.append(" ".join(words) + ".")
+    return "\n".join(out)
+
+def legacy_extract_skills(full_nlp, text):
+    tokens = set([token.text.lower() for token in full_nlp(text)])
+    found = [skill for skill in LEGACY_SKILLS if skill in tokens]
+    for chunk in full_nlp(text).noun_chunks:
+        c = chunk.text.lower()
+        if c not in found and c in LEGACY_SKILLS:
+            found.append(c)
+    return list(set(found))
+
+def timed(label, fn, n_docs):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed * 1000 / n_docs:8.2f} ms/doc {n_docs / elapsed:9.1f} docs/s")
+    return elapsed
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--docs", type=int, default=200)
+    ap.add_argument("--batch-size", type=int, default=32)
+    ap.add_argument("--n-process", type=int, default=1)
+    args = ap.parse_args()
+
+    rng = random.Random(0)
+    texts = [synthetic_resume(rng) for _ in range(args.docs)]
+    full_nlp = spacy.load("en_core_web_sm")
+
+    before = timed("before: 2x full pipeline", lambda: [legacy_extract_skills(full_nlp, t) for t in texts], args.docs)
+    after = timed("after: extract_skills", lambda: [extract_skills(t) for t in texts], args.docs)
+    batch = timed(
+        f"after: nlp.pipe (n_process={args.n_process})",
+        lambda: list(extract_skills_batch(texts, batch_size=args.batch_size, n_process=args.n_process)),
+        args.docs,
+    )
+    print(f"speedup: single {before / after:.1f}x, batch {before / batch:.1f}x")
+
+if __name__ == "__main__":
+    main()
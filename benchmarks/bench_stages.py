@@ -0,0 +1,227 @@
+# benchmarks/bench_stages.py
+"""
+Per-stage latency, throughput and memory over a synthetic resume corpus.
+
+    python -m benchmarks.bench_stages --count 10 --pages 2 -o stages.json
+    python -m benchmarks.bench_stages --save-baseline benchmarks/baseline.json
+    python -m benchmarks.bench_stages --baseline benchmarks/baseline.json
+
+Every stage of the pipeline is timed on its own, for every document in the
+corpus (see benchmarks/corpus.py; one batch per format x layout):
+
+    extract_text[pdf|docx]   bytes -> text
+    extract_skills           taxonomy match
+    experience_years         date ranges -> years
+    sections                 SectionIndex + education/experience/projects
+    traditional_ats_score
+    jd_based_score           against a precompiled JD
+    pdf_report               app.report.generate_pdf_report
+
+Timings come from a first pass without tracing. Peak memory comes from a
+second pass under tracemalloc, which only sees Python allocations (MuPDF's
+own buffers are not counted). With --baseline, stages whose p50 or p95 got
+slower by more than --tolerance are reported and the exit code is 1.
+"""
+
+import argparse
+import json
+import math
+import platform
+import sys
+import time
+import tracemalloc
+
+from app import warmup
+from app.parsers import (
+    ParsedResume, SectionIndex, build_metadata, content_hash, extract_education,
+    extract_experience, extract_experience_years, extract_projects, extract_skills, extract_text,
+)
+from app.report import generate_pdf_report
+from app.scoring import compile_jd, jd_based_score, traditional_ats_score
+from benchmarks.corpus import LAYOUTS, generate_corpus
+
+JD = (
+    "We are hiring a backend engineer with 3 years of experience in Python, Django, SQL, "
+    "Docker, Kubernetes and AWS. Experience with Kafka, Redis and CI/CD pipelines is a plus; "
+    "you will design, build and scale reliable services and mentor the team."
+)
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+def build_corpus(args):
+    docs = []
+    for fmt in args.formats:
+        for layout in args.layouts:
+            for name, data in generate_corpus(args.count, fmt, args.pages, args.jobs,
+                                              args.skills_density, layout, args.seed):
+                docs.append({"format": fmt, "name": name, "bytes": data})
+    return docs
+
+def prepare(docs, level):
+    """Inputs each stage needs, computed once outside the timed region."""
+    for doc in docs:
+        text = extract_text(doc["bytes"], doc["name"])
+        metadata = build_metadata(text)
+        ats = traditional_ats_score(metadata, level)
+        doc.update(
+            text=text,
+            metadata=metadata,
+            resume=ParsedResume(content_hash(doc["bytes"]), doc["name"], text, metadata=metadata),
+            ats=ats,
+        )
+
+def _sections(text):
+    index = SectionIndex(text)
+    extract_education(text, index)
+    extract_experience(text, index)
+    extract_projects(text, index)
+
+def stage_calls(docs, jd, level):
+    """(stage name, [zero-argument callables, one per document])."""
+    stages = {}
+    for doc in docs:
+        text, metadata, resume, ats = doc["text"], doc["metadata"], doc["resume"], doc["ats"]
+        calls = [
+            (f"extract_text[{doc['format']}]", lambda d=doc: extract_text(d["bytes"], d["name"])),
+            ("extract_skills", lambda t=text: extract_skills(t)),
+            ("experience_years", lambda t=text: extract_experience_years(t)),
+            ("sections", lambda t=text: _sections(t)),
+            ("traditional_ats_score", lambda m=metadata: traditional_ats_score(m, level)),
+            ("jd_based_score", lambda m=metadata: jd_based_score(m, jd, level)),
+            ("pdf_report", lambda r=resume, a=ats: generate_pdf_report(
+                r, level, a["score"], None, 0, a["details"]["sections"], a["details"]["warnings"], "")),
+        ]
+        for name, call in calls:
+            stages.setdefault(name, []).append(call)
+    return stages
+
+def time_stage(calls):
+    samples = []
+    for call in calls:
+        start = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+def peak_memory(calls):
+    """Largest traced peak over single calls, in bytes."""
+    tracemalloc.start()
+    try:
+        peak = 0
+        for call in calls:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            call()
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - base)
+    finally:
+        tracemalloc.stop()
+    return peak
+
+def summarize(samples, peak_bytes):
+    ordered = sorted(samples)
+    total = sum(ordered)
+    return {
+        "n": len(ordered),
+        "mean_ms": round(total / len(ordered) * 1000, 4),
+        "p50_ms": round(percentile(ordered, 50) * 1000, 4),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 4),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 4),
+        "max_ms": round(ordered[-1] * 1000, 4),
+        "docs_per_second": round(len(ordered) / total, 2) if total > 0 else None,
+        "peak_kib": round(peak_bytes / 1024, 1),
+    }
+
+def compare(results, baseline, tolerance):
+    """Stages slower than baseline by more than tolerance, as printable lines."""
+    regressions = []
+    for name, current in results["stages"].items():
+        previous = baseline.get("stages", {}).get(name)
+        if previous is None:
+            continue
+        for metric in ("p50_ms", "p95_ms"):
+            if previous[metric] > 0 and current[metric] > previous[metric] * (1 + tolerance):
+                regressions.append(
+                    f"{name} {metric}: {previous[metric]:.3f} -> {current[metric]:.3f} ms "
+                    f"({current[metric] / previous[metric]:.2f}x)"
+                )
+    return regressions
+
+def print_table(results, baseline=None, log=sys.stdout):
+    header = f"{'stage':24} {'n':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'docs/s':>9} {'peak KiB':>9}"
+    if baseline:
+        header += f" {'p50 vs base':>11}"
+    print(header, file=log)
+    for name, s in results["stages"].items():
+        line = (f"{name:24} {s['n']:>5} {s['p50_ms']:>9.3f} {s['p95_ms']:>9.3f} {s['p99_ms']:>9.3f} "
+                f"{s['docs_per_second'] or 0:>9.1f} {s['peak_kib']:>9.1f}")
+        previous = (baseline or {}).get("stages", {}).get(name)
+        if previous and previous["p50_ms"] > 0:
+            line += f" {s['p50_ms'] / previous['p50_ms']:>10.2f}x"
+        print(line, file=log)
+
+def run(args):
+    warmup()
+    docs = build_corpus(args)
+    prepare(docs, args.level)
+    jd = compile_jd(JD)
+    stages = stage_calls(docs, jd, args.level)
+    # one untimed call per stage so lazy imports and first-use caches are warm
+    for calls in stages.values():
+        calls[0]()
+
+    results = {
+        "config": {
+            "formats": args.formats, "layouts": args.layouts, "count": args.count, "pages": args.pages,
+            "jobs": args.jobs, "skills_density": args.skills_density, "level": args.level, "seed": args.seed,
+        },
+        "environment": {"python": platform.python_version(), "platform": platform.platform()},
+        "stages": {},
+    }
+    for name, calls in stages.items():
+        samples = time_stage(calls)
+        results["stages"][name] = summarize(samples, peak_memory(calls) if args.memory else 0)
+    return results
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--count", type=int, default=10, help="documents per format x layout")
+    ap.add_argument("--formats", nargs="+", choices=["pdf", "docx"], default=["pdf", "docx"])
+    ap.add_argument("--layouts", nargs="+", choices=LAYOUTS, default=LAYOUTS)
+    ap.add_argument("--pages", type=int, default=2)
+    ap.add_argument("--jobs", type=int, default=5)
+    ap.add_argument("--skills-density", type=int, default=1)
+    ap.add_argument("--level", choices=["entry", "mid", "senior"], default="mid")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--no-memory", dest="memory", action="store_false", help="skip the tracemalloc pass")
+    ap.add_argument("-o", "--output", help="write results JSON here")
+    ap.add_argument("--baseline", help="compare against this results JSON")
+    ap.add_argument("--save-baseline", help="write results JSON here as the new baseline")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown before flagging (0.25 = 25%%)")
+    args = ap.parse_args(argv)
+
+    results = run(args)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_table(results, baseline)
+
+    for path in filter(None, [args.output, args.save_baseline]):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"wrote {path}")
+
+    if baseline:
+        regressions = compare(results, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
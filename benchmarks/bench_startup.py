@@ -0,0 +1,59 @@
+# benchmarks/bench_startup.py
+"""
+Cold import time per module, each measured in a fresh interpreter.
+
+    python -m benchmarks.bench_startup --runs 5
+
+Also times app.warmup(), the explicit step services run after fork to load
+spaCy and the skill taxonomy before the first request.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+MODULES = ["app.scoring", "app.parsers", "app.ai_scoring", "app.batch", "app.main", "app.report"]
+
+SNIPPET = """
+import time
+t = time.perf_counter()
+{stmt}
+print(time.perf_counter() - t)
+"""
+
+def time_statement(stmt, runs, env):
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", SNIPPET.format(stmt=stmt)],
+            capture_output=True, text=True, env=env,
+        )
+        if out.returncode != 0:
+            return None, out.stderr.strip().splitlines()[-1]
+        samples.append(float(out.stdout.strip().splitlines()[-1]))
+    return statistics.median(samples), None
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--json", help="also write results to this file")
+    args = ap.parse_args()
+
+    env = dict(os.environ)
+    # Measure without a Gemini key unless one is configured: rule scoring must import regardless
+    results = {}
+    targets = [(m, f"import {m}") for m in MODULES] + [("app.warmup()", "import app; app.warmup()")]
+    for label, stmt in targets:
+        median, error = time_statement(stmt, args.runs, env)
+        results[label] = median
+        shown = f"{median * 1000:9.1f} ms" if median is not None else f"   failed: {error}"
+        print(f"{label:<16} {shown}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# benchmarks/bench_taxonomy.py
+"""
+Per-document skill matching cost as the taxonomy grows.
+
+    python -m benchmarks.bench_taxonomy --sizes 100 1000 10000 50000
+
+Compares the compiled SkillTaxonomy (one pass over the tokens) with the
+original linear scan (`skill in tokens` / `skill in text.lower()` per skill).
+The taxonomy column should stay flat while the linear scan grows with size.
+
+It first checks the shipped taxonomy on CONTEXT_CASES, sentences where an
+everyday word is or is not a skill; the exit code is 1 if any is wrong.
+"""
+
+import argparse
+import random
+import string
+import sys
+import time
+
+from app.parsers import nlp, skill_taxonomy
+from app.skill_taxonomy import SkillTaxonomy
+from benchmarks.bench_skills import synthetic_resume
+
+# (text, skills the shipped taxonomy must find, in order)
+CONTEXT_CASES = [
+    ("Spring 2019 internship", []),
+    ("Go further.", []),
+    ("Swift delivery of projects", []),
+    ("Excel at communication", ["communication"]),
+    ("Option C", []),
+    ("Go-to person for releases", []),
+    ("Skills: Python, Go, Java", ["python", "go", "java"]),
+    ("Experience with Go and Rust", ["go", "rust"]),
+    ("Languages: C, C++ and Rust", ["c", "c++", "rust"]),
+    ("Built microservices in Go", ["microservices", "go"]),
+    ("Java / Spring Boot developer", ["java", "spring boot"]),
+    ("Developed REST APIs with Spring and Hibernate", ["rest api", "spring"]),
+    ("Skills\n• Go\n• Swift\nExcel\n", ["go", "swift", "excel"]),
+    ("Reports in Excel and PowerPoint", ["excel"]),
+    ("Wrote iOS apps in Swift", ["ios", "swift"]),
+    ("Statistical modelling in R", ["r"]),
+]
+
+def check_context_cases():
+    failures = 0
+    for text, expected in CONTEXT_CASES:
+        found = skill_taxonomy.match(nlp.make_doc(text))
+        if found != expected:
+            failures += 1
+            print(f"context check failed: {text!r}: expected {expected}, got {found}")
+    print(f"context checks: {len(CONTEXT_CASES) - failures}/{len(CONTEXT_CASES)} passed")
+    return failures
+
+def synthetic_taxonomy(rng, size):
+    entries = [{"name": name} for name in skill_taxonomy.names]
+    while len(entries) < size:
+        words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9)))
+                 for _ in range(rng.randint(1, 3))]
+        entries.append({"name": " ".join(words), "aliases": [words[0] + "-x"]})
+    return entries[:size]
+
+def linear_scan(skills, text):
+    low = text.lower()
+    tokens = {token.lower_ for token in nlp.make_doc(text)}
+    return [skill for skill in skills if skill in tokens or skill in low]
+
+def per_doc_ms(fn, texts):
+    start = time.perf_counter()
+    for text in texts:
+        fn(text)
+    return (time.perf_counter() - start) * 1000 / len(texts)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000, 50000])
+    ap.add_argument("--docs", type=int, default=100)
+    args = ap.parse_args(argv)
+
+    failures = check_context_cases()
+    rng = random.Random(0)
+    texts = [synthetic_resume(rng) for _ in range(args.docs)]
+    print(f"{'skills':>8} {'compile s':>10} {'taxonomy ms/doc':>16} {'linear ms/doc':>14}")
+    for size in args.sizes:
+        entries = synthetic_taxonomy(rng, size)
+        start = time.perf_counter()
+        taxonomy = SkillTaxonomy(nlp, entries)
+        compile_s = time.perf_counter() - start
+        matched = per_doc_ms(lambda t: taxonomy.match(nlp.make_doc(t)), texts)
+        names = [e["name"] for e in entries]
+        linear = per_doc_ms(lambda t: linear_scan(names, t), texts)
+        print(f"{size:>8} {compile_s:>10.2f} {matched:>16.3f} {linear:>14.3f}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
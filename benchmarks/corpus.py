@@ -0,0 +1,193 @@
+# benchmarks/corpus.py
+"""
+Synthetic resume corpus for benchmarks.
+
+    python -m benchmarks.corpus out/ --count 50 --format pdf --pages 3 --jobs 8 --layout two_column
+
+Every knob is controlled: page count, number of jobs, skills density (skills
+mentioned per line of prose) and layout. Layouts beyond "standard" reproduce
+shapes that are known to be slow or awkward for the parsers:
+
+- two_column:       sidebar text interleaved with the main column (PDF)
+- no_headers:       no recognisable section headers at all
+- long_lines:       whole sections collapsed onto single very long lines
+- repeated_headers: a page header/footer repeated on every page
+- table:            skills and jobs laid out in tables
+"""
+
+import argparse
+import io
+import os
+import random
+import textwrap
+
+LAYOUTS = ["standard", "two_column", "no_headers", "long_lines", "repeated_headers", "table"]
+LINES_PER_PAGE = 52
+
+FIRST = ["Alex", "Priya", "Jordan", "Mei", "Samuel", "Fatima", "Lucas", "Aisha", "Noah", "Elena"]
+LAST = ["Kumar", "Smith", "Okafor", "Chen", "Garcia", "Novak", "Haddad", "Silva", "Brown", "Ito"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella", "Stark Industries", "Wayne Tech", "Hooli", "Vandelay"]
+TITLES = ["Software Engineer", "Data Scientist", "DevOps Engineer", "Backend Developer", "ML Engineer", "Tech Lead"]
+SKILLS = [
+    "Python", "Java", "SQL", "AWS", "Azure", "Docker", "Kubernetes", "JavaScript", "TypeScript",
+    "Node.js", "React", "Django", "Flask", "Git", "Linux", "HTML", "CSS", "NLP", "machine learning",
+    "data analysis", "Terraform", "Spark", "Kafka", "PostgreSQL", "Redis", "CI/CD", "GraphQL", "Go",
+]
+FILLER = (
+    "designed built shipped maintained scaled reliable services for customers across regions while "
+    "improving latency cost and developer experience through automation testing and code review"
+).split()
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+def _sentence(rng, skills_density):
+    words = rng.sample(FILLER, 12)
+    for _ in range(skills_density):
+        words.insert(rng.randrange(len(words)), rng.choice(SKILLS))
+    return " ".join(words).capitalize() + "."
+
+def _wrap(lines, width):
+    if not width:
+        return lines
+    return [part for line in lines for part in (textwrap.wrap(line, width) or [""])]
+
+def resume_lines(rng, pages=1, jobs=4, skills_density=1, layout="standard", width=None):
+    """
+    The resume as a list of text lines, padded to `pages` pages. `width` is
+    the wrap width of the renderer, so padding counts rendered lines.
+    """
+    header = layout != "no_headers"
+    name = f"{rng.choice(FIRST)} {rng.choice(LAST)}"
+    lines = [name, f"{name.split()[0].lower()}@example.com", f"+1 555 {rng.randint(100, 999)} {rng.randint(1000, 9999)}"]
+    if header:
+        lines.append("Summary")
+    lines.append(_sentence(rng, skills_density))
+    if header:
+        lines.append("Skills")
+    lines.append(", ".join(rng.sample(SKILLS, min(len(SKILLS), 6 + skills_density * 2))))
+    if header:
+        lines.append("Work Experience")
+    year = 2024
+    for _ in range(jobs):
+        length = rng.randint(1, 4)
+        start = year - length
+        lines.append(f"{rng.choice(TITLES)}, {rng.choice(COMPANIES)}, {rng.choice(MONTHS)} {start} - {rng.choice(MONTHS)} {year}")
+        lines.extend(f"- {_sentence(rng, skills_density)}" for _ in range(3))
+        year = start - rng.randint(0, 1)
+    if header:
+        lines.append("Projects")
+    lines.append(f"Resume Parser: {_sentence(rng, skills_density)}")
+    if header:
+        lines.append("Education")
+    lines.append(f"B.Tech Computer Science, State University, {year - 4} - {year}")
+
+    rendered = len(_wrap(lines, width))
+    while True:
+        line = f"- {_sentence(rng, skills_density)}"
+        rendered += len(_wrap([line], width))
+        if rendered > pages * LINES_PER_PAGE:
+            break
+        lines.append(line)
+    if layout == "long_lines":
+        # keep headers on their own line, collapse everything else per section
+        collapsed, current = [], []
+        for line in lines:
+            if line in ("Summary", "Skills", "Work Experience", "Projects", "Education"):
+                collapsed.append(" ".join(current))
+                collapsed.append(line)
+                current = []
+            else:
+                current.append(line)
+        collapsed.append(" ".join(current))
+        lines = [line for line in collapsed if line]
+    return lines
+
+def _paginate(lines):
+    return [lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)] or [[]]
+
+def pdf_wrap_width(layout):
+    return 70 if layout == "two_column" else 100
+
+def render_pdf(lines, layout="standard", rng=None):
+    import fitz  # PyMuPDF
+    rng = rng or random.Random(0)
+    # insert_textbox silently drops text that does not fit, so wrap and place lines ourselves
+    wrapped = _wrap(lines, pdf_wrap_width(layout))
+    doc = fitz.open()
+    for number, page_lines in enumerate(_paginate(wrapped), start=1):
+        page = doc.new_page()
+        if layout == "repeated_headers":
+            page.insert_text((40, 25), f"{lines[0]} - Curriculum Vitae - Confidential", fontsize=8)
+            page.insert_text((40, 820), f"Page {number} | {lines[1]}", fontsize=8)
+        x = 160 if layout == "two_column" else 40
+        if layout == "two_column":
+            for row, skill in enumerate(rng.sample(SKILLS, 10)):
+                page.insert_text((30, 50 + row * 14), skill, fontsize=9)
+        for row, line in enumerate(page_lines):
+            y = 50 + row * 14
+            if layout == "table" and "," in line:
+                cells = [c.strip() for c in line.split(",")]
+                cell_width = 530 / len(cells)
+                for i, cell in enumerate(cells):
+                    page.insert_text((x + i * cell_width, y), cell[:int(cell_width / 5)], fontsize=8)
+            else:
+                page.insert_text((x, y), line, fontsize=9)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+def render_docx(lines, layout="standard", rng=None):
+    import docx
+    from docx.enum.text import WD_BREAK
+    document = docx.Document()
+    if layout == "repeated_headers":
+        section = document.sections[0]
+        section.header.paragraphs[0].text = f"{lines[0]} - Curriculum Vitae - Confidential"
+        section.footer.paragraphs[0].text = lines[1]
+    for page_lines in _paginate(lines):
+        if layout == "table":
+            rows = [line.split(",") for line in page_lines]
+            table = document.add_table(rows=len(rows), cols=max(len(r) for r in rows))
+            for r, cells in enumerate(rows):
+                for c, cell in enumerate(cells):
+                    table.cell(r, c).text = cell.strip()
+        else:
+            for line in page_lines:
+                document.add_paragraph(line)
+        document.add_paragraph().add_run().add_break(WD_BREAK.PAGE)
+    buf = io.BytesIO()
+    document.save(buf)
+    return buf.getvalue()
+
+def generate_resume(rng, fmt="pdf", pages=1, jobs=4, skills_density=1, layout="standard"):
+    width = pdf_wrap_width(layout) if fmt == "pdf" else None
+    lines = resume_lines(rng, pages=pages, jobs=jobs, skills_density=skills_density, layout=layout, width=width)
+    render = render_pdf if fmt == "pdf" else render_docx
+    return render(lines, layout=layout, rng=rng)
+
+def generate_corpus(count=20, fmt="pdf", pages=1, jobs=4, skills_density=1, layout="standard", seed=0):
+    """Yield (filename, bytes) pairs."""
+    rng = random.Random(seed)
+    for i in range(count):
+        yield f"resume_{layout}_{i:05d}.{fmt}", generate_resume(rng, fmt, pages, jobs, skills_density, layout)
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("out_dir")
+    ap.add_argument("--count", type=int, default=20)
+    ap.add_argument("--format", choices=["pdf", "docx"], default="pdf")
+    ap.add_argument("--pages", type=int, default=1)
+    ap.add_argument("--jobs", type=int, default=4)
+    ap.add_argument("--skills-density", type=int, default=1)
+    ap.add_argument("--layout", choices=LAYOUTS, default="standard")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    for filename, data in generate_corpus(args.count, args.format, args.pages, args.jobs,
+                                          args.skills_density, args.layout, args.seed):
+        with open(os.path.join(args.out_dir, filename), "wb") as f:
+            f.write(data)
+    print(f"wrote {args.count} {args.format} resumes to {args.out_dir}")
+
+if __name__ == "__main__":
+    main()
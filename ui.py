@@ -1,18 +1,13 @@
 import streamlit as st
-from fpdf import FPDF
 import datetime
-import os
-import base64
-import io
-import matplotlib.pyplot as plt # type: ignore
-from fpdf.enums import XPos, YPos
+import html
+import math
 
-from app.parsers import extract_metadata, COMMON_SKILLS, format_gemini_feedback
-from app.scoring import traditional_ats_score, jd_based_score
-from app.ai_scoring import ai_ats_score
-from app.comparator import compare_scores
+from app.parsers import format_gemini_feedback
+from app.pipeline import analysis_pipeline
+from app.upload_store import default_store
 
-FONT_PATH = os.path.join("app", "fonts", "DejaVuSans.ttf")
+LEVELS = ["entry", "mid", "senior"]
 
 st.set_page_config(
     page_title="ATS Resume Checker & AI Feedback",
@@ -20,113 +15,122 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
+# Everything below that only depends on the results is cached, so reruns
+# (e.g. clicking "Show More Fixes") just re-emit markup.
+
 # --- Circular Score Chart ---
+@st.cache_data(max_entries=64)
 def circular_score(value, label, color="#1976d2"):
-    fig, ax = plt.subplots(figsize=(2, 2), subplot_kw=dict(aspect="equal"))
+    """Score donut as inline SVG: no matplotlib figure per score."""
     val = max(0, min(100, int(value)))
-    wedges, _ = ax.pie(
-        [val, 100-val],
-        startangle=90,
-        colors=[color, "#23272f"],
-        wedgeprops=dict(width=0.22, edgecolor='white')
-    )
-    # Center text
-    ax.text(0, 0.15, f"{val}", ha='center', va='center', fontsize=22, fontweight="bold", color=color)
-    ax.text(0, -0.18, "/100", ha='center', va='center', fontsize=10, color="#fff")
-    ax.text(0, 0.45, label, ha='center', va='center', fontsize=11, color="#eee")
-    plt.axis("off")
-    fig.patch.set_alpha(0.0)
-    return fig
+    radius = 40
+    circumference = 2 * math.pi * radius
+    filled = circumference * val / 100
+    return f"""<div style="text-align:center">
+<svg viewBox="0 0 100 100" width="100%" style="max-width:180px">
+  <circle cx="50" cy="50" r="{radius}" fill="none" stroke="#23272f" stroke-width="9"/>
+  <circle cx="50" cy="50" r="{radius}" fill="none" stroke="{color}" stroke-width="9"
+          stroke-dasharray="{filled:.2f} {circumference:.2f}" transform="rotate(-90 50 50)"/>
+  <text x="50" y="33" text-anchor="middle" font-size="8" fill="#eee">{html.escape(label)}</text>
+  <text x="50" y="57" text-anchor="middle" font-size="20" font-weight="bold" fill="{color}">{val}</text>
+  <text x="50" y="69" text-anchor="middle" font-size="7" fill="#fff">/100</text>
+</svg></div>"""
 
-# --- PDF Generator for ATS summary ---
+# --- Fixes and strengths from the Gemini feedback ---
+@st.cache_data(max_entries=32)
+def feedback_lines(feedback, sections):
+    feedback_html = format_gemini_feedback(feedback)
+    # --- Parse fixes and strengths (use your own logic if better!) ---
+    fix_lines, strength_lines = [], []
+    in_strength_block = False
+    for line in feedback_html.splitlines():
+        if "Strengths" in line:
+            in_strength_block = True
+            continue
+        if any(kw in line.lower() for kw in ["weakness", "improvement", "fix:", "consider", "suggest", "add", "improve", "should"]):
+            in_strength_block = False
+            if line.strip().startswith("•") or "<b>" in line or ":" in line:
+                fix_lines.append(line)
+        elif in_strength_block and (line.strip().startswith("•") or "<b>" in line):
+            strength_lines.append(line)
+        elif in_strength_block and line.strip():
+            strength_lines.append(line)
+    # Add ATS missing as fixes
+    for section in sections:
+        if not section["present"] and section["weight"] >= 10:
+            label = section["section"].replace("_", " ").capitalize()
+            fix_lines.append(f"Add or improve your <b>{label}</b> section.")
 
+    if not fix_lines:
+        fix_lines.append("No critical weaknesses detected.")
 
-def strip_html(text):
-    # Remove HTML tags for clean PDF output
-    return re.sub('<[^<]+?>', '', text)
-def clean_text(text):
-    if not isinstance(text, str):
-        return str(text)
-    return ''.join(c for c in text if c.isprintable() or c in '\n\t')
+    if not strength_lines:
+        for line in feedback_html.splitlines():
+            if any(kw in line.lower() for kw in ["good", "well", "strength", "effective"]):
+                strength_lines.append(line)
+    if not strength_lines:
+        strength_lines.append("AI did not highlight any major strengths.")
+    return fix_lines, strength_lines
 
-class PDF(FPDF):
-    def header(self):
-        self.set_font("DejaVu", "B", 16)
-        self.cell(
-            0, 10, clean_text("ATS Resume Analysis Report"),
-            align='C', new_x=XPos.LMARGIN, new_y=YPos.NEXT
-        )
-        self.ln(4)
+# --- PDF report, built only when the download button is clicked ---
+@st.cache_data(max_entries=16)
+def report_pdf(content_hash, filename, level, ats_score, jd_score, ai_score, sections, warnings, feedback, _resume):
+    # fpdf is only imported once a report is actually built
+    from app.report import generate_pdf_report
+    return generate_pdf_report(
+        resume=_resume,
+        level=level,
+        ats_score=ats_score,
+        jd_score=jd_score,
+        ai_score=ai_score,
+        sections=sections,
+        warnings=warnings,
+        feedback=feedback,
+    )
 
-def generate_pdf_report(resume_name, level, ats_score, jd_score, ai_score, sections, warnings, feedback):
-    pdf = PDF()
-    pdf.add_font("DejaVu", "", FONT_PATH)
-    pdf.add_font("DejaVu", "B", FONT_PATH)
-    pdf.add_page()
-    pdf.set_font("DejaVu", "", 12)
-    max_width = 190  # Instead of 0, A4 minus margins
+# --- Session results from the analysis pipeline's stage values ---
+def collect_results(values):
+    ai_score, ai_feedback = values["ai"]
+    return {
+        "ats": values["traditional"],
+        "jd": values["jd_match"],
+        "ai": {"score": ai_score, "feedback": ai_feedback},
+        "comp": values["comparison"],
+        "name": values["metadata"].get("name", "User"),
+        "filename": values["filename"],
+        "upload_key": values["upload_key"],
+        "level": values["level"],
+        "jd_text": values["jd"],
+        "resume": values["resume"],
+        "metadata": values["metadata"]
+    }
 
-    pdf.cell(max_width, 10, clean_text(f"Date: {datetime.date.today().isoformat()}"), new_x=XPos.LMARGIN, new_y=YPos.NEXT)
-    pdf.cell(max_width, 10, clean_text(f"Resume: {resume_name}"), new_x=XPos.LMARGIN, new_y=YPos.NEXT)
-    pdf.cell(max_width, 10, clean_text(f"Level: {level.capitalize()}"), new_x=XPos.LMARGIN, new_y=YPos.NEXT)
-    pdf.ln(6)
-    pdf.set_font("DejaVu", "B", 14)
-    pdf.cell(max_width, 10, clean_text("Scores"), new_x=XPos.LMARGIN, new_y=YPos.NEXT)
-    pdf.set_font("DejaVu", "", 12)
-    pdf.cell(max_width, 10, clean_text(f"ATS Score: {ats_score}/100"), new_x=XPos.LMARGIN, new_y=YPos.NEXT)
-    pdf.cell(max_width, 10, clean_text(f"JD Match Score: {jd_score if jd_score is not None else '—'}/100"), new_x=XPos.LMARGIN, new_y=YPos.NEXT)
-    pdf.cell(max_width, 10, clean_text(f"Gemini AI Score: {ai_score}/100"), new_x=XPos.LMARGIN, new_y=YPos.NEXT)
-    pdf.ln(6)
-    pdf.set_font("DejaVu", "B", 14)
-    pdf.cell(max_width, 10, clean_text("Section Breakdown"), new_x=XPos.LMARGIN, new_y=YPos.NEXT)
-    pdf.set_font("DejaVu", "", 12)
-    for s in sections:
-        label = s['section'].replace("_", " ").capitalize()
-        txt = clean_text(f"{label} (Importance: {s['weight']}%): {'✔️' if s['present'] else '✗'}")
-        pdf.multi_cell(max_width, 10, txt)
-    pdf.ln(4)
-    if warnings:
-        pdf.set_text_color(255, 0, 0)
-        for warning in warnings:
-            # Split long warnings into chunks to avoid line-break error
-            warning_chunks = [warning[i:i+80] for i in range(0, len(warning), 80)]
-            for chunk in warning_chunks:
-                pdf.multi_cell(max_width, 10, clean_text(f"⚠️ {chunk}"))
-        pdf.set_text_color(0, 0, 0)
-    pdf.ln(6)
-    pdf.set_font("DejaVu", "B", 14)
-    pdf.cell(max_width, 10, clean_text("Gemini AI Feedback"), new_x=XPos.LMARGIN, new_y=YPos.NEXT)
-    pdf.set_font("DejaVu", "", 11)
-    # Feedback: split into lines, break long lines, avoid HTML/emoji-only lines
-    feedback_lines = clean_text(feedback).split("\n")
-    for line in feedback_lines:
-        for chunk in [line[i:i+110] for i in range(0, len(line), 110)]:
-            pdf.multi_cell(max_width, 8, chunk)
-    pdf.ln(2)
-    return bytes(pdf.output(name=None))
+def download_upload(upload_key, filename):
+    # the file is read from the upload store only when the button is clicked
+    st.download_button(
+        "Download your uploaded file", lambda: default_store().read(upload_key), file_name=filename,
+        on_click="ignore"
+    )
 
 # --- PDF Preview (right side) ---
-def show_resume_file(file_bytes, filename, metadata=None):
+def show_resume_file(upload_key, filename, metadata=None):
+    uploads = default_store()
     if filename.lower().endswith(".pdf"):
         try:
-            b64 = base64.b64encode(file_bytes).decode()
-            st.markdown(
-                f'<iframe src="data:application/pdf;base64,{b64}" width="100%" height="700px" '
-                f'style="border-radius:14px; border:2px solid #eee;background:transparent"></iframe>',
-                unsafe_allow_html=True,
-            )
+            # one low-DPI page image at a time, not the whole PDF in a data URI
+            page_count = uploads.page_count(upload_key)
+            page = st.number_input("Page", min_value=1, max_value=page_count, value=1) if page_count > 1 else 1
+            st.image(uploads.page_image(upload_key, page - 1), width="stretch")
+        except FileNotFoundError:
+            st.warning("This upload has expired. Analyze the resume again to preview it.")
         except Exception as e:
             st.warning(f"PDF preview failed: {e}")
-            st.download_button(
-                "Download your uploaded file", file_bytes, filename=filename
-            )
+            download_upload(upload_key, filename)
     elif filename.lower().endswith(".docx"):
         st.info("Preview for DOCX files is not supported. See the parsed text below:")
         if metadata and "raw_text" in metadata:
             st.text_area("Extracted Resume Text", metadata["raw_text"], height=400)
-        st.download_button(
-            "Download your uploaded file", file_bytes, filename=filename
-        )
+        download_upload(upload_key, filename)
     else:
         st.error("Unsupported file type for preview.")
 # --- Sidebar ---
@@ -163,27 +167,27 @@ if "results" not in st.session_state:
 
     with st.form("upload_form", clear_on_submit=False):
         resume_file = st.file_uploader("Upload your resume (.pdf or .docx)", type=["pdf", "docx"])
-        level = st.selectbox("Select Resume Level", ["entry", "mid", "senior"], index=0)
+        level = st.selectbox("Select Resume Level", LEVELS, index=0)
         jd = st.text_area("Paste Job Description (optional)", height=150)
         submit_btn = st.form_submit_button("Analyze Resume")
 
     if submit_btn and resume_file:
-        metadata = extract_metadata(resume_file.getvalue(), resume_file.name)
-        ats_result = traditional_ats_score(metadata, level)
-        jd_result = jd_based_score(metadata, jd, level) if jd else None
-        ai_score, ai_feedback = ai_ats_score(resume_file.getvalue(), resume_file.name, jd, level)
-        comp = compare_scores(ats_result, ai_score, jd_result)
-        st.session_state["results"] = {
-            "ats": ats_result,
-            "jd": jd_result,
-            "ai": {"score": ai_score, "feedback": ai_feedback},
-            "comp": comp,
-            "name": metadata.get("name", "User"),
-            "filename": resume_file.name,
-            "file_bytes": resume_file.getvalue(),
-            "level": level,
-            "metadata": metadata
-        }
+        # The file is spooled to disk; the session keeps only its key (the Upload
+        # handle releases it when the session ends)
+        uploads = default_store()
+        upload = uploads.put(resume_file)
+        # Gemini runs in the background while the resume is parsed and scored
+        pipeline = analysis_pipeline(uploads=uploads)
+        pipeline.update(upload_key=upload.key, filename=resume_file.name, jd=jd, level=level)
+        try:
+            values = pipeline.run()
+        except Exception as e:
+            upload.release()
+            st.error(f"Could not read your resume: {e}")
+            st.stop()
+        st.session_state["upload"] = upload
+        st.session_state["pipeline"] = pipeline
+        st.session_state["results"] = collect_results(values)
         st.rerun()
     elif submit_btn and not resume_file:
         st.error("Please upload a resume file to proceed.")
@@ -195,56 +199,37 @@ else:
     ai_score = results["ai"]["score"]
     name = results["name"].split()[0].capitalize() if results["name"] else "User"
     comp = results["comp"]
-    feedback_html = format_gemini_feedback(results["ai"]["feedback"])
-    file_bytes = results["file_bytes"]
+    upload_key = results["upload_key"]
     filename = results["filename"]
     level = results["level"]
     metadata = results.get("metadata", None)
+    resume = results["resume"]
 
-    # --- Parse fixes and strengths (use your own logic if better!) ---
-    fix_lines, strength_lines = [], []
-    in_strength_block = False
-    for line in feedback_html.splitlines():
-        if "Strengths" in line:
-            in_strength_block = True
-            continue
-        if any(kw in line.lower() for kw in ["weakness", "improvement", "fix:", "consider", "suggest", "add", "improve", "should"]):
-            in_strength_block = False
-            if line.strip().startswith("•") or "<b>" in line or ":" in line:
-                fix_lines.append(line)
-        elif in_strength_block and (line.strip().startswith("•") or "<b>" in line):
-            strength_lines.append(line)
-        elif in_strength_block and line.strip():
-            strength_lines.append(line)
-    # Add ATS missing as fixes
-    for section in results["ats"]["details"]["sections"]:
-        if not section["present"] and section["weight"] >= 10:
-            label = section["section"].replace("_", " ").capitalize()
-            fix_lines.append(f"Add or improve your <b>{label}</b> section.")
-
-    if not fix_lines:
-        fix_lines.append("No critical weaknesses detected.")
-
-    if not strength_lines:
-        for line in feedback_html.splitlines():
-            if any(kw in line.lower() for kw in ["good", "well", "strength", "effective"]):
-                strength_lines.append(line)
-    if not strength_lines:
-        strength_lines.append("AI did not highlight any major strengths.")
+    fix_lines, strength_lines = feedback_lines(results["ai"]["feedback"], results["ats"]["details"]["sections"])
 
     # --- UI Layout: Main & PDF Preview (right) ---
     left_col, right_col = st.columns([3, 2], gap="large")
     with left_col:
         st.markdown(f"<h2 style='margin-bottom:0.2em'>Hello, {name}!</h2>", unsafe_allow_html=True)
         st.markdown("<small>Welcome to your resume review.</small>", unsafe_allow_html=True)
+        # Only the stages that depend on what changed are re-run; the resume is not re-parsed
+        with st.expander("Change level or job description"):
+            with st.form("rescore_form"):
+                new_level = st.selectbox("Resume Level", LEVELS, index=LEVELS.index(level))
+                new_jd = st.text_area("Job Description", value=results.get("jd_text", ""), height=150)
+                if st.form_submit_button("Re-score"):
+                    pipeline = st.session_state["pipeline"]
+                    pipeline.update(level=new_level, jd=new_jd)
+                    st.session_state["results"] = collect_results(pipeline.run())
+                    st.rerun()
         st.markdown("<br>", unsafe_allow_html=True)
         score_cols = st.columns([1, 1, 1], gap="small")
         with score_cols[0]:
-            st.pyplot(circular_score(ats_score, "ATS", "#1976d2"), transparent=True)
+            st.markdown(circular_score(ats_score, "ATS", "#1976d2"), unsafe_allow_html=True)
         with score_cols[1]:
-            st.pyplot(circular_score(jd_score, "JD", "#ff9900"), transparent=True)
+            st.markdown(circular_score(jd_score, "JD", "#ff9900"), unsafe_allow_html=True)
         with score_cols[2]:
-            st.pyplot(circular_score(ai_score, "Gemini", "#43a047"), transparent=True)
+            st.markdown(circular_score(ai_score, "Gemini", "#43a047"), unsafe_allow_html=True)
         st.markdown("---")
         # Fixes
         st.markdown("<h4>🚨 Top Fixes</h4>", unsafe_allow_html=True)
@@ -291,31 +276,31 @@ else:
                 <span style="font-size:1.08em;">Recommendation: <span style="color:#ff0">{comp["recommendation"]}</span></span>
             </div>''', unsafe_allow_html=True
         )
-        pdf_bytes = generate_pdf_report(
-            resume_name=filename,   # from session_state
-            level=level,
-            ats_score=ats_score,
-            jd_score=jd_score,
-            ai_score=ai_score,
-            sections=results["ats"]["details"].get("sections", []),
-            warnings=results["ats"]["details"].get("warnings", []),
-            feedback=results["ai"]["feedback"],
-        )
+        # A callable defers building the report until the button is clicked
         st.download_button(
             label="⬇️ Download ATS Summary PDF",
-            data=pdf_bytes,
+            data=lambda: report_pdf(
+                resume.content_hash, filename, level, ats_score, jd_score, ai_score,
+                results["ats"]["details"].get("sections", []),
+                results["ats"]["details"].get("warnings", []),
+                results["ai"]["feedback"],
+                resume,
+            ),
             file_name=f"ATS_Summary_{filename.split('.')[0]}_{level}_{datetime.date.today().isoformat()}.pdf",
             mime="application/pdf",
-            use_container_width=True
+            on_click="ignore",
+            width="stretch"
         )
         st.markdown("<br>", unsafe_allow_html=True)
         if st.button("🔄 Analyze Another Resume"):
+            if "upload" in st.session_state:
+                st.session_state["upload"].release()
             st.session_state.clear()
             st.rerun()
     with right_col:
         st.markdown("<div style='height:18px'></div>", unsafe_allow_html=True)
         st.markdown("### Resume Preview")
-        show_resume_file(file_bytes, filename, metadata=metadata)
+        show_resume_file(upload_key, filename, metadata=metadata)
 
 # Custom CSS
 st.markdown("""